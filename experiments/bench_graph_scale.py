@@ -0,0 +1,63 @@
+"""
+Benchmark: GraphWorkflow construction time and memory per node.
+
+Compares building WorkflowNode models one by one with GraphBuilder (which
+interns agents), at 1k, 10k and 100k nodes.
+Each node gets its own Agent instance with identical config, as generated
+per-entity configs do.
+
+    python experiments/bench_graph_scale.py [--run]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from agentblueprint_core import Agent, GraphBuilder, GraphWorkflow, WorkflowNode
+
+SIZES = (1_000, 10_000, 100_000)
+
+def make_agent() -> Agent:
+    return Agent(name="worker", model="mock", system_prompt="Summarize the entity.")
+
+def deps(i: int) -> list:
+    # Layers of 100 nodes, each reading two nodes of the previous layer
+    return [f"n{i - 100}", f"n{i - 99 if i % 100 != 99 else i - 199}"] if i >= 100 else []
+
+def build_models(n: int) -> GraphWorkflow:
+    return GraphWorkflow(name="models", nodes=[
+        WorkflowNode(id=f"n{i}", agent=make_agent(), depends_on=deps(i)) for i in range(n)])
+
+def build_compact(n: int) -> GraphWorkflow:
+    builder = GraphBuilder()
+    for i in range(n):
+        builder.add(f"n{i}", make_agent(), deps(i))
+    return builder.build("compact")
+
+def measure(build, n: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    workflow = build(n)
+    workflow._compact().topological_order()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return workflow, elapsed, current / n, peak / n
+
+def main() -> None:
+    run = "--run" in sys.argv
+    print(f"{'nodes':>8} {'builder':>8} {'seconds':>8} {'B/node':>8} {'peak B/node':>12}" + ("  run s" if run else ""))
+    for n in SIZES:
+        for label, build in (("models", build_models), ("compact", build_compact)):
+            workflow, elapsed, per_node, peak = measure(build, n)
+            line = f"{n:>8} {label:>8} {elapsed:>8.2f} {per_node:>8.0f} {peak:>12.0f}"
+            if run and n <= 10_000:
+                start = time.perf_counter()
+                workflow.run("entity")
+                line += f"  {time.perf_counter() - start:.2f}"
+            print(line)
+            del workflow
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+The 'mock-server' command for AgentBlueprint CLI.
+"""
+import asyncio
+from urllib.parse import parse_qsl
+
+import click
+from rich.console import Console
+
+from agentblueprint_core.llm import SimulationProfile
+
+console = Console()
+
+@click.command(name="mock-server")
+@click.option("--host", default="127.0.0.1", help="Interface to bind")
+@click.option("--port", default=8000, type=int, help="Port to listen on")
+@click.option("--profile", "profile_str", default="",
+              help="Simulation profile as a query string, e.g. 'latency=lognormal&latency_mean=0.5&tps=50'")
+@click.option("--max-concurrency", type=int, default=None, help="Return 429 beyond this many in-flight requests")
+@click.option("--embedding-dim", type=int, default=256, help="Length of returned embedding vectors")
+def mock_server(host, port, profile_str, max_concurrency, embedding_dim):
+    """Run a local OpenAI-compatible stand-in server."""
+    from agentblueprint_cli.mock_server import MockOpenAIServer
+
+    profile = SimulationProfile.from_params(dict(parse_qsl(profile_str)))
+    server = MockOpenAIServer(profile=profile, max_concurrency=max_concurrency,
+                              embedding_dim=embedding_dim, host=host, port=port)
+
+    async def main():
+        await server.http.start()
+        console.print(f"[bold blue]AgentBlueprint[/bold blue]: Mock OpenAI server at [green]{server.base_url}[/green]")
+        console.print(f"[dim]Use model 'openai:<name>?base_url={server.base_url}' or set OPENAI_BASE_URL.[/dim]")
+        await server.http.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        console.print("[yellow]Mock server stopped.[/yellow]")
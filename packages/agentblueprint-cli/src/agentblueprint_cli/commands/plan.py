@@ -0,0 +1,25 @@
+"""
+The 'plan' command for AgentBlueprint CLI.
+"""
+import click
+from rich.console import Console
+
+from agentblueprint_config import load_and_parse
+from agentblueprint_core import compile_workflow
+
+console = Console()
+
+@click.command()
+@click.argument("workflow_file", type=click.Path(exists=True))
+@click.option("--checkpoint", is_flag=True, help="Plan for a run with --checkpoint, --resume or --memoize")
+def plan(workflow_file, checkpoint):
+    """Print the optimized execution plan of a workflow."""
+    try:
+        execution_plan = compile_workflow(load_and_parse(workflow_file), checkpointed=checkpoint or None)
+    except Exception as e:
+        console.print(f"[bold red]Error compiling workflow:[/bold red] {e}")
+        raise SystemExit(1)
+
+    for line in execution_plan.describe():
+        style = "yellow" if line.startswith(("Removed", "Fusion skipped")) else None
+        console.print(line, style=style, highlight=False)
@@ -0,0 +1,78 @@
+"""
+The 'enqueue' and 'worker' commands for AgentBlueprint CLI.
+"""
+import json
+import multiprocessing
+import signal
+import threading
+
+import click
+from rich.console import Console
+
+console = Console()
+
+@click.command()
+@click.option("--queue", "queue_path", default="jobs.db", type=click.Path(), help="Queue database file")
+@click.option("--input", "-i", "inputs", multiple=True, help="Workflow input; repeat for several jobs")
+@click.option("--file", "-f", "input_file", type=click.File("r"), help="JSONL file, one job input per line")
+@click.option("--max-attempts", default=3, type=int, help="Attempts before a job is dead-lettered")
+@click.option("--name", "queue_name", default="default", help="Queue name inside the database")
+def enqueue(queue_path, inputs, input_file, max_attempts, queue_name):
+    """Add workflow inputs to a durable job queue."""
+    from agentblueprint_core.jobqueue import JobQueue
+
+    items = list(inputs)
+    if input_file is not None:
+        items += [json.loads(line) for line in input_file if line.strip()]
+    if not items:
+        console.print("[yellow]Nothing to enqueue. Use --input or --file.[/yellow]")
+        return
+
+    queue = JobQueue(queue_path)
+    for item in items:
+        queue.enqueue({"input": item}, queue=queue_name, max_attempts=max_attempts)
+    stats = queue.stats(queue_name)
+    console.print(f"[green]Enqueued {len(items)} job(s)[/green] into {queue_path} ({stats})")
+
+def _worker_main(workflow_file, queue_path, queue_name, visibility_timeout, poll_interval, exit_when_empty):
+    from agentblueprint_config import load_and_parse
+    from agentblueprint_core.jobqueue import JobQueue, JobWorker
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    workflow = load_and_parse(workflow_file, use_cache=True)
+    worker = JobWorker(JobQueue(queue_path), workflow, visibility_timeout=visibility_timeout,
+                       poll_interval=poll_interval, queue_name=queue_name)
+    worker.run(stop=stop, exit_when_empty=exit_when_empty)
+
+@click.command()
+@click.argument("workflow_file", type=click.Path(exists=True))
+@click.option("--queue", "queue_path", default="jobs.db", type=click.Path(), help="Queue database file")
+@click.option("--processes", "-p", default=1, type=int, help="Worker processes to start (0 = one per CPU)")
+@click.option("--visibility-timeout", default=300.0, type=float, help="Seconds a claimed job stays leased")
+@click.option("--poll-interval", default=1.0, type=float, help="Seconds between polls of an empty queue")
+@click.option("--exit-when-empty", is_flag=True, help="Stop once no jobs are queued or running")
+@click.option("--name", "queue_name", default="default", help="Queue name inside the database")
+def worker(workflow_file, queue_path, processes, visibility_timeout, poll_interval, exit_when_empty, queue_name):
+    """Consume queued jobs with one or more worker processes."""
+    from agentblueprint_core.jobqueue import JobQueue
+
+    processes = processes or multiprocessing.cpu_count()
+    JobQueue(queue_path)  # create the schema once before workers race for it
+    args = (workflow_file, queue_path, queue_name, visibility_timeout, poll_interval, exit_when_empty)
+    console.print(f"[bold blue]AgentBlueprint[/bold blue]: Starting {processes} worker(s) on {queue_path}")
+
+    procs = [multiprocessing.Process(target=_worker_main, args=args) for _ in range(processes)]
+    for proc in procs:
+        proc.start()
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        # Children received the same SIGINT and finish their current job
+        for proc in procs:
+            proc.join()
+
+    console.print(f"Queue status: {JobQueue(queue_path).stats(queue_name)}")
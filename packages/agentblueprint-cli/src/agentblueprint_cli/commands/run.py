@@ -7,41 +7,69 @@ from rich.console import Console
 from rich.panel import Panel
 
 from agentblueprint_config import load_and_parse
-from agentblueprint_core import ToolRegistry
-from agentblueprint_tools import (
-    CalculatorTool, EchoTool, PythonREPLTool, HTTPClientTool, WebSearchTool,
-    FileReadTool, FileWriteTool, SystemTimeTool, SystemInfoTool
-)
+from agentblueprint_core import UsageTracker
 
 console = Console()
 
+def print_usage(usage: UsageTracker) -> None:
+    """Print token totals per model and agent."""
+    from rich.table import Table
+
+    table = Table(title="Token Usage")
+    table.add_column("Scope", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Prompt", justify="right")
+    table.add_column("Completion", justify="right")
+    table.add_column("Total", justify="right", style="bold")
+    rows = [("total", usage.total)]
+    rows += [(f"model {k}", v) for k, v in usage.by_model.items()]
+    rows += [(f"agent {k}", v) for k, v in usage.by_agent.items()]
+    for scope, u in rows:
+        table.add_row(scope, str(u.calls), str(u.prompt_tokens), str(u.completion_tokens), str(u.total_tokens))
+    console.print(table)
+
 @click.command()
 @click.argument("workflow_file", type=click.Path(exists=True))
 @click.option("--input", "-i", help="Initial input for the workflow")
-def run(workflow_file, input):
+@click.option("--no-cache", is_flag=True, help="Parse the config even if a compiled copy is cached")
+@click.option("--checkpoint", is_flag=True, help="Checkpoint graph node results so the run can be resumed")
+@click.option("--resume", "resume", metavar="RUN_ID", help="Resume a checkpointed graph run, re-running only unfinished nodes")
+@click.option("--memoize", is_flag=True, help="Reuse results of graph nodes whose agent and input are unchanged")
+@click.option("--deadline", type=float, help="Seconds the whole run may take")
+@click.option("--optimize", is_flag=True, help="Compile graph workflows first (prune, merge and fuse nodes; see 'ab plan')")
+def run(workflow_file, input, no_cache, checkpoint, resume, memoize, deadline, optimize):
     """Run a workflow from a configuration file."""
     from agentblueprint_cli.callbacks import RichCallbackHandler
+    from agentblueprint_core import ArtifactStore, GraphWorkflow, RunStore, compile_workflow
     
     console.print(f"[bold blue]AgentBlueprint[/bold blue]: Running workflow from {workflow_file}...")
     
-    # Pre-register basic tools for now
-    # In a real app this might happen via plugin loading
-    ToolRegistry.register(CalculatorTool())
-    ToolRegistry.register(EchoTool())
-    ToolRegistry.register(PythonREPLTool())
-    ToolRegistry.register(HTTPClientTool())
-    ToolRegistry.register(WebSearchTool())
-    
-    # New Tools
-    ToolRegistry.register(FileReadTool())
-    ToolRegistry.register(FileWriteTool())
-    ToolRegistry.register(SystemTimeTool())
-    ToolRegistry.register(SystemInfoTool())
-    
     try:
-        workflow = load_and_parse(workflow_file)
+        workflow = load_and_parse(workflow_file, use_cache=not no_cache)
         
         console.print(f"Loaded workflow: [bold green]{workflow.name}[/bold green]")
+        runner = workflow
+        if optimize:
+            # Chains are fused unless node results are persisted one node at a time
+            persisted = (checkpoint or resume or memoize) or None
+            runner = compile_workflow(workflow, checkpointed=persisted)
+            workflow = runner.workflow
+            if runner.removed:
+                console.print(f"[dim]Optimized away {len(runner.removed)} nodes[/dim]")
+
+        run_kwargs = {}
+        if isinstance(workflow, GraphWorkflow):
+            # Node outputs are only written to disk when asked for (or configured with checkpoint_dir)
+            if checkpoint or resume:
+                store = RunStore(workflow.checkpoint_dir)
+                run_kwargs = {"run_store": store, "resume": resume}
+                if resume and not input:
+                    input = store.info(resume)["input"]
+            if memoize:
+                run_kwargs["artifact_store"] = ArtifactStore(workflow.artifact_dir)
+        elif checkpoint or resume or memoize:
+            console.print("[yellow]--checkpoint, --resume and --memoize only apply to graph workflows.[/yellow]")
+            return
         
         if input:
             # console.print(f"Input: [italic]{input}[/italic]") # Handled by callback now
@@ -50,13 +78,22 @@ def run(workflow_file, input):
             # We pass the same console instance we use globally
             handler = RichCallbackHandler(console=console)
             
-            result = workflow.run(input, callbacks=[handler])
+            with UsageTracker().activate() as usage:
+                result = runner.run(input, callbacks=[handler], deadline=deadline, **run_kwargs)
             
             console.print(Panel(
                 f"[bold]Result:[/bold]\n{result}",
                 title="Workflow Execution",
                 border_style="green"
             ))
+            print_usage(usage)
+            if workflow.token_budget is not None:
+                console.print(f"[dim]Token budget: {usage.total.total_tokens}/{workflow.token_budget} used[/dim]")
+            if getattr(result, "run_id", None):
+                console.print(f"[dim]Run ID: {result.run_id}[/dim]")
+            reused = [n for n, status in getattr(result, "status", {}).items() if status == "reused"]
+            if reused:
+                console.print(f"[dim]Reused {len(reused)} of {len(result.status)} nodes: {', '.join(reused)}[/dim]")
         else:
              console.print("[yellow]No input provided. Use --input to send a message.[/yellow]")
 
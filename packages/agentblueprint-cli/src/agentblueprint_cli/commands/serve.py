@@ -0,0 +1,30 @@
+"""
+The 'serve' command for AgentBlueprint CLI.
+"""
+import asyncio
+
+import click
+from rich.console import Console
+
+console = Console()
+
+@click.command()
+@click.argument("workflow_files", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--host", default="127.0.0.1", help="Interface to bind")
+@click.option("--port", default=8080, type=int, help="Port to listen on")
+@click.option("--max-concurrency", default=32, type=int, help="Workflow runs executing at once")
+@click.option("--drain-timeout", default=30.0, type=float, help="Seconds to wait for in-flight runs on shutdown")
+def serve(workflow_files, host, port, max_concurrency, drain_timeout):
+    """Serve workflows over a local HTTP API."""
+    from agentblueprint_cli.server import WorkflowServer
+
+    server = WorkflowServer.from_files(list(workflow_files), max_concurrency=max_concurrency,
+                                       host=host, port=port)
+
+    def ready(srv):
+        console.print(f"[bold blue]AgentBlueprint[/bold blue]: Serving at [green]http://{srv.http.host}:{srv.http.port}[/green]")
+        for name in sorted(srv.workflows):
+            console.print(f"  POST /workflows/{name}/run  |  POST /workflows/{name}/stream")
+
+    asyncio.run(server.serve(drain_timeout=drain_timeout, on_ready=ready))
+    console.print("[yellow]Server stopped.[/yellow]")
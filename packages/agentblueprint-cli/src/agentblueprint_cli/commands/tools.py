@@ -6,11 +6,6 @@ from rich.console import Console
 from rich.table import Table
 
 from agentblueprint_core import ToolRegistry
-# Import all tools to ensure they are registered for listing
-from agentblueprint_tools import (
-    CalculatorTool, EchoTool, PythonREPLTool, HTTPClientTool, WebSearchTool,
-    FileReadTool, FileWriteTool, SystemTimeTool, SystemInfoTool
-)
 
 console = Console()
 
@@ -22,17 +17,7 @@ def tools():
 @tools.command(name="list")
 def list_tools():
     """List all available tools."""
-    # Ensure standard tools are registered
-    ToolRegistry.register(CalculatorTool())
-    ToolRegistry.register(EchoTool())
-    ToolRegistry.register(PythonREPLTool())
-    ToolRegistry.register(HTTPClientTool())
-    ToolRegistry.register(WebSearchTool())
-    ToolRegistry.register(FileReadTool())
-    ToolRegistry.register(FileWriteTool())
-    ToolRegistry.register(SystemTimeTool())
-    ToolRegistry.register(SystemInfoTool())
-    
+    # Installed tools are discovered through the agentblueprint.tools entry points
     available_tools = ToolRegistry.list_all()
     
     table = Table(title="Available Tools")
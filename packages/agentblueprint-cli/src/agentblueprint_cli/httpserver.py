@@ -0,0 +1,221 @@
+"""
+Minimal asyncio HTTP/1.1 server used by the CLI's long-running commands.
+
+Supports keep-alive, JSON bodies, chunked streaming responses (for SSE) and
+graceful drain on shutdown. It intentionally has no third-party dependencies.
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Union
+from urllib.parse import parse_qsl, urlsplit
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+class Request:
+    """An incoming HTTP request."""
+
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        parts = urlsplit(target)
+        self.method = method.upper()
+        self.path = parts.path
+        self.query = dict(parse_qsl(parts.query))
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        """Decode the body as JSON (an empty body decodes to an empty dict)."""
+        if not self.body:
+            return {}
+        return json.loads(self.body)
+
+class Response:
+    """A complete HTTP response."""
+
+    def __init__(self, body: Union[bytes, str] = b"", status: int = 200,
+                 headers: Optional[Dict[str, str]] = None, content_type: str = "text/plain"):
+        self.body = body.encode() if isinstance(body, str) else body
+        self.status = status
+        self.headers = {"Content-Type": content_type, **(headers or {})}
+
+    @classmethod
+    def json(cls, data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> "Response":
+        return cls(json.dumps(data), status=status, headers=headers, content_type="application/json")
+
+class StreamingResponse:
+    """A response whose body is produced incrementally with chunked encoding."""
+
+    def __init__(self, chunks: AsyncIterator[bytes], status: int = 200,
+                 headers: Optional[Dict[str, str]] = None, content_type: str = "text/event-stream"):
+        self.chunks = chunks
+        self.status = status
+        self.headers = {"Content-Type": content_type, "Cache-Control": "no-cache", **(headers or {})}
+
+def sse_event(data: Any, event: Optional[str] = None) -> bytes:
+    """Encode one server-sent event."""
+    payload = data if isinstance(data, str) else json.dumps(data)
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {payload}\n\n".encode()
+
+Handler = Callable[[Request], Awaitable[Union[Response, StreamingResponse]]]
+
+class _RequestError(Exception):
+    """A request that cannot be read; answered with ``status`` and the connection closed."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class HTTPServer:
+    """
+    Serve a single async handler over HTTP.
+
+    Malformed requests are answered with 400, request heads over the
+    stream limit (64 KiB) with 431 and bodies over ``max_body_size`` bytes
+    with 413; the connection is then closed.
+
+    Example:
+        >>> async def handler(request):
+        ...     return Response.json({"path": request.path})
+        >>> server = HTTPServer(handler, port=8000)
+        >>> asyncio.run(server.serve_forever())  # doctest: +SKIP
+    """
+
+    def __init__(self, handler: Handler, host: str = "127.0.0.1", port: int = 8000,
+                 max_body_size: int = 10 * 2**20):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.max_body_size = max_body_size
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._draining = False
+
+    async def start(self) -> None:
+        """Bind the listening socket. ``port=0`` picks a free port."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def shutdown(self, drain_timeout: float = 30.0) -> None:
+        """Stop accepting connections and wait for in-flight requests to finish."""
+        self._draining = True
+        if self._server is not None:
+            self._server.close()
+        if self._inflight:
+            await asyncio.wait(set(self._inflight), timeout=drain_timeout)
+        for task in self._inflight:
+            task.cancel()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while not self._draining:
+                try:
+                    request = await self._read_request(reader)
+                except _RequestError as e:
+                    await self._reject(e, writer)
+                    break
+                if request is None:
+                    break
+                task = asyncio.current_task()
+                self._inflight.add(task)
+                try:
+                    keep_alive = await self._dispatch(request, writer)
+                finally:
+                    self._inflight.discard(task)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except (ConnectionError, RuntimeError):
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise _RequestError(431, "Request head too large")
+        lines = head.decode("latin-1").split("\r\n")
+        request_line = lines[0].split(" ")
+        if len(request_line) != 3 or not request_line[2].startswith("HTTP/"):
+            raise _RequestError(400, "Malformed request line")
+        method, target, _ = request_line
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        if "transfer-encoding" in headers:
+            raise _RequestError(400, "Chunked request bodies are not supported")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise _RequestError(400, "Invalid Content-Length") from None
+        if length < 0:
+            raise _RequestError(400, "Invalid Content-Length")
+        if length > self.max_body_size:
+            raise _RequestError(413, f"Body exceeds {self.max_body_size} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method, target, headers, body)
+
+    async def _reject(self, error: _RequestError, writer: asyncio.StreamWriter) -> None:
+        body = json.dumps({"error": str(error)}).encode()
+        status_line = f"HTTP/1.1 {error.status} {REASONS[error.status]}\r\n"
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body)), "Connection": "close"}
+        writer.write(self._head(status_line, headers) + body)
+        await writer.drain()
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> bool:
+        try:
+            response = await self.handler(request)
+        except Exception as e:
+            response = Response.json({"error": {"message": str(e), "type": type(e).__name__}}, status=500)
+
+        keep_alive = request.headers.get("connection", "").lower() != "close" and not self._draining
+        status_line = f"HTTP/1.1 {response.status} {REASONS.get(response.status, 'Unknown')}\r\n"
+        headers = dict(response.headers)
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+        if isinstance(response, StreamingResponse):
+            headers["Transfer-Encoding"] = "chunked"
+            writer.write(self._head(status_line, headers))
+            try:
+                async for chunk in response.chunks:
+                    if chunk:
+                        writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                        await writer.drain()
+            finally:
+                # Run the producer's cleanup now, also when the client went away
+                aclose = getattr(response.chunks, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            writer.write(b"0\r\n\r\n")
+        else:
+            headers["Content-Length"] = str(len(response.body))
+            writer.write(self._head(status_line, headers) + response.body)
+        await writer.drain()
+        return keep_alive
+
+    @staticmethod
+    def _head(status_line: str, headers: Dict[str, str]) -> bytes:
+        return (status_line + "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n").encode()
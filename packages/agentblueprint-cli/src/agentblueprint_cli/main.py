@@ -1,23 +1,72 @@
 """
 AgentBlueprint CLI entrypoint.
+
+Commands are imported only when invoked, so ``ab --help`` and light
+commands do not pay for pydantic, rich, httpx and the tool library.
 """
+import importlib
+
 import click
-from agentblueprint_cli.commands.run import run
-from agentblueprint_cli.commands.init import init
-from agentblueprint_cli.commands.tools import tools
-from agentblueprint_cli.commands.docker import docker
 
-@click.group()
+class LazyGroup(click.Group):
+    """
+    A click group whose subcommands are imported on first use.
+
+    Args:
+        lazy_subcommands: Maps command name to ``(import_path, short_help)``,
+            where ``import_path`` is ``"package.module.attribute"``. The short
+            help is shown by ``--help`` without importing the command.
+    """
+
+    def __init__(self, *args, lazy_subcommands: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            self.add_command(self._load(cmd_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load(self, cmd_name):
+        import_path, _ = self.lazy_subcommands[cmd_name]
+        module_name, attr = import_path.rsplit(".", 1)
+        command = getattr(importlib.import_module(module_name), attr)
+        if not isinstance(command, click.Command):
+            raise ValueError(f"Lazy command {import_path} is not a click command")
+        return command
+
+    def format_commands(self, ctx, formatter):
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.lazy_subcommands and name not in self.commands:
+                rows.append((name, self.lazy_subcommands[name][1]))
+            else:
+                cmd = self.get_command(ctx, name)
+                if cmd is not None and not cmd.hidden:
+                    rows.append((name, cmd.get_short_help_str(formatter.width)))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+@click.group(cls=LazyGroup, lazy_subcommands={
+    "run": ("agentblueprint_cli.commands.run.run", "Run a workflow from a configuration file."),
+    "plan": ("agentblueprint_cli.commands.plan.plan", "Print the optimized execution plan of a workflow."),
+    "init": ("agentblueprint_cli.commands.init.init", "Initialize a new AgentBlueprint project."),
+    "tools": ("agentblueprint_cli.commands.tools.tools", "Manage and inspect tools."),
+    "docker": ("agentblueprint_cli.commands.docker.docker", "Generates a Dockerfile and .dockerignore for the project."),
+    "mock-server": ("agentblueprint_cli.commands.mock_server.mock_server", "Run a local OpenAI-compatible stand-in server."),
+    "serve": ("agentblueprint_cli.commands.serve.serve", "Serve workflows over a local HTTP API."),
+    "enqueue": ("agentblueprint_cli.commands.queue.enqueue", "Add workflow inputs to a durable job queue."),
+    "worker": ("agentblueprint_cli.commands.queue.worker", "Consume queued jobs with one or more worker processes."),
+})
 @click.version_option()
 def cli():
     """AgentBlueprint CLI tool."""
     pass
 
-cli.add_command(run)
-cli.add_command(init)
-cli.add_command(tools)
-cli.add_command(docker)
-
 
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,220 @@
+"""
+Local OpenAI-compatible stand-in server for offline benchmarks.
+
+Implements ``/v1/chat/completions`` (plain, SSE streaming and tool calls) and
+``/v1/embeddings`` with latency and rate limits drawn from a
+``SimulationProfile``, so the real ``OpenAILLM`` client path can be measured
+without the network.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import struct
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from agentblueprint_core.llm import SimulationProfile
+from agentblueprint_cli.httpserver import HTTPServer, Request, Response, StreamingResponse, sse_event
+
+class MockOpenAIServer:
+    """
+    Serves canned OpenAI-style responses with simulated timing.
+
+    Args:
+        profile: Latency, response length and fault rates per request.
+        max_concurrency: Requests beyond this many in flight get a 429.
+        embedding_dim: Length of returned embedding vectors.
+    """
+
+    def __init__(self, profile: Optional[SimulationProfile] = None, max_concurrency: Optional[int] = None,
+                 embedding_dim: int = 256, host: str = "127.0.0.1", port: int = 8000):
+        self.profile = profile or SimulationProfile()
+        self.max_concurrency = max_concurrency
+        self.embedding_dim = embedding_dim
+        self.http = HTTPServer(self.handle, host=host, port=port)
+        self._active = 0
+        self._rng = random.Random(self.profile.seed)
+        self.request_count = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.http.host}:{self.http.port}/v1"
+
+    async def handle(self, request: Request) -> Union[Response, StreamingResponse]:
+        routes = {
+            "/v1/chat/completions": self.chat_completions,
+            "/v1/embeddings": self.embeddings,
+        }
+        route = routes.get(request.path)
+        if route is None:
+            return self._error(404, f"Unknown path {request.path}", "invalid_request_error")
+        if request.method != "POST":
+            return self._error(405, "Use POST", "invalid_request_error")
+
+        self.request_count += 1
+        p = self.profile
+        limited = self.max_concurrency is not None and self._active >= self.max_concurrency
+        if limited or self._rng.random() < p.rate_limit_rate:
+            headers = {"Retry-After": f"{p.retry_after:g}"} if p.retry_after is not None else {}
+            return self._error(429, "Rate limit reached", "rate_limit_error", headers)
+        if self._rng.random() < p.error_rate:
+            return self._error(500, "Simulated server error", "server_error")
+
+        self._active += 1
+        held = False
+        try:
+            if self._rng.random() < p.timeout_rate:
+                await self._sleep(p.timeout_after)
+                return self._error(503, "Simulated upstream timeout", "timeout")
+            response = await route(request.json())
+            if isinstance(response, StreamingResponse):
+                # A stream occupies its slot until the last chunk is sent
+                response.chunks = self._hold_slot(response.chunks)
+                held = True
+            return response
+        finally:
+            if not held:
+                self._active -= 1
+
+    async def _hold_slot(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            self._active -= 1
+
+    async def chat_completions(self, body: Dict[str, Any]) -> Union[Response, StreamingResponse]:
+        model = body.get("model", "mock")
+        messages = body.get("messages", [])
+        prompt = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        prompt_tokens = sum(len(str(m.get("content") or "").split()) for m in messages)
+
+        tool_call = self._tool_call(body, prompt)
+        words = self._words(model, prompt)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+        }
+
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(self._stream(completion_id, created, model, words, tool_call,
+                                                  usage if include_usage else None))
+
+        await self._sleep(self.profile.ttft.sample(self._rng) + self._generation_time(len(words)))
+        message: Dict[str, Any] = {"role": "assistant", "content": None if tool_call else " ".join(words)}
+        if tool_call:
+            message["tool_calls"] = [tool_call]
+        return Response.json({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_call else "stop",
+            }],
+            "usage": usage,
+        })
+
+    async def embeddings(self, body: Dict[str, Any]) -> Response:
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dim = int(body.get("dimensions") or self.embedding_dim)
+        await self._sleep(self.profile.ttft.sample(self._rng))
+        data = [
+            {"object": "embedding", "index": i, "embedding": self._vector(str(text), dim)}
+            for i, text in enumerate(inputs)
+        ]
+        tokens = sum(len(str(text).split()) for text in inputs)
+        return Response.json({
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "mock"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    async def _stream(self, completion_id: str, created: int, model: str, words: List[str],
+                      tool_call: Optional[Dict[str, Any]], usage: Optional[Dict[str, int]]) -> AsyncIterator[bytes]:
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> bytes:
+            return sse_event({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            })
+
+        await self._sleep(self.profile.ttft.sample(self._rng))
+        yield chunk({"role": "assistant", "content": ""})
+        if tool_call:
+            yield chunk({"tool_calls": [{"index": 0, **tool_call}]})
+            yield chunk({}, "tool_calls")
+        else:
+            per_token = self._generation_time(1)
+            for i, word in enumerate(words):
+                if i:
+                    await self._sleep(per_token)
+                yield chunk({"content": word if i == 0 else " " + word})
+            yield chunk({}, "stop")
+        if usage is not None:
+            yield sse_event({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [],
+                "usage": usage,
+            })
+        yield sse_event("[DONE]")
+
+    def _tool_call(self, body: Dict[str, Any], prompt: str) -> Optional[Dict[str, Any]]:
+        """Call the first offered tool unless a tool result is already in the conversation."""
+        tools = body.get("tools") or []
+        if not tools or body.get("tool_choice") == "none":
+            return None
+        if any(m.get("role") == "tool" for m in body.get("messages", [])):
+            return None
+        function = tools[0].get("function", {})
+        return {
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": function.get("name", "tool"), "arguments": json.dumps({"input": prompt})},
+        }
+
+    def _words(self, model: str, prompt: str) -> List[str]:
+        n = max(1, int(round(self.profile.response_tokens.sample(self._rng))))
+        words = [f"MOCK ({model}):"] + prompt.split()
+        while len(words) < n:
+            words.append("lorem")
+        return words[:n]
+
+    def _generation_time(self, tokens: int) -> float:
+        tps = self.profile.tokens_per_second
+        return tokens / tps if tps > 0 else 0.0
+
+    async def _sleep(self, seconds: float) -> None:
+        if seconds > 0 and self.profile.time_scale > 0:
+            await asyncio.sleep(seconds * self.profile.time_scale)
+
+    @staticmethod
+    def _vector(text: str, dim: int) -> List[float]:
+        out: List[float] = []
+        counter = 0
+        while len(out) < dim:
+            digest = hashlib.sha256(f"{counter}:{text}".encode()).digest()
+            out.extend(v / 2**31 for v in struct.unpack("<8i", digest))
+            counter += 1
+        return out[:dim]
+
+    @staticmethod
+    def _error(status: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        return Response.json({"error": {"message": message, "type": error_type, "code": None}},
+                             status=status, headers=headers)
@@ -0,0 +1,185 @@
+"""
+Long-lived HTTP server for AgentBlueprint workflows.
+
+Workflows are parsed once at startup and kept warm together with their
+tools and provider clients. Requests are handled on an asyncio core; the
+(synchronous) workflow runs are dispatched to a bounded worker pool.
+
+Endpoints:
+    GET  /health                    Liveness and drain state.
+    GET  /workflows                 Names of the served workflows.
+    POST /workflows/{name}/run      Run and return ``{"result", "usage"}``.
+    POST /workflows/{name}/stream   Run and stream events over SSE.
+"""
+import asyncio
+import concurrent.futures
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from agentblueprint_core import CancellationToken, UsageTracker, Workflow, cancellation_scope
+from agentblueprint_core.callbacks import CallbackHandler
+from agentblueprint_cli.httpserver import HTTPServer, Request, Response, StreamingResponse, sse_event
+
+_DONE = object()
+
+class QueueCallbackHandler(CallbackHandler):
+    """Forwards workflow events from worker threads into an asyncio queue."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self.loop = loop
+        self.queue = queue
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, (event, data))
+
+    def on_workflow_start(self, name: str, input_data: Any) -> None:
+        self.emit("workflow_start", {"name": name})
+
+    def on_agent_start(self, name: str, input_text: str) -> None:
+        self.emit("agent_start", {"name": name, "input": input_text})
+
+    def on_agent_end(self, name: str, response: str) -> None:
+        self.emit("agent_end", {"name": name, "response": response})
+
+    def on_node_start(self, node_id: str, input_text: str) -> None:
+        self.emit("node_start", {"node": node_id})
+
+    def on_node_end(self, node_id: str, status: str, output: Any) -> None:
+        self.emit("node_end", {"node": node_id, "status": status})
+
+    def on_tool_start(self, name: str, input_args: Any) -> None:
+        self.emit("tool_start", {"name": name, "input": repr(input_args)})
+
+    def on_tool_end(self, name: str, output: str) -> None:
+        self.emit("tool_end", {"name": name, "output": str(output)})
+
+    def on_llm_token(self, name: str, token: str) -> None:
+        self.emit("token", {"name": name, "token": token})
+
+class WorkflowServer:
+    """
+    Serve pre-parsed workflows over HTTP.
+
+    Args:
+        workflows: Workflow name to parsed Workflow.
+        max_concurrency: Worker threads running workflows; further requests queue.
+    """
+
+    def __init__(self, workflows: Dict[str, Workflow], max_concurrency: int = 32,
+                 host: str = "127.0.0.1", port: int = 8080):
+        self.workflows = workflows
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="agentblueprint-serve")
+        self.http = HTTPServer(self.handle, host=host, port=port)
+        self.draining = False
+
+    @classmethod
+    def from_files(cls, paths: List[str], **kwargs: Any) -> "WorkflowServer":
+        """Parse each config once; the workflow is named after the file stem."""
+        from agentblueprint_config import load_and_parse
+
+        workflows = {Path(p).stem: load_and_parse(p, use_cache=True) for p in paths}
+        return cls(workflows, **kwargs)
+
+    async def handle(self, request: Request) -> Union[Response, StreamingResponse]:
+        if request.path == "/health":
+            return Response.json({"status": "draining" if self.draining else "ok"},
+                                 status=503 if self.draining else 200)
+        if request.path == "/workflows":
+            return Response.json({"workflows": sorted(self.workflows)})
+
+        parts = request.path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "workflows" or parts[2] not in ("run", "stream"):
+            return Response.json({"error": f"Unknown path {request.path}"}, status=404)
+        if request.method != "POST":
+            return Response.json({"error": "Use POST"}, status=405)
+        workflow = self.workflows.get(parts[1])
+        if workflow is None:
+            return Response.json({"error": f"Unknown workflow {parts[1]}"}, status=404)
+        if self.draining:
+            return Response.json({"error": "Server is shutting down"}, status=503)
+
+        try:
+            body = request.json()
+        except ValueError:
+            return Response.json({"error": "Body must be JSON"}, status=400)
+        if "input" not in body:
+            return Response.json({"error": "Missing 'input'"}, status=400)
+
+        if parts[2] == "stream":
+            return StreamingResponse(self._stream(workflow, body["input"]))
+        try:
+            result, usage = await self._run(workflow, body["input"], [])
+        except Exception as e:
+            return Response.json({"error": str(e), "type": type(e).__name__}, status=500)
+        return Response.json({"result": result, "usage": usage})
+
+    async def _run(self, workflow: Workflow, initial_input: Any, callbacks: List[CallbackHandler],
+                   token: Optional[CancellationToken] = None) -> Tuple[Any, Dict[str, Any]]:
+        token = token or CancellationToken()
+
+        def target() -> Tuple[Any, Dict[str, Any]]:
+            with cancellation_scope(token), UsageTracker().activate() as usage:
+                result = workflow.run(initial_input, callbacks=callbacks)
+            return result, usage.summary()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, target)
+        except asyncio.CancelledError:
+            # The request was abandoned (e.g. the drain timed out): stop the run on its worker too
+            token.cancel("request cancelled")
+            raise
+
+    async def _stream(self, workflow: Workflow, initial_input: Any) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        handler = QueueCallbackHandler(loop, queue)
+        token = CancellationToken()
+
+        async def runner() -> None:
+            try:
+                result, usage = await self._run(workflow, initial_input, [handler], token)
+                queue.put_nowait(("result", {"result": result, "usage": usage}))
+            except Exception as e:
+                queue.put_nowait(("error", {"error": str(e), "type": type(e).__name__}))
+            queue.put_nowait(_DONE)
+
+        task = asyncio.create_task(runner())
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                event, data = item
+                yield sse_event(data, event=event)
+        finally:
+            if not task.done():
+                # The client went away: stop spending tokens on the run
+                token.cancel("client disconnected")
+            await task
+
+    async def serve(self, drain_timeout: float = 30.0, on_ready: Optional[Any] = None) -> None:
+        """Serve until SIGINT/SIGTERM, then drain in-flight requests."""
+        import signal
+
+        await self.http.start()
+        if on_ready is not None:
+            on_ready(self)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        serving = asyncio.create_task(self.http.serve_forever())
+        await stop.wait()
+        await self.shutdown(drain_timeout)
+        serving.cancel()
+
+    async def shutdown(self, drain_timeout: float = 30.0) -> None:
+        """Refuse new runs, wait for in-flight ones, then cancel the rest and stop the workers."""
+        self.draining = True
+        await self.http.shutdown(drain_timeout)
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -3,7 +3,8 @@ Configuration management for AgentBlueprint.
 """
 
 from agentblueprint_config.loader import load_and_parse, ConfigLoader
+from agentblueprint_config.cache import WorkflowCache
 
 __version__ = "0.1.0"
 
-__all__ = ["load_and_parse", "ConfigLoader"]
+__all__ = ["load_and_parse", "ConfigLoader", "WorkflowCache"]
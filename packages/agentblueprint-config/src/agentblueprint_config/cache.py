@@ -0,0 +1,112 @@
+"""
+Compiled workflow cache for AgentBlueprint.
+
+Parsing a large config (YAML decoding plus pydantic validation of every
+agent and node) can take seconds. The cache stores the parsed Workflow in
+pickle form, keyed by the config file's content hash, a fingerprint of the
+installed package sources and the registered tool names, and reloads it
+without re-validation.
+
+The cache lives in a per-user directory; never point it at a location other
+users can write to, since entries are unpickled.
+"""
+import functools
+import hashlib
+import importlib.util
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from agentblueprint_core import ToolRegistry, Workflow
+
+CACHE_ENV = "AGENTBLUEPRINT_CACHE_DIR"
+# Packages whose classes end up in pickled workflows
+FINGERPRINT_PACKAGES: Tuple[str, ...] = ("agentblueprint_core", "agentblueprint_config", "agentblueprint_tools")
+
+def default_cache_dir() -> Path:
+    """``$AGENTBLUEPRINT_CACHE_DIR``, else ``$XDG_CACHE_HOME/agentblueprint/workflows``."""
+    if os.environ.get(CACHE_ENV):
+        return Path(os.environ[CACHE_ENV])
+    base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "agentblueprint" / "workflows"
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint() -> str:
+    """
+    Digest of the path, size and mtime of every source file of the packages.
+
+    Package versions stay the same across code changes; a pickle written by
+    older code would load as models missing fields added since.
+    """
+    h = hashlib.sha256()
+    for name in FINGERPRINT_PACKAGES:
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            continue
+        for root in spec.submodule_search_locations or []:
+            for source in sorted(Path(root).rglob("*.py")):
+                stat = source.stat()
+                h.update(f"{source}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    return h.hexdigest()
+
+class WorkflowCache:
+    """
+    Content-addressed store of parsed workflows.
+
+    Example:
+        >>> cache = WorkflowCache()
+        >>> workflow = cache.load("workflow.yaml", parse)  # doctest: +SKIP
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+
+    def key(self, content: bytes) -> str:
+        """Digest of everything the parsed result depends on."""
+        h = hashlib.sha256(content)
+        h.update(f"\0{code_fingerprint()}".encode())
+        h.update(f"\0{sys.version_info[:2]}\0{pickle.HIGHEST_PROTOCOL}".encode())
+        h.update(("\0" + ",".join(sorted(ToolRegistry.names()))).encode())
+        return h.hexdigest()
+
+    def _entry(self, path: Path, key: str) -> Path:
+        path_id = hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:16]
+        return self.cache_dir / f"{path_id}-{key[:32]}.pkl"
+
+    def load(self, path: str, parse: Callable[[bytes, Path], Workflow]) -> Workflow:
+        """
+        Return the cached workflow for ``path``, parsing and storing it on a miss.
+
+        ``parse`` receives the file content and path. Corrupt or unreadable
+        entries are treated as misses.
+        """
+        p = Path(path)
+        content = p.read_bytes()
+        entry = self._entry(p, self.key(content))
+        if entry.exists():
+            try:
+                with open(entry, "rb") as f:
+                    return pickle.load(f)
+            except Exception:
+                pass
+
+        workflow = parse(content, p)
+        self._store(entry, workflow)
+        return workflow
+
+    def _store(self, entry: Path, workflow: Workflow) -> None:
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Drop entries for older versions of the same file
+            prefix = entry.name.split("-", 1)[0]
+            for stale in self.cache_dir.glob(f"{prefix}-*.pkl"):
+                stale.unlink(missing_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump(workflow, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            # Caching is best effort; unpicklable tools simply skip it
+            tmp.unlink(missing_ok=True)
@@ -5,11 +5,12 @@ import yaml
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from agentblueprint_core import Agent, Workflow, SequentialWorkflow, ParallelWorkflow, GraphWorkflow, WorkflowNode, ToolRegistry
-# In a real scenario we'd dynamic load tools, but for this proof of concept we'll import known ones or just rely on registry if they were pre-registered.
-# For simplicity in this phase, we will map string names to classes we know or registered tools.
+from agentblueprint_core import Agent, Workflow, SequentialWorkflow, ParallelWorkflow, GraphWorkflow, WorkflowNode, Route, LoopSpec, MapSpec, ReduceSpec, Projection, ToolRegistry, ScopedToolRegistry, get_executor
+
+# libyaml's C loader is several times faster than the pure-Python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 class ConfigLoader:
     @staticmethod
@@ -19,54 +20,112 @@ class ConfigLoader:
         if not p.exists():
             raise FileNotFoundError(f"Config file not found: {path}")
             
-        with open(p, "r") as f:
-            if p.suffix in (".yaml", ".yml"):
-                return yaml.safe_load(f)
-            elif p.suffix == ".json":
-                return json.load(f)
-            else:
-                raise ValueError(f"Unsupported config format: {p.suffix}")
+        return ConfigLoader.loads(p.read_bytes(), p.suffix)
+
+    @staticmethod
+    def loads(content: bytes, suffix: str) -> Dict[str, Any]:
+        """Decode configuration content; ``suffix`` selects the format."""
+        if suffix in (".yaml", ".yml"):
+            return yaml.load(content, Loader=YAML_LOADER)
+        elif suffix == ".json":
+            return json.loads(content)
+        else:
+            raise ValueError(f"Unsupported config format: {suffix}")
 
     @staticmethod
-    def parse_workflow(config: Dict[str, Any]) -> Workflow:
+    def parse_workflow(config: Dict[str, Any], registry: Optional[ScopedToolRegistry] = None) -> Workflow:
         """
         Parse a configuration dictionary into a Workflow object.
+
+        Tool names are resolved against ``registry``, by default a fresh
+        snapshot of the global ToolRegistry; only referenced tools are
+        instantiated.
         
         Expected structure:
         agents:
           agent1:
-            model: ...
+            model: ...        # or an ordered fallback list [primary, secondary]
             system_prompt: ...
             tools: []
+            retry:            # optional, see RetryPolicy; calls are not retried without it
+              max_attempts: 3
+              hedge_percentile: 0.95
+            circuit_breaker:  # optional, see CircuitBreakerConfig
+              error_rate_threshold: 0.5
+            coalesce: true    # optional, share identical in-flight requests
         workflow:
           type: sequential
+          token_budget: 50000   # optional, stop scheduling agents once spent
+          executor: threads     # optional: threads | asyncio | processes, or {type, max_workers}
+          timeout: 120          # optional end-to-end deadline in seconds
           steps:
             - agent: agent1
+
+        Graph nodes may also route or loop:
+          - id: triage
+            agent: classifier   # optional for routers
+            routes:
+              - {contains: bug, targets: [fix]}
+              - {default: true, targets: [answer]}
+          - id: draft
+            agent: writer
+            loop: {max_iterations: 3, critic: reviewer, until: {contains: APPROVED}}
+
+        and fan out over large inputs:
+          - id: summarize_chunks
+            agent: summarizer
+            map: {split: lines, chunk_size: 200, max_concurrency: 8}   # or split: agent, splitter: name
+          - id: combine
+            agent: combiner
+            depends_on: [summarize_chunks]
+            reduce: {fan_in: 4, max_input_tokens: 6000}
+
+        and pass on only part of an output:
+          - id: review
+            agent: reviewer
+            output_type: json
+          - id: report
+            agent: writer
+            depends_on:
+              - {node: review, select: $.findings, max_tokens: 500}   # or summarize: agent
         """
         agents_config = config.get("agents", {})
         workflow_config = config.get("workflow", {})
+        registry = registry or ToolRegistry.scoped()
         
         # 1. Instantiate Agents
         agents = {}
         for name, agent_data in agents_config.items():
-            # Resolve tools - simplified for now
-            # In future: look up from ToolRegistry by name
             tool_names = agent_data.get("tools", [])
             tools = []
             for tool_name in tool_names:
-                t = ToolRegistry.get(tool_name)
+                t = registry.get(tool_name)
                 if t:
                     tools.append(t)
             
+            options = {}
+            for key in ("retry", "circuit_breaker", "coalesce", "timeout"):
+                if key in agent_data:
+                    options[key] = agent_data[key]
+
             agents[name] = Agent(
                 name=name,
                 model=agent_data.get("model", "mock"),
                 system_prompt=agent_data.get("system_prompt", ""),
-                tools=tools
+                tools=tools,
+                **options
             )
             
         # 2. Instantiate Workflow
         wf_type = workflow_config.get("type", "sequential")
+        wf_options = {}
+        if workflow_config.get("token_budget") is not None:
+            wf_options["token_budget"] = workflow_config["token_budget"]
+        if workflow_config.get("timeout") is not None:
+            wf_options["timeout"] = workflow_config["timeout"]
+        if workflow_config.get("executor") is not None:
+            wf_options["executor"] = workflow_config["executor"]
+            get_executor(wf_options["executor"])  # fail fast on unknown executor types
         
         if wf_type == "sequential":
             steps = workflow_config.get("steps", [])
@@ -80,7 +139,8 @@ class ConfigLoader:
             
             return SequentialWorkflow(
                 name="generated_workflow",
-                agents=sequence
+                agents=sequence,
+                **wf_options
             )
         elif wf_type == "parallel":
             # Parallel workflow expects a list of agent names
@@ -94,7 +154,8 @@ class ConfigLoader:
             
             return ParallelWorkflow(
                 name="generated_parallel_workflow",
-                agents=parallel_agents
+                agents=parallel_agents,
+                **wf_options
             )
         elif wf_type == "graph":
             nodes_config = workflow_config.get("nodes", [])
@@ -103,26 +164,97 @@ class ConfigLoader:
             for node_data in nodes_config:
                 node_id = node_data.get("id")
                 agent_name = node_data.get("agent")
-                depends_on = node_data.get("depends_on", [])
+                depends_on = []
+                projections = {}
+                for dep in node_data.get("depends_on", []):
+                    if isinstance(dep, str):
+                        depends_on.append(dep)
+                        continue
+                    # {node: id, select: $.path, max_tokens: n, summarize: agent}
+                    edge = dict(dep)
+                    dep_id = edge.pop("node", None)
+                    if not dep_id:
+                        raise ValueError(f"Dependency of graph node {node_id} missing 'node'")
+                    summarizer = edge.pop("summarize", None)
+                    if summarizer is not None:
+                        if summarizer not in agents:
+                            raise ValueError(f"Unknown summarize agent in graph node {node_id}: {summarizer}")
+                        edge["summarize"] = agents[summarizer]
+                    depends_on.append(dep_id)
+                    projections[dep_id] = Projection(**edge)
+                
+                routes = node_data.get("routes", [])
                 
                 if not node_id:
                     raise ValueError("Graph node missing 'id'")
-                if not agent_name or agent_name not in agents:
+                # Routers may decide on their input alone
+                if (agent_name or not routes) and agent_name not in agents:
                     raise ValueError(f"Unknown agent in graph node {node_id}: {agent_name}")
                 
+                loop = None
+                if node_data.get("loop") is not None:
+                    loop_data = dict(node_data["loop"])
+                    critic = loop_data.pop("critic", None)
+                    if critic is not None:
+                        if critic not in agents:
+                            raise ValueError(f"Unknown critic agent in graph node {node_id}: {critic}")
+                        loop_data["critic"] = agents[critic]
+                    loop = LoopSpec(**loop_data)
+                
+                map_spec = None
+                if node_data.get("map") is not None:
+                    map_data = dict(node_data["map"])
+                    splitter = map_data.pop("splitter", None)
+                    if splitter is not None:
+                        if splitter not in agents:
+                            raise ValueError(f"Unknown splitter agent in graph node {node_id}: {splitter}")
+                        map_data["splitter"] = agents[splitter]
+                    map_spec = MapSpec(**map_data)
+                
                 nodes.append(WorkflowNode(
                     id=node_id,
-                    agent=agents[agent_name],
-                    depends_on=depends_on
+                    agent=agents[agent_name] if agent_name else None,
+                    depends_on=depends_on,
+                    timeout=node_data.get("timeout"),
+                    critical=node_data.get("critical", True),
+                    routes=[Route(**route) for route in routes],
+                    loop=loop,
+                    map=map_spec,
+                    reduce=ReduceSpec(**node_data["reduce"]) if node_data.get("reduce") is not None else None,
+                    output_type=node_data.get("output_type", "text"),
+                    projections=projections,
                 ))
             
             return GraphWorkflow(
                 name="generated_graph_workflow",
-                nodes=nodes
+                nodes=nodes,
+                on_failure=workflow_config.get("on_failure", "fail_fast"),
+                skip_noncritical_below=workflow_config.get("skip_noncritical_below"),
+                checkpoint_dir=workflow_config.get("checkpoint_dir"),
+                memoize=workflow_config.get("memoize", False),
+                artifact_dir=workflow_config.get("artifact_dir"),
+                outputs=workflow_config.get("outputs"),
+                spill_threshold=workflow_config.get("spill_threshold"),
+                spill_dir=workflow_config.get("spill_dir"),
+                **wf_options
             )
         else:
             raise NotImplementedError(f"Workflow type '{wf_type}' not supported yet.")
 
-def load_and_parse(path: str) -> Workflow:
-    data = ConfigLoader.load(path)
-    return ConfigLoader.parse_workflow(data)
+def load_and_parse(path: str, use_cache: bool = False, cache_dir: Optional[Path] = None) -> Workflow:
+    """
+    Load a config file and parse it into a Workflow.
+
+    With ``use_cache``, the parsed workflow is stored in a WorkflowCache and
+    later loads of an unchanged file skip decoding and validation.
+    """
+    if not use_cache:
+        data = ConfigLoader.load(path)
+        return ConfigLoader.parse_workflow(data)
+
+    from agentblueprint_config.cache import WorkflowCache
+
+    if not Path(path).exists():
+        raise FileNotFoundError(f"Config file not found: {path}")
+    parse = lambda content, p: ConfigLoader.parse_workflow(ConfigLoader.loads(content, p.suffix))
+    return WorkflowCache(cache_dir).load(path, parse)
@@ -5,11 +5,37 @@ This package provides the fundamental building blocks for creating
 multi-agent workflows including tools, agents, and workflows.
 """
 
-from agentblueprint_core.tools import Tool, ToolRegistry
+from agentblueprint_core.tools import Tool, ToolRegistry, ScopedToolRegistry
 from agentblueprint_core.agent import Agent
-from agentblueprint_core.workflow import Workflow, SequentialWorkflow, ParallelWorkflow, GraphWorkflow, WorkflowNode
-from agentblueprint_core.memory import Memory, SimpleMemory, NoOpMemory
-from agentblueprint_core.llm import LLMProvider, MockLLM, OpenAILLM, LLMFactory
+from agentblueprint_core.executors import (
+    Executor, ThreadExecutor, AsyncioExecutor, ProcessExecutor, get_executor, use_executor,
+)
+from agentblueprint_core.workflow import Workflow, SequentialWorkflow, ParallelWorkflow, GraphWorkflow, WorkflowNode, Condition, Route, LoopSpec, MapSpec, ReduceSpec, Projection, GraphResult, WorkflowRunError
+from agentblueprint_core.memory import Memory, SimpleMemory, CompactMemory, NoOpMemory
+from agentblueprint_core.sessions import SessionMemoryManager, SessionStore
+from agentblueprint_core.llm import (
+    LLMProvider, MockLLM, OpenAILLM, LLMFactory,
+    SimulatedLLM, SimulationProfile, Distribution,
+    LLMError, RateLimitError, LLMTimeoutError,
+)
+from agentblueprint_core.resilience import (
+    RetryPolicy, ResilientLLM, LatencyTracker,
+    CircuitBreaker, CircuitBreakerConfig, CircuitOpenError, FallbackLLM,
+)
+from agentblueprint_core.singleflight import SingleFlight, CoalescingLLM
+from agentblueprint_core.usage import TokenUsage, UsageTracker, estimate_tokens, record_usage
+from agentblueprint_core.process_pool import ToolProcessPool, ToolTimeoutError
+from agentblueprint_core.context import (
+    CancellationToken, DeadlineExceededError, RunCancelledError, cancellation_scope, check_cancelled,
+    deadline_scope, remaining_time,
+)
+from agentblueprint_core.runstore import RunStore
+from agentblueprint_core.artifacts import ArtifactStore, node_key
+from agentblueprint_core.jobqueue import Job, JobQueue, JobWorker
+from agentblueprint_core.pipeline import Pipeline
+from agentblueprint_core.results import ResultStore
+from agentblueprint_core.compiler import ExecutionPlan, compile_workflow
+from agentblueprint_core.graph import CompactGraph, GraphBuilder
 from agentblueprint_core.callbacks import CallbackHandler, CallbackManager
 
 __version__ = "0.1.0"
@@ -17,19 +43,77 @@ __version__ = "0.1.0"
 __all__ = [
     "Tool",
     "ToolRegistry",
+    "ScopedToolRegistry",
+    "ToolProcessPool",
+    "ToolTimeoutError",
     "Agent",
     "Workflow",
     "SequentialWorkflow",
+    "Pipeline",
     "ParallelWorkflow",
     "GraphWorkflow",
     "WorkflowNode",
+    "Condition",
+    "Route",
+    "LoopSpec",
+    "MapSpec",
+    "ReduceSpec",
+    "Projection",
+    "GraphResult",
+    "WorkflowRunError",
+    "RunStore",
+    "ResultStore",
+    "ExecutionPlan",
+    "compile_workflow",
+    "CompactGraph",
+    "GraphBuilder",
+    "CancellationToken",
+    "RunCancelledError",
+    "cancellation_scope",
+    "check_cancelled",
+    "DeadlineExceededError",
+    "deadline_scope",
+    "remaining_time",
+    "ArtifactStore",
+    "node_key",
+    "Executor",
+    "ThreadExecutor",
+    "AsyncioExecutor",
+    "ProcessExecutor",
+    "get_executor",
+    "use_executor",
     "Memory",
     "SimpleMemory",
+    "CompactMemory",
+    "SessionMemoryManager",
+    "SessionStore",
     "NoOpMemory",
     "LLMProvider",
     "MockLLM",
     "OpenAILLM",
     "LLMFactory",
+    "SimulatedLLM",
+    "SimulationProfile",
+    "Distribution",
+    "LLMError",
+    "RateLimitError",
+    "LLMTimeoutError",
+    "RetryPolicy",
+    "ResilientLLM",
+    "LatencyTracker",
+    "CircuitBreaker",
+    "CircuitBreakerConfig",
+    "CircuitOpenError",
+    "FallbackLLM",
+    "SingleFlight",
+    "CoalescingLLM",
+    "TokenUsage",
+    "UsageTracker",
+    "estimate_tokens",
+    "record_usage",
+    "Job",
+    "JobQueue",
+    "JobWorker",
     "CallbackHandler",
     "CallbackManager",
 ]
@@ -1,60 +1,109 @@
 """
 Agent implementation for AgentBlueprint.
 """
-from typing import Any, Optional
+from typing import Any, List, Optional, Union
 from pydantic import BaseModel, Field
 
+from agentblueprint_core.context import check_cancelled, deadline_scope
 from agentblueprint_core.tools import Tool
 from agentblueprint_core.memory import Memory
+from agentblueprint_core.resilience import CircuitBreakerConfig, RetryPolicy
+from agentblueprint_core.sessions import SessionMemoryManager
 
 class Agent(BaseModel):
     """
     Represents an AI Agent with a model, system prompt, and tools.
+
+    ``model`` may be an ordered list of model strings; later entries are used
+    while the circuit breakers of earlier ones are open. An agent serving
+    many users sets ``sessions`` and passes ``session_id`` to ``run`` to
+    give each user their own memory.
     """
     name: str
-    model: str
+    model: Union[str, List[str]]
     system_prompt: str = ""
     tools: list[Tool] = Field(default_factory=list)
     memory: Optional[Memory] = None
+    sessions: Optional[SessionMemoryManager] = None
+    retry: Optional[RetryPolicy] = None
+    circuit_breaker: Optional[CircuitBreakerConfig] = None
+    coalesce: bool = False
+    timeout: Optional[float] = None
     
     class Config:
         arbitrary_types_allowed = True
 
-    def run(self, input_text: str, callbacks: list = None) -> str:
+    def run(self, input_text: str, callbacks: list = None, session_id: Optional[str] = None) -> str:
         """
         Run the agent with the given input.
+
+        With ``retry`` set, provider calls go through a ResilientLLM using
+        that policy; by default each call is made once. Provider failures are raised as
+        ``LLMError`` rather than returned as text. With ``coalesce``,
+        identical concurrent requests share one in-flight call. With
+        ``timeout``, the run (provider calls included) must finish within that
+        many seconds or ``DeadlineExceededError`` is raised. With
+        ``session_id``, the session's memory from ``sessions`` is used instead
+        of ``memory``, and runs of the same session are serialized.
         """
+        with deadline_scope(self.timeout):
+            if session_id is None:
+                return self._run(input_text, callbacks, self.memory)
+            if self.sessions is None:
+                raise ValueError(f"Agent {self.name} has no session manager; set 'sessions' to use session_id")
+            with self.sessions.session(session_id) as memory:
+                return self._run(input_text, callbacks, memory)
+
+    def _run(self, input_text: str, callbacks: list, memory: Optional[Memory]) -> str:
         from agentblueprint_core.callbacks import CallbackManager
         cm = CallbackManager(callbacks)
         
+        check_cancelled()
         cm.on_agent_start(self.name, input_text)
         
         # Initialize memory if needed
         # 1. Add input to memory
-        if self.memory:
-            self.memory.add("user", input_text)
+        if memory is not None:
+            memory.add("user", input_text)
             
         # 2. Get context (for real LLM usage)
-        context = self.memory.get_context() if self.memory else ""
-        history = self.memory.get_history() if self.memory else []
+        context = memory.get_context() if memory is not None else ""
+        history = memory.get_history() if memory is not None else []
         
         # 3. Generate response using LLM Provider
         from agentblueprint_core.llm import LLMFactory
+        from agentblueprint_core.resilience import ResilientLLM
+        from agentblueprint_core.singleflight import CoalescingLLM
+        from agentblueprint_core.usage import usage_scope
         
-        try:
-            provider = LLMFactory.create(self.model)
-            response = provider.generate(
-                prompt=input_text,
-                system_prompt=self.system_prompt,
-                tools=self.tools,
-                history=history # Pass history
-            )
-        except Exception as e:
-            response = f"Agent Error: {str(e)}"
+        key = self.model if isinstance(self.model, str) else "|".join(self.model)
+        provider = LLMFactory.create(self.model, circuit_breaker=self.circuit_breaker)
+        if self.retry is not None:
+            provider = ResilientLLM(provider, self.retry, key=key)
+        if self.coalesce:
+            # Outside the retry layer so hedged duplicates are not merged back
+            provider = CoalescingLLM(provider, key=key)
+        with usage_scope(agent=self.name):
+            if cm.wants_tokens:
+                chunks = []
+                for chunk in provider.stream(input_text, system_prompt=self.system_prompt,
+                                             tools=self.tools, history=history, callbacks=cm):
+                    check_cancelled()
+                    chunks.append(chunk)
+                    cm.on_llm_token(self.name, chunk)
+                response = "".join(chunks)
+            else:
+                response = provider.generate(
+                    prompt=input_text,
+                    system_prompt=self.system_prompt,
+                    tools=self.tools,
+                    history=history, # Pass history
+                    callbacks=cm,
+                )
             
         # 4. Add output to memory
-        if self.memory:
-            self.memory.add("assistant", response)
+        if memory is not None:
+            memory.add("assistant", response)
 
         cm.on_agent_end(self.name, response)
         
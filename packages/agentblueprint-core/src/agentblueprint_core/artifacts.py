@@ -0,0 +1,80 @@
+"""
+Content-addressed artifact store for memoizing graph nodes.
+
+A node's key hashes everything its output depends on: the agent's model,
+system prompt and tool names, and the node's resolved input (which embeds
+the outputs of its dependencies). When a prompt changes, that node's key
+changes, its new output changes the input of everything downstream, and
+all other nodes are reused from the store.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from agentblueprint_core.agent import Agent
+from agentblueprint_core.memory import NoOpMemory
+
+ARTIFACT_DIR_ENV = "AGENTBLUEPRINT_ARTIFACT_DIR"
+
+def default_artifact_dir() -> Path:
+    """``$AGENTBLUEPRINT_ARTIFACT_DIR``, else ``$XDG_CACHE_HOME/agentblueprint/artifacts``."""
+    if os.environ.get(ARTIFACT_DIR_ENV):
+        return Path(os.environ[ARTIFACT_DIR_ENV])
+    base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "agentblueprint" / "artifacts"
+
+def node_key(agent: Agent, node_input: str) -> Optional[str]:
+    """
+    Content hash of an agent run, or None when the run cannot be memoized.
+
+    Agents with memory or sessions depend on conversation state outside
+    the key, so they always run.
+    """
+    if (agent.memory is not None and not isinstance(agent.memory, NoOpMemory)) or agent.sessions is not None:
+        return None
+    payload = json.dumps({
+        "model": agent.model,
+        "system_prompt": agent.system_prompt,
+        "tools": sorted(t.name for t in agent.tools),
+        "input": node_input,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ArtifactStore:
+    """
+    Directory of node results keyed by content hash.
+
+    Example:
+        >>> store = ArtifactStore("/tmp/artifacts")
+        >>> store.put("ab12", "output")
+        >>> store.get("ab12")
+        (True, 'output')
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root is not None else default_artifact_dir()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """``(True, result)`` on a hit, ``(False, None)`` otherwise."""
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return True, json.load(f)["result"]
+        except (OSError, ValueError, KeyError):
+            return False, None
+
+    def put(self, key: str, result: Any) -> None:
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"result": result}, f, default=str)
+            os.replace(tmp, path)
+        except OSError:
+            # Memoization is best effort
+            tmp.unlink(missing_ok=True)
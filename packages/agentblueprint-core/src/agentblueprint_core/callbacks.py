@@ -25,6 +25,14 @@ class CallbackHandler(ABC):
         """Called when an agent finishes execution."""
         pass
         
+    def on_node_start(self, node_id: str, input_text: str) -> None:
+        """Called when a graph node is scheduled."""
+        pass
+
+    def on_node_end(self, node_id: str, status: str, output: Any) -> None:
+        """Called when a graph node finishes; ``status`` is e.g. ``done`` or ``failed``."""
+        pass
+
     def on_tool_start(self, name: str, input_args: Any) -> None:
         """Called when a tool triggers."""
         pass
@@ -33,6 +41,14 @@ class CallbackHandler(ABC):
         """Called when a tool finishes."""
         pass
 
+    def on_llm_token(self, name: str, token: str) -> None:
+        """
+        Called for each streamed chunk of an agent's response.
+
+        Agents stream from their provider only when a handler overrides this.
+        """
+        pass
+
 class CallbackManager:
     """Helper to dispatch events to multiple handlers."""
     def __init__(self, handlers: list[CallbackHandler] = None):
@@ -50,8 +66,22 @@ class CallbackManager:
     def on_agent_end(self, name: str, response: str) -> None:
         for h in self.handlers: h.on_agent_end(name, response)
         
+    def on_node_start(self, node_id: str, input_text: str) -> None:
+        for h in self.handlers: h.on_node_start(node_id, input_text)
+
+    def on_node_end(self, node_id: str, status: str, output: Any) -> None:
+        for h in self.handlers: h.on_node_end(node_id, status, output)
+
     def on_tool_start(self, name: str, input_args: Any) -> None:
         for h in self.handlers: h.on_tool_start(name, input_args)
 
     def on_tool_end(self, name: str, output: str) -> None:
         for h in self.handlers: h.on_tool_end(name, output)
+
+    def on_llm_token(self, name: str, token: str) -> None:
+        for h in self.handlers: h.on_llm_token(name, token)
+
+    @property
+    def wants_tokens(self) -> bool:
+        """Whether any handler consumes streamed tokens."""
+        return any(type(h).on_llm_token is not CallbackHandler.on_llm_token for h in self.handlers)
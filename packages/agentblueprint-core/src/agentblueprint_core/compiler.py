@@ -0,0 +1,281 @@
+"""
+Static optimization of graph workflows.
+
+``compile_workflow`` rewrites a GraphWorkflow into an ExecutionPlan before
+it runs:
+
+- nodes that no declared output depends on are pruned;
+- nodes with the same agent configuration and the same inputs are merged
+  (their dependents then see the surviving node's ID in their prompts);
+- linear chains of plain nodes are fused into one scheduled unit;
+- topological levels and critical-path costs are computed, and the
+  scheduler starts the nodes on the longest remaining path first.
+
+Pruning and fusion only apply when the workflow declares ``outputs``,
+since otherwise every node's result is part of the run's result. Fusion is
+also skipped for runs that checkpoint or memoize node results: a fused
+chain only persists its last node, so resuming would rerun the whole chain.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from agentblueprint_core.artifacts import node_key
+from agentblueprint_core.workflow import GraphResult, GraphWorkflow, Workflow, WorkflowNode
+
+def node_cost(node: WorkflowNode) -> float:
+    """Estimated cost of a node in sequential agent calls (map chunks run concurrently)."""
+    if node.agent is None:
+        return 0.0
+    if node.loop is not None:
+        return node.loop.max_iterations * (2 if node.loop.critic is not None else 1)
+    return 1.0 + len(node.fused)
+
+def _topological(nodes: List[WorkflowNode]) -> List[WorkflowNode]:
+    by_id = {node.id: node for node in nodes}
+    order, seen, visiting = [], set(), set()
+
+    def visit(node: WorkflowNode) -> None:
+        if node.id in seen:
+            return
+        if node.id in visiting:
+            raise ValueError(f"Cycle detected at graph node {node.id}")
+        visiting.add(node.id)
+        for dep in node.depends_on:
+            if dep not in by_id:
+                raise ValueError(f"Node {node.id} depends on unknown node {dep}")
+            visit(by_id[dep])
+        visiting.discard(node.id)
+        seen.add(node.id)
+        order.append(node)
+
+    for node in nodes:
+        visit(node)
+    return order
+
+class ExecutionPlan(BaseModel):
+    """
+    An optimized workflow plus what the compiler did to it.
+
+    Attributes:
+        workflow: The workflow to run.
+        removed: Original node ID to the reason it is not in ``workflow``.
+        aliases: Merged node ID to the node that computes its result.
+        fused: Node ID to the upstream nodes fused into it, in run order.
+        levels: Node ID to its topological level (0 = no dependencies).
+        costs: Node ID to the estimated cost of the longest path from it to
+            the end of the graph, used to prioritize ready nodes.
+        critical_path: Node IDs on the most expensive path.
+        notes: Optimizations that were skipped, and why.
+    """
+    workflow: Workflow
+    removed: Dict[str, str] = Field(default_factory=dict)
+    aliases: Dict[str, str] = Field(default_factory=dict)
+    fused: Dict[str, List[str]] = Field(default_factory=dict)
+    levels: Dict[str, int] = Field(default_factory=dict)
+    costs: Dict[str, float] = Field(default_factory=dict)
+    critical_path: List[str] = Field(default_factory=list)
+    notes: List[str] = Field(default_factory=list)
+    outputs: Optional[List[str]] = None
+
+    def run(self, initial_input: Any, **kwargs: Any) -> Any:
+        """
+        Run the optimized workflow; merged nodes get their twin's result.
+
+        Raises:
+            ValueError: The plan fuses chains and the run would checkpoint
+                or memoize node results (compile with ``checkpointed=True``).
+        """
+        workflow = self.workflow
+        persisted = any(kwargs.get(k) is not None for k in ("run_store", "resume", "artifact_store")) or \
+            (isinstance(workflow, GraphWorkflow) and (workflow.checkpoint_dir is not None or workflow.memoize))
+        if self.fused and persisted:
+            raise ValueError("This plan fuses chains, which are not checkpointed or memoized per node; "
+                             "compile it with checkpointed=True")
+        result = self.workflow.run(initial_input, **kwargs)
+        if isinstance(result, GraphResult):
+            for alias, target in self.aliases.items():
+                if target in result.status:
+                    result.status[alias] = result.status[target]
+                if target in result and (self.outputs is None or alias in self.outputs):
+                    result[alias] = result[target]
+            if self.outputs is not None:
+                # Alias targets may be returned only because a merged output needed them
+                for node_id in list(result):
+                    if node_id not in self.outputs:
+                        del result[node_id]
+        return result
+
+    def describe(self) -> List[str]:
+        """Human-readable summary, one line per fact."""
+        if not isinstance(self.workflow, GraphWorkflow):
+            return [f"{type(self.workflow).__name__} '{self.workflow.name}': nothing to optimize"]
+        lines = [f"Graph '{self.workflow.name}': {len(self.workflow.nodes)} scheduled units, "
+                 f"{max(self.levels.values(), default=-1) + 1} levels"]
+        by_level: Dict[int, List[str]] = {}
+        for node_id, level in self.levels.items():
+            by_level.setdefault(level, []).append(node_id)
+        for level in sorted(by_level):
+            units = [" -> ".join(self.fused.get(n, []) + [n]) for n in by_level[level]]
+            lines.append(f"  level {level}: {', '.join(units)}")
+        if self.critical_path:
+            lines.append(f"Critical path ({self.costs[self.critical_path[0]]:g} calls): "
+                         f"{' -> '.join(self.critical_path)}")
+        for node_id, reason in self.removed.items():
+            lines.append(f"Removed {node_id}: {reason}")
+        return lines + self.notes
+
+def _prune(nodes: List[WorkflowNode], outputs: List[str], removed: Dict[str, str]) -> List[WorkflowNode]:
+    by_id = {node.id: node for node in nodes}
+    needed, stack = set(), list(outputs)
+    while stack:
+        node_id = stack.pop()
+        if node_id not in needed:
+            needed.add(node_id)
+            stack.extend(by_id[node_id].depends_on)
+    kept = []
+    for node in nodes:
+        if node.id not in needed:
+            removed[node.id] = "no declared output depends on it"
+            continue
+        if node.routes:
+            routes = [route.model_copy(update={"targets": [t for t in route.targets if t in needed]})
+                      for route in node.routes]
+            node = node.model_copy(update={"routes": routes})
+        kept.append(node)
+    return kept
+
+def _dedupe_key(node: WorkflowNode) -> Optional[str]:
+    if not node.plain or node.agent is None:
+        return None
+    agent_key = node_key(node.agent, "")
+    if agent_key is None:
+        # Agents with memory are stateful; two runs are not interchangeable
+        return None
+    agent = node.agent
+    return json.dumps({
+        "agent": agent_key,
+        # Two agents that call the same model may still differ in how they call it
+        "name": agent.name,
+        "agent_timeout": agent.timeout,
+        "retry": repr(agent.retry),
+        "circuit_breaker": repr(agent.circuit_breaker),
+        "coalesce": agent.coalesce,
+        "depends_on": node.depends_on,
+        "projections": {dep: p.model_dump(exclude={"summarize"}) for dep, p in node.projections.items()},
+        "summarizers": {dep: node_key(p.summarize, "") for dep, p in node.projections.items() if p.summarize},
+        "output_type": node.output_type,
+        "timeout": node.timeout,
+        "critical": node.critical,
+    }, sort_keys=True)
+
+def _dedupe(nodes: List[WorkflowNode], aliases: Dict[str, str], removed: Dict[str, str],
+            route_targets: set) -> List[WorkflowNode]:
+    seen: Dict[str, str] = {}
+    kept = []
+
+    def feeds_both(twin: str, original: str) -> bool:
+        # Merging would drop one of the two inputs of a shared consumer
+        return any({twin, original} <= {aliases.get(dep, dep) for dep in other.depends_on} for other in nodes)
+
+    for node in nodes:
+        if aliases:
+            depends_on = [aliases.get(dep, dep) for dep in node.depends_on]
+            projections = {aliases.get(dep, dep): p for dep, p in node.projections.items()}
+            node = node.model_copy(update={"depends_on": depends_on, "projections": projections})
+        key = _dedupe_key(node) if node.id not in route_targets else None
+        if key is not None and key in seen and not feeds_both(node.id, seen[key]):
+            aliases[node.id] = seen[key]
+            removed[node.id] = f"same agent and inputs as {seen[key]}"
+            continue
+        if key is not None:
+            seen[key] = node.id
+        kept.append(node)
+    return kept
+
+def _fuse(nodes: List[WorkflowNode], outputs: List[str], fused: Dict[str, List[str]],
+          removed: Dict[str, str], route_targets: set) -> List[WorkflowNode]:
+    dependents: Dict[str, List[str]] = {node.id: [] for node in nodes}
+    for node in nodes:
+        for dep in node.depends_on:
+            dependents[dep].append(node.id)
+    by_id = {node.id: node for node in nodes}
+    absorbed = set()
+    for node in nodes:
+        if len(node.depends_on) != 1 or not node.plain or node.projections or node.timeout is not None:
+            continue
+        upstream = by_id[node.depends_on[0]]
+        fusible = (upstream.plain or upstream.fused) and upstream.agent is not None \
+            and dependents[upstream.id] == [node.id] and upstream.id not in outputs \
+            and upstream.id not in route_targets and upstream.output_type == "text" \
+            and upstream.timeout is None and upstream.critical == node.critical
+        if not fusible:
+            continue
+        chain = upstream.fused + [upstream.model_copy(update={"fused": [], "depends_on": [], "projections": {}})]
+        merged = node.model_copy(update={
+            "fused": chain, "depends_on": upstream.depends_on, "projections": upstream.projections})
+        by_id[node.id] = merged
+        absorbed.add(upstream.id)
+        fused[node.id] = fused.pop(upstream.id, []) + [upstream.id]
+        removed[upstream.id] = f"fused into {node.id}"
+    return [by_id[node.id] for node in nodes if node.id not in absorbed]
+
+def _analyze(plan: ExecutionPlan, nodes: List[WorkflowNode]) -> None:
+    for node in nodes:
+        plan.levels[node.id] = 1 + max((plan.levels[dep] for dep in node.depends_on), default=-1)
+    dependents: Dict[str, List[str]] = {node.id: [] for node in nodes}
+    for node in nodes:
+        for dep in node.depends_on:
+            dependents[dep].append(node.id)
+    best_next: Dict[str, Optional[str]] = {}
+    for node in reversed(nodes):
+        following = max(dependents[node.id], key=lambda n: plan.costs[n], default=None)
+        best_next[node.id] = following
+        plan.costs[node.id] = node_cost(node) + (plan.costs[following] if following else 0.0)
+    start = max((node.id for node in nodes if not node.depends_on), key=lambda n: plan.costs[n], default=None)
+    while start is not None:
+        plan.critical_path.append(start)
+        start = best_next[start]
+
+def compile_workflow(workflow: Workflow, checkpointed: Optional[bool] = None) -> ExecutionPlan:
+    """
+    Optimize ``workflow`` for execution; the input workflow is not modified.
+
+    Args:
+        workflow: The workflow to optimize.
+        checkpointed: Whether the run will checkpoint or memoize node
+            results (``run_store``, ``resume`` or ``artifact_store``), which
+            rules out fusion. Defaults to whether the workflow sets
+            ``checkpoint_dir`` or ``memoize``.
+
+    Example:
+        >>> plan = compile_workflow(load_and_parse("graph.yaml"))  # doctest: +SKIP
+        >>> print("\\n".join(plan.describe()))  # doctest: +SKIP
+    """
+    if not isinstance(workflow, GraphWorkflow):
+        return ExecutionPlan(workflow=workflow)
+    plan = ExecutionPlan(workflow=workflow, outputs=workflow.outputs)
+    nodes = _topological(workflow.nodes)
+    route_targets = {t for node in nodes for route in node.routes for t in route.targets}
+    if workflow.outputs is not None:
+        nodes = _prune(nodes, workflow.outputs, plan.removed)
+    nodes = _dedupe(nodes, plan.aliases, plan.removed, route_targets)
+    if checkpointed is None:
+        checkpointed = workflow.checkpoint_dir is not None or workflow.memoize
+    if workflow.outputs is not None:
+        outputs = [plan.aliases.get(o, o) for o in workflow.outputs]
+        if not checkpointed:
+            nodes = _fuse(nodes, outputs, plan.fused, plan.removed, route_targets)
+        else:
+            chains: Dict[str, List[str]] = {}
+            _fuse(nodes, outputs, chains, {}, route_targets)
+            if chains:
+                units = ", ".join(" -> ".join(chain + [n]) for n, chain in chains.items())
+                plan.notes.append(f"Fusion skipped (the run checkpoints or memoizes each node): {units}")
+    _analyze(plan, nodes)
+    outputs = None if workflow.outputs is None else list(dict.fromkeys(plan.aliases.get(o, o) for o in workflow.outputs))
+    optimized = workflow.model_copy(update={"nodes": nodes, "outputs": outputs})
+    optimized._costs = plan.costs
+    plan.workflow = optimized
+    return plan
@@ -0,0 +1,142 @@
+"""
+Run-scoped control state for AgentBlueprint.
+
+A workflow run activates a ``CancellationToken`` and, optionally, a
+deadline in its context; the context is copied into every worker the run
+uses, so providers, agents and tools can check them cooperatively and stop
+paying for work whose result will be thrown away or arrive too late.
+"""
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Iterator, Optional
+
+class RunCancelledError(Exception):
+    """The surrounding run was cancelled."""
+
+class DeadlineExceededError(RunCancelledError):
+    """The deadline of the surrounding run, node or agent passed."""
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag, optionally chained to a parent token.
+
+    Example:
+        >>> token = CancellationToken()
+        >>> token.cancel("node b failed")
+        >>> token.cancelled
+        True
+    """
+
+    def __init__(self, parent: Optional["CancellationToken"] = None):
+        self.parent = parent
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            reason = self.reason or (self.parent.reason if self.parent is not None else None)
+            raise RunCancelledError(reason or "cancelled")
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Sleep up to ``timeout`` seconds, waking early on cancellation.
+
+        Returns True if the token was cancelled.
+        """
+        if self.parent is None:
+            return self._event.wait(timeout)
+        # Poll so that cancelling a parent also wakes us
+        remaining = timeout
+        while remaining > 0:
+            step = min(remaining, 0.05)
+            if self._event.wait(step) or self.parent.cancelled:
+                return True
+            remaining -= step
+        return self.cancelled
+
+_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar("agentblueprint_cancel", default=None)
+# Absolute time.monotonic() value
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("agentblueprint_deadline", default=None)
+
+def current_token() -> Optional[CancellationToken]:
+    return _token.get()
+
+@contextlib.contextmanager
+def cancellation_scope(token: CancellationToken) -> Iterator[CancellationToken]:
+    """Make ``token`` the one checked by work started inside the block."""
+    reset = _token.set(token)
+    try:
+        yield token
+    finally:
+        _token.reset(reset)
+
+@contextlib.contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Require work inside the block to finish within ``seconds``.
+
+    Never extends an enclosing deadline; ``None`` leaves it unchanged.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    reset = _deadline.set(deadline if outer is None else min(deadline, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(reset)
+
+@contextlib.contextmanager
+def detached_scope(token: CancellationToken) -> Iterator[CancellationToken]:
+    """
+    Run the block under ``token`` alone, outside the caller's cancellation and deadline.
+
+    For work shared by several runs, which must not stop because one of them did.
+    """
+    reset_token, reset_deadline = _token.set(token), _deadline.set(None)
+    try:
+        yield token
+    finally:
+        _deadline.reset(reset_deadline)
+        _token.reset(reset_token)
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+def check_cancelled() -> None:
+    """Raise RunCancelledError if the current run was cancelled or its deadline passed."""
+    token = _token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceededError("Deadline exceeded")
+
+def cancellable_sleep(seconds: float) -> None:
+    """``time.sleep`` that raises as soon as the run is cancelled or its deadline passes."""
+    remaining = remaining_time()
+    cut_short = remaining is not None and remaining < seconds
+    if cut_short:
+        seconds = remaining
+    token = _token.get()
+    if token is None:
+        time.sleep(seconds)
+    elif token.wait(seconds):
+        token.raise_if_cancelled()
+    if cut_short:
+        raise DeadlineExceededError("Deadline exceeded")
@@ -0,0 +1,349 @@
+"""
+Pluggable execution backends for workflows.
+
+Workflows hand agent runs to an ``Executor`` instead of creating their own
+thread pools. The executor can be passed to a workflow, named in YAML
+(``executor: threads``) or inherited: a workflow without one uses the
+executor of the workflow it runs inside, else the shared thread pool, so
+nested workflows and concurrent runs share a single bounded pool.
+"""
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import multiprocessing
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from agentblueprint_core.agent import Agent
+from agentblueprint_core.callbacks import CallbackHandler, CallbackManager
+from agentblueprint_core.context import deadline_scope, remaining_time
+from agentblueprint_core.usage import UsageTracker, current_tracker, usage_labels, usage_scope
+
+# Agent runs wait on the network, not the CPU; threads are only started on demand
+DEFAULT_THREAD_WORKERS = 128
+
+def _run_node(node_id: Optional[str], agent: Agent, node_input: str, callbacks: list = None) -> str:
+    with usage_scope(node=node_id):
+        return agent.run(node_input, callbacks=callbacks)
+
+class Executor(ABC):
+    """
+    Runs workflow work items and returns ``concurrent.futures.Future`` objects.
+
+    Implementations must run ``fn`` in a copy of the caller's context, so
+    usage tracking, cancellation and labels follow the work.
+    """
+
+    @abstractmethod
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        """Schedule ``fn(*args, **kwargs)``."""
+
+    def submit_agent(self, agent: Agent, node_input: str, callbacks: list = None,
+                     node_id: Optional[str] = None) -> concurrent.futures.Future:
+        """Schedule one agent run, attributed to ``node_id`` for usage tracking."""
+        return self.submit(_run_node, node_id, agent, node_input, callbacks=callbacks)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Release workers; the executor recreates them if used again."""
+
+class ThreadExecutor(Executor):
+    """
+    Bounded thread pool, created on first use and reused across runs.
+
+    Without ``max_workers`` the pool allows ``DEFAULT_THREAD_WORKERS``
+    threads, sized for I/O-bound LLM calls since the default pool is shared
+    by every run in the process. Work submitted from one of the pool's own threads (a nested workflow)
+    runs inline when every worker is busy, so nesting cannot deadlock.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pending = 0
+
+    def _get_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers or DEFAULT_THREAD_WORKERS, thread_name_prefix="agentblueprint-exec")
+        return self._pool
+
+    def _work(self, ctx: contextvars.Context, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self._local.worker = True
+        return ctx.run(fn, *args, **kwargs)
+
+    def _release(self, _: concurrent.futures.Future) -> None:
+        # Also runs for futures cancelled before they started
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        ctx = contextvars.copy_context()
+        with self._lock:
+            pool = self._get_pool()
+            inline = getattr(self._local, "worker", False) and self._pending >= pool._max_workers
+            if not inline:
+                self._pending += 1
+        if not inline:
+            future = pool.submit(self._work, ctx, fn, *args, **kwargs)
+            future.add_done_callback(self._release)
+            return future
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(ctx.run(fn, *args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"max_workers": self.max_workers}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+class AsyncioExecutor(Executor):
+    """
+    Runs work on an asyncio event loop in a background thread.
+
+    Coroutine functions run on the loop directly; blocking functions (such
+    as agent runs) go to the loop's default executor. ``max_concurrency``
+    caps how many items run at once. Work submitted from one of those
+    blocking items (a nested workflow) already holds a slot, so it runs
+    inline instead of waiting for another. Do not wait on its futures from
+    the loop thread itself.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                if self.max_concurrency:
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                thread = threading.Thread(target=loop.run_forever, name="agentblueprint-asyncio", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _work(self, ctx: contextvars.Context, fn: Callable[..., Any], args: Tuple, kwargs: Dict) -> Any:
+        self._local.worker = True
+        return ctx.run(fn, *args, **kwargs)
+
+    async def _run(self, ctx: contextvars.Context, fn: Callable[..., Any], args: Tuple, kwargs: Dict,
+                   limit: bool = True) -> Any:
+        async with (self._semaphore if limit else None) or contextlib.AsyncExitStack():
+            if asyncio.iscoroutinefunction(fn):
+                # A task copies the context it is created in
+                return await ctx.run(asyncio.ensure_future, fn(*args, **kwargs))
+            return await asyncio.get_running_loop().run_in_executor(None, self._work, ctx, fn, args, kwargs)
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        ctx = contextvars.copy_context()
+        nested = getattr(self._local, "worker", False)
+        if not nested:
+            return asyncio.run_coroutine_threadsafe(self._run(ctx, fn, args, kwargs), self._get_loop())
+        if asyncio.iscoroutinefunction(fn):
+            # Waiting on the loop does not tie up a worker thread, only the slot
+            return asyncio.run_coroutine_threadsafe(self._run(ctx, fn, args, kwargs, limit=False), self._get_loop())
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(ctx.run(fn, *args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._semaphore = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if wait and thread is not None:
+                thread.join()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"max_concurrency": self.max_concurrency}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+class _EventRecorder(CallbackHandler):
+    """Captures callback events in a worker process for replay in the parent."""
+
+    def __init__(self):
+        self.events: List[Tuple[str, tuple]] = []
+
+    def on_agent_start(self, name: str, input_text: str) -> None:
+        self.events.append(("on_agent_start", (name, input_text)))
+
+    def on_agent_end(self, name: str, response: str) -> None:
+        self.events.append(("on_agent_end", (name, response)))
+
+    def on_tool_start(self, name: str, input_args: Any) -> None:
+        self.events.append(("on_tool_start", (name, input_args)))
+
+    def on_tool_end(self, name: str, output: str) -> None:
+        self.events.append(("on_tool_end", (name, output)))
+
+class _TokenEventRecorder(_EventRecorder):
+    def on_llm_token(self, name: str, token: str) -> None:
+        self.events.append(("on_llm_token", (name, token)))
+
+class _RecordingTracker(UsageTracker):
+    def __init__(self):
+        super().__init__()
+        self.records: List[Tuple[str, int, int, Optional[str], Optional[str]]] = []
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int,
+               agent: Optional[str] = None, node: Optional[str] = None) -> None:
+        self.records.append((model, prompt_tokens, completion_tokens, agent, node))
+        super().record(model, prompt_tokens, completion_tokens, agent=agent, node=node)
+
+def _process_call(fn: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any], record_events: bool,
+                  record_tokens: bool, labels: Tuple[Optional[str], Optional[str]],
+                  deadline: Optional[float] = None) -> Tuple[Any, list, list]:
+    recorder = (_TokenEventRecorder if record_tokens else _EventRecorder)()
+    tracker = _RecordingTracker()
+    if record_events:
+        kwargs = dict(kwargs, callbacks=[recorder])
+    # ``deadline`` is wall-clock time: monotonic clocks differ between processes
+    seconds = None if deadline is None else max(0.0, deadline - time.time())
+    with tracker.activate(), usage_scope(*labels), deadline_scope(seconds):
+        result = fn(*args, **kwargs)
+    return result, recorder.events, tracker.records
+
+class ProcessExecutor(Executor):
+    """
+    Ships agents to a pool of worker processes (``spawn`` start method).
+
+    Agents, their tools and submitted functions must be picklable. Callback
+    events (passed as a ``callbacks`` argument) and token usage are
+    collected in the worker and replayed in the parent when the work
+    finishes, so ``on_llm_token`` arrives in one burst. The caller's
+    deadline is forwarded to the worker; cancellation is not, so cancelling
+    a run only withdraws work that has not started yet.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        """Run a picklable ``fn`` in a worker, with the caller's deadline, usage tracking and callbacks."""
+        cm = CallbackManager(kwargs.get("callbacks"))
+        if "callbacks" in kwargs:
+            # Handlers stay in this process; the worker records their events
+            kwargs = dict(kwargs, callbacks=None)
+        tracker = current_tracker()
+        remaining = remaining_time()
+        deadline = None if remaining is None else time.time() + remaining
+        inner = self._get_pool().submit(_process_call, fn, args, kwargs, bool(cm.handlers), cm.wants_tokens,
+                                        usage_labels(), deadline)
+        outer: concurrent.futures.Future = concurrent.futures.Future()
+
+        def done(f: concurrent.futures.Future) -> None:
+            if outer.cancelled():
+                return
+            try:
+                result, events, records = f.result()
+            except BaseException as e:
+                outer.set_exception(e)
+                return
+            for method, event_args in events:
+                getattr(cm, method)(*event_args)
+            if tracker is not None:
+                for model, prompt_tokens, completion_tokens, agent, node in records:
+                    tracker.record(model, prompt_tokens, completion_tokens, agent=agent, node=node)
+            outer.set_result(result)
+
+        inner.add_done_callback(done)
+        outer.add_done_callback(lambda f: inner.cancel() if f.cancelled() else None)
+        return outer
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"max_workers": self.max_workers}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+EXECUTOR_TYPES = {
+    "threads": ThreadExecutor,
+    "asyncio": AsyncioExecutor,
+    "processes": ProcessExecutor,
+}
+
+ExecutorSpec = Union[None, str, Dict[str, Any], Executor]
+
+_shared: Dict[Tuple, Executor] = {}
+_shared_lock = threading.Lock()
+_current: contextvars.ContextVar[Optional[Executor]] = contextvars.ContextVar("agentblueprint_executor", default=None)
+
+def get_executor(spec: ExecutorSpec = None) -> Executor:
+    """
+    Resolve an executor spec to an Executor.
+
+    ``None`` means the executor of the enclosing workflow, else the shared
+    thread pool. Names (``"threads"``, ``"asyncio"``, ``"processes"``) and
+    dicts such as ``{"type": "threads", "max_workers": 8}`` resolve to
+    process-wide shared instances, one per distinct spec.
+
+    Example:
+        >>> get_executor("threads") is get_executor("threads")
+        True
+    """
+    if isinstance(spec, Executor):
+        return spec
+    if spec is None:
+        current = _current.get()
+        if current is not None:
+            return current
+        spec = "threads"
+    options = {"type": spec} if isinstance(spec, str) else dict(spec)
+    kind = options.pop("type", "threads")
+    if kind not in EXECUTOR_TYPES:
+        raise ValueError(f"Unknown executor '{kind}'. Choose from: {', '.join(EXECUTOR_TYPES)}")
+    key = (kind, tuple(sorted(options.items())))
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = EXECUTOR_TYPES[kind](**options)
+        return _shared[key]
+
+@contextlib.contextmanager
+def use_executor(executor: Executor) -> Iterator[Executor]:
+    """Make ``executor`` the default for workflows started inside the block."""
+    token = _current.set(executor)
+    try:
+        yield executor
+    finally:
+        _current.reset(token)
@@ -0,0 +1,144 @@
+"""
+Compact graph representation for large GraphWorkflows.
+
+``WorkflowNode`` models stay the public way to describe a graph; the
+scheduler works on a ``CompactGraph`` built from them: nodes are integers,
+dependencies and dependents are CSR arrays (one offsets array, one flat
+targets array) and agents are interned, so per-node overhead is a few
+machine words. ``GraphBuilder`` builds very large graphs without keeping a
+separate Agent per node.
+"""
+from array import array
+from typing import Dict, Iterable, List, Sequence
+
+from agentblueprint_core.agent import Agent
+from agentblueprint_core.artifacts import node_key
+
+def _csr(rows: Sequence[Iterable[int]]) -> "tuple[array, array]":
+    offsets, targets = array("l", [0]), array("l")
+    for row in rows:
+        targets.extend(row)
+        offsets.append(len(targets))
+    return offsets, targets
+
+class CompactGraph:
+    """
+    Integer-indexed adjacency of a graph's nodes.
+
+    Example:
+        >>> graph = CompactGraph(["a", "b"], [[], ["a"]])
+        >>> list(graph.dependents(0)), graph.index["b"]
+        ([1], 1)
+    """
+
+    __slots__ = ("ids", "index", "dep_offsets", "dep_targets", "out_offsets", "out_targets")
+
+    def __init__(self, ids: List[str], depends_on: Sequence[Sequence[str]]):
+        self.ids = ids
+        self.index: Dict[str, int] = {node_id: i for i, node_id in enumerate(ids)}
+        if len(self.index) != len(ids):
+            raise ValueError("Duplicate node IDs in graph")
+        for node_id, deps in zip(ids, depends_on):
+            missing = [dep for dep in deps if dep not in self.index]
+            if missing:
+                raise ValueError(f"Node {node_id} has missing dependency {missing[0]}")
+        self.dep_offsets, self.dep_targets = _csr([[self.index[dep] for dep in deps] for deps in depends_on])
+        dependents: List[List[int]] = [[] for _ in ids]
+        for node in range(len(ids)):
+            for dep in self.deps(node):
+                dependents[dep].append(node)
+        self.out_offsets, self.out_targets = _csr(dependents)
+
+    @classmethod
+    def from_nodes(cls, nodes: Sequence["WorkflowNode"]) -> "CompactGraph":  # noqa: F821
+        return cls([node.id for node in nodes], [node.depends_on for node in nodes])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def deps(self, node: int) -> memoryview:
+        return memoryview(self.dep_targets)[self.dep_offsets[node]:self.dep_offsets[node + 1]]
+
+    def dependents(self, node: int) -> memoryview:
+        return memoryview(self.out_targets)[self.out_offsets[node]:self.out_offsets[node + 1]]
+
+    def in_degrees(self) -> array:
+        return array("l", (self.dep_offsets[i + 1] - self.dep_offsets[i] for i in range(len(self))))
+
+    def out_degrees(self) -> array:
+        return array("l", (self.out_offsets[i + 1] - self.out_offsets[i] for i in range(len(self))))
+
+    def topological_order(self) -> array:
+        """Node indices with every node after its dependencies; raises ValueError on a cycle."""
+        waiting = self.in_degrees()
+        order = array("l", (i for i in range(len(self)) if waiting[i] == 0))
+        for node in order:
+            for dependent in self.dependents(node):
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    order.append(dependent)
+        if len(order) != len(self):
+            raise ValueError("Cycle detected in graph workflow")
+        return order
+
+class GraphBuilder:
+    """
+    Incremental construction of large graphs with interned agents.
+
+    Agents with the same configuration (model, system prompt, tools) are
+    stored once and referenced by index, so a generated graph with one
+    agent definition per entity does not hold one Agent per node.
+
+    Example:
+        >>> builder = GraphBuilder()
+        >>> for i in range(3):
+        ...     builder.add(f"n{i}", Agent(name="a", model="mock"), [f"n{i - 1}"] if i else [])
+        >>> wf = builder.build("chain")
+        >>> len(builder.agents)
+        1
+    """
+
+    def __init__(self):
+        self.agents: List[Agent] = []
+        self._agent_index: Dict[str, int] = {}
+        self._by_identity: Dict[int, int] = {}
+        self.ids: List[str] = []
+        self.agent_of = array("l")
+        self.depends_on: List[Sequence[str]] = []
+
+    def intern(self, agent: Agent) -> int:
+        """Index of ``agent``'s configuration in ``agents``."""
+        index = self._by_identity.get(id(agent))
+        if index is not None:
+            return index
+        # Agents with memory are stateful and never shared
+        config = node_key(agent, "") or f"identity:{id(agent)}"
+        key = f"{agent.name}:{config}:{agent.timeout}:{agent.coalesce}:{agent.retry!r}:{agent.circuit_breaker!r}"
+        index = self._agent_index.get(key)
+        if index is None:
+            index = self._agent_index[key] = len(self.agents)
+            self.agents.append(agent)
+        self._by_identity[id(agent)] = index
+        return index
+
+    def add(self, node_id: str, agent: Agent, depends_on: Sequence[str] = ()) -> None:
+        self.ids.append(node_id)
+        self.agent_of.append(self.intern(agent))
+        self.depends_on.append(tuple(depends_on))
+
+    def graph(self) -> CompactGraph:
+        return CompactGraph(self.ids, self.depends_on)
+
+    def build(self, name: str, **options) -> "GraphWorkflow":  # noqa: F821
+        """The GraphWorkflow for the added nodes; ``options`` are GraphWorkflow fields."""
+        from agentblueprint_core.workflow import GraphWorkflow, WorkflowNode
+
+        graph = self.graph()
+        graph.topological_order()
+        # Validated models, not ``model_construct``: it inspects every default factory per call and costs
+        # far more than validation, which also keeps the node and workflow validators in force
+        nodes = [WorkflowNode(id=node_id, agent=self.agents[agent], depends_on=list(deps))
+                 for node_id, agent, deps in zip(self.ids, self.agent_of, self.depends_on)]
+        workflow = GraphWorkflow(name=name, nodes=nodes, **options)
+        workflow._graph, workflow._graph_nodes = graph, workflow.nodes
+        return workflow
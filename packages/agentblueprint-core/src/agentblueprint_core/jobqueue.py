@@ -0,0 +1,260 @@
+"""
+Durable local job queue for offline workflow runs.
+
+Jobs live in a SQLite database (WAL mode), so any number of worker
+processes on the machine can consume the same queue. A claimed job is
+leased for a visibility timeout; if the worker dies, the lease expires and
+another worker picks the job up. Failed jobs are retried with backoff and
+dead-lettered after ``max_attempts``.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_expires REAL,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (queue, status, available_at);
+"""
+
+class Job(BaseModel):
+    """A unit of work claimed from a JobQueue."""
+    id: str
+    queue: str
+    payload: Dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+class JobQueue:
+    """
+    SQLite-backed queue with visibility timeouts, retries and dead-lettering.
+
+    Statuses: ``queued``, ``running``, ``done`` and ``dead``.
+
+    Example:
+        >>> queue = JobQueue("jobs.db")
+        >>> job_id = queue.enqueue({"input": "Summarise this"})
+        >>> job = queue.claim("worker-1", visibility_timeout=60)
+        >>> queue.complete(job.id, "worker-1", "summary")
+    """
+
+    def __init__(self, path: str, retry_backoff: float = 5.0):
+        self.path = str(path)
+        self.retry_backoff = retry_backoff
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, payload: Dict[str, Any], queue: str = "default", max_attempts: int = 3,
+                delay: float = 0.0) -> str:
+        """Add a job and return its id."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (id, queue, payload, status, max_attempts, available_at, created_at, updated_at)"
+            " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, queue, json.dumps(payload), max_attempts, now + delay, now, now),
+        )
+        return job_id
+
+    def claim(self, worker: str, visibility_timeout: float = 300.0, queue: str = "default") -> Optional[Job]:
+        """
+        Lease the oldest available job, or return None if there is none.
+
+        Jobs whose lease expired count as available again; if they already
+        used all attempts they are dead-lettered instead.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', error = COALESCE(error, 'lease expired'), updated_at = ?"
+                " WHERE queue = ? AND status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, queue, now),
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE queue = ? AND ("
+                "  (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_expires < ?)"
+                ") ORDER BY available_at LIMIT 1",
+                (queue, now, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_expires = ?,"
+                " worker = ?, updated_at = ? WHERE id = ?",
+                (now + visibility_timeout, worker, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        job = self._to_job(row)
+        job.status = "running"
+        job.attempts += 1
+        return job
+
+    def heartbeat(self, job_id: str, worker: str, visibility_timeout: float = 300.0) -> bool:
+        """Extend the lease; False if the job is no longer held by ``worker``."""
+        cur = self._connect().execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + visibility_timeout, time.time(), job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: str, worker: str, result: Any) -> bool:
+        """Mark a job done; False if the lease was lost to another worker."""
+        cur = self._connect().execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated_at = ?"
+            " WHERE id = ? AND worker = ? AND status = 'running'",
+            (json.dumps(result, default=str), time.time(), job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """Record a failure: requeue with backoff, or dead-letter when out of attempts."""
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return False
+        if row["attempts"] >= row["max_attempts"]:
+            status, available_at = "dead", now
+        else:
+            status, available_at = "queued", now + self.retry_backoff * 2 ** (row["attempts"] - 1)
+        cur = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_expires = NULL, updated_at = ?"
+            " WHERE id = ? AND worker = ? AND status = 'running'",
+            (status, error, available_at, now, job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def stats(self, queue: str = "default") -> Dict[str, int]:
+        """Number of jobs per status."""
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) AS n FROM jobs WHERE queue = ? GROUP BY status", (queue,)
+        ).fetchall()
+        counts = {"queued": 0, "running": 0, "done": 0, "dead": 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def dead_letters(self, queue: str = "default") -> List[Job]:
+        rows = self._connect().execute(
+            "SELECT * FROM jobs WHERE queue = ? AND status = 'dead' ORDER BY updated_at", (queue,)
+        ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def requeue_dead(self, queue: str = "default") -> int:
+        """Give dead-lettered jobs a fresh set of attempts."""
+        cur = self._connect().execute(
+            "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, updated_at = ?"
+            " WHERE queue = ? AND status = 'dead'",
+            (time.time(), time.time(), queue),
+        )
+        return cur.rowcount
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            queue=row["queue"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+        )
+
+class JobWorker:
+    """
+    Pulls jobs from a JobQueue and runs them through a preloaded workflow.
+
+    The job payload's ``input`` is passed to ``workflow.run``; the result is
+    stored on the job. While a job runs, a heartbeat thread keeps its lease.
+    """
+
+    def __init__(self, queue: JobQueue, workflow: Any, worker_id: Optional[str] = None,
+                 visibility_timeout: float = 300.0, poll_interval: float = 1.0, queue_name: str = "default"):
+        self.queue = queue
+        self.workflow = workflow
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.queue_name = queue_name
+
+    def run(self, stop: Optional[threading.Event] = None, max_jobs: Optional[int] = None,
+            exit_when_empty: bool = False) -> int:
+        """Process jobs until stopped; returns the number of jobs handled."""
+        stop = stop or threading.Event()
+        handled = 0
+        while not stop.is_set() and (max_jobs is None or handled < max_jobs):
+            job = self.queue.claim(self.worker_id, self.visibility_timeout, queue=self.queue_name)
+            if job is None:
+                stats = self.queue.stats(self.queue_name)
+                # Queued jobs may be waiting out a retry backoff
+                if exit_when_empty and stats["queued"] == 0 and stats["running"] == 0:
+                    break
+                stop.wait(self.poll_interval)
+                continue
+            self.process(job)
+            handled += 1
+        return handled
+
+    def process(self, job: Job) -> None:
+        done = threading.Event()
+
+        def heartbeat() -> None:
+            while not done.wait(self.visibility_timeout / 3):
+                self.queue.heartbeat(job.id, self.worker_id, self.visibility_timeout)
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        try:
+            result = self.workflow.run(job.payload.get("input", ""))
+        except Exception as e:
+            self.queue.fail(job.id, self.worker_id, f"{type(e).__name__}: {e}")
+        else:
+            self.queue.complete(job.id, self.worker_id, result)
+        finally:
+            done.set()
+            beat.join()
@@ -2,16 +2,69 @@
 LLM Provider abstractions and implementations.
 """
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional, Dict
+from collections import OrderedDict
+from typing import Any, Iterator, List, Literal, Optional, Dict, Union
+from urllib.parse import parse_qsl
+import hashlib
+import json
+import math
 import os
+import random
+import threading
+import time
 
+from pydantic import BaseModel, Field
+
+from agentblueprint_core.context import RunCancelledError, cancellable_sleep, check_cancelled, remaining_time
 from agentblueprint_core.tools import Tool
+from agentblueprint_core.usage import estimate_tokens, record_usage
+
+class LLMError(Exception):
+    """
+    Base class for errors raised by LLM providers.
+
+    Attributes:
+        provider: Name of the provider that raised the error.
+        retryable: Whether repeating the request may succeed.
+        status_code: HTTP status code, when the error came from an HTTP API.
+        retry_after: Seconds the provider asked us to wait before retrying.
+    """
+    retryable: bool = False
+
+    def __init__(self, message: str, provider: str = "", status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None, retryable: Optional[bool] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+        self.retry_after = retry_after
+        if retryable is not None:
+            self.retryable = retryable
+
+class RateLimitError(LLMError):
+    """The provider rejected the request with a 429."""
+    retryable = True
+
+class LLMTimeoutError(LLMError):
+    """The request did not complete in time."""
+    retryable = True
+
+def estimate_prompt_tokens(prompt: str, system_prompt: str = "", history: Optional[List[Dict[str, str]]] = None) -> int:
+    """Local estimate of the prompt tokens a request will consume."""
+    tokens = estimate_tokens(prompt) + estimate_tokens(system_prompt)
+    for message in history or []:
+        tokens += estimate_tokens(str(message.get("content", "")))
+    return tokens
 
 class LLMProvider(ABC):
-    """Abstract base class for LLM providers."""
+    """
+    Abstract base class for LLM providers.
+
+    Implementations report token usage of every call with ``record_usage``.
+    """
     
     @abstractmethod
-    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None) -> str:
+    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+                 callbacks: Any = None) -> str:
         """
         Generate a response from the LLM.
         
@@ -20,37 +73,253 @@ class LLMProvider(ABC):
             system_prompt: System instruction.
             tools: List of available tools.
             history: Conversation history (optional).
+            callbacks: CallbackManager notified of tool calls (optional).
             
         Returns:
             The generated text response.
         """
         pass
 
+    def stream(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+               callbacks: Any = None) -> Iterator[str]:
+        """
+        Stream the response as text chunks.
+
+        Providers without native streaming yield the full response as one chunk.
+        """
+        yield self.generate(prompt, system_prompt=system_prompt, tools=tools, history=history, callbacks=callbacks)
+
 class MockLLM(LLMProvider):
     """A mock provider for testing."""
     
-    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None) -> str:
+    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+                 callbacks: Any = None) -> str:
+        check_cancelled()
         prefix = "ECHO"
         if system_prompt:
             prefix = f"ECHO ({system_prompt})"
-        return f"{prefix}: {prompt}"
+        response = f"{prefix}: {prompt}"
+        record_usage("mock", estimate_prompt_tokens(prompt, system_prompt, history), estimate_tokens(response))
+        return response
+
+class Distribution(BaseModel):
+    """
+    A sampled quantity used by the simulated provider.
+
+    Kinds:
+        fixed: always ``mean``.
+        normal: Gaussian with ``mean`` and ``stddev``, clipped at zero.
+        lognormal: log-normal with mean ``mean`` and shape ``sigma``.
+        empirical: uniform replay of the recorded ``samples``.
+    """
+    kind: Literal["fixed", "normal", "lognormal", "empirical"] = "fixed"
+    mean: float = 0.0
+    stddev: float = 0.0
+    sigma: float = 0.5
+    samples: List[float] = Field(default_factory=list)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.mean, self.stddev))
+        if self.kind == "lognormal":
+            if self.mean <= 0:
+                return 0.0
+            mu = math.log(self.mean) - self.sigma ** 2 / 2
+            return rng.lognormvariate(mu, self.sigma)
+        if self.kind == "empirical":
+            if not self.samples:
+                raise ValueError("Empirical distribution needs at least one sample")
+            return rng.choice(self.samples)
+        return self.mean
+
+class SimulationProfile(BaseModel):
+    """
+    Timing, length and fault behaviour of a SimulatedLLM.
+
+    Latency of one call is ``ttft`` plus ``response_tokens / tokens_per_second``.
+    Fault rates are independent probabilities checked once per call, in the
+    order rate limit, timeout, error.
+    """
+    ttft: Distribution = Field(default_factory=Distribution)
+    tokens_per_second: float = 0.0
+    response_tokens: Distribution = Field(default_factory=lambda: Distribution(mean=16))
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    timeout_after: float = 30.0
+    retry_after: Optional[float] = 1.0
+    seed: Optional[int] = None
+    time_scale: float = 1.0
+
+    @classmethod
+    def from_params(cls, params: Dict[str, str]) -> "SimulationProfile":
+        """
+        Build a profile from flat string parameters, as used in model strings.
+
+        ``latency``/``ttft``/``tokens`` pick a distribution kind or a fixed
+        value; ``latency_stddev``, ``latency_sigma`` and ``latency_samples``
+        (comma separated) refine it, and likewise for ``tokens_*``.
+
+        Example:
+            sim:gpt-4?latency=lognormal&latency_mean=0.8&tps=50&rate_limit_rate=0.05&seed=7
+        """
+        def dist(prefix: str, default_mean: float) -> Distribution:
+            raw = params.get(prefix, "fixed")
+            data: Dict[str, Any] = {"mean": float(params.get(f"{prefix}_mean", default_mean))}
+            try:
+                data["mean"] = float(raw)
+                data["kind"] = "fixed"
+            except ValueError:
+                data["kind"] = raw
+            if f"{prefix}_stddev" in params:
+                data["stddev"] = float(params[f"{prefix}_stddev"])
+            if f"{prefix}_sigma" in params:
+                data["sigma"] = float(params[f"{prefix}_sigma"])
+            if f"{prefix}_samples" in params:
+                data["samples"] = [float(x) for x in params[f"{prefix}_samples"].split(",") if x]
+            return Distribution(**data)
+
+        latency_key = "ttft" if "ttft" in params else "latency"
+        profile: Dict[str, Any] = {
+            "ttft": dist(latency_key, 0.0),
+            "response_tokens": dist("tokens", 16),
+        }
+        floats = {
+            "tps": "tokens_per_second",
+            "tokens_per_second": "tokens_per_second",
+            "error_rate": "error_rate",
+            "timeout_rate": "timeout_rate",
+            "rate_limit_rate": "rate_limit_rate",
+            "timeout_after": "timeout_after",
+            "retry_after": "retry_after",
+            "time_scale": "time_scale",
+        }
+        for key, field in floats.items():
+            if key in params:
+                profile[field] = float(params[key])
+        if "seed" in params:
+            profile["seed"] = int(params["seed"])
+        return cls(**profile)
+
+class SimulatedLLM(LLMProvider):
+    """
+    A provider that imitates the timing and failure modes of a real API.
+
+    Useful for load testing workflows, sizing concurrency and exercising
+    retry/timeout logic offline. With a seed, every outcome is a pure function
+    of the request content and how many times that request has been made, so
+    runs are reproducible regardless of thread scheduling. Occurrence counts
+    are shared by all instances in the process (providers are created per
+    call), so a retried request sees a fresh sample; use ``reset()`` between
+    independent experiments. Only the ``max_tracked_requests`` most recently
+    seen requests are counted, so long-running servers stay bounded; an
+    older request starts over as if it were new.
+    """
+
+    _VOCABULARY = ("alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta")
+    max_tracked_requests = 100_000
+    _occurrences: "OrderedDict[str, int]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, model_name: str = "sim", profile: Optional[SimulationProfile] = None):
+        self.model_name = model_name
+        self.profile = profile or SimulationProfile()
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget how often each request has been seen."""
+        with cls._lock:
+            cls._occurrences.clear()
+
+    def _rng(self, prompt: str, system_prompt: str) -> random.Random:
+        if self.profile.seed is None:
+            return random.Random()
+        digest = hashlib.sha256(f"{self.model_name}\0{system_prompt}\0{prompt}".encode()).hexdigest()
+        key = f"{self.profile.seed}:{digest}"
+        occurrences = self._occurrences
+        with self._lock:
+            n = occurrences.get(key, 0)
+            occurrences[key] = n + 1
+            occurrences.move_to_end(key)
+            while len(occurrences) > self.max_tracked_requests:
+                occurrences.popitem(last=False)
+        return random.Random(f"{key}:{n}")
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0 and self.profile.time_scale > 0:
+            cancellable_sleep(seconds * self.profile.time_scale)
+
+    def _maybe_fail(self, rng: random.Random) -> None:
+        p = self.profile
+        if rng.random() < p.rate_limit_rate:
+            raise RateLimitError("Simulated rate limit", provider="sim", status_code=429,
+                                 retry_after=p.retry_after)
+        if rng.random() < p.timeout_rate:
+            self._sleep(p.timeout_after)
+            raise LLMTimeoutError(f"Simulated timeout after {p.timeout_after}s", provider="sim")
+        if rng.random() < p.error_rate:
+            raise LLMError("Simulated provider error", provider="sim", status_code=500,
+                           retryable=True)
+
+    def _tokens(self, rng: random.Random, prompt: str) -> List[str]:
+        n = max(1, int(round(self.profile.response_tokens.sample(rng))))
+        words = [f"SIM ({self.model_name}):"] + prompt.split()
+        while len(words) < n:
+            words.append(rng.choice(self._VOCABULARY))
+        return words[:n]
+
+    def stream(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+               callbacks: Any = None) -> Iterator[str]:
+        check_cancelled()
+        rng = self._rng(prompt, system_prompt)
+        self._maybe_fail(rng)
+        self._sleep(self.profile.ttft.sample(rng))
+        per_token = 1.0 / self.profile.tokens_per_second if self.profile.tokens_per_second > 0 else 0.0
+        tokens = self._tokens(rng, prompt)
+        for i, token in enumerate(tokens):
+            if i:
+                self._sleep(per_token)
+            yield token if i == 0 else " " + token
+        record_usage(f"sim:{self.model_name}", estimate_prompt_tokens(prompt, system_prompt, history), len(tokens))
+
+    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+                 callbacks: Any = None) -> str:
+        return "".join(self.stream(prompt, system_prompt=system_prompt, tools=tools, history=history,
+                                   callbacks=callbacks))
 
 class OpenAILLM(LLMProvider):
-    """OpenAI API Provider."""
-    
-    def __init__(self, model_name: str = "gpt-3.5-turbo"):
+    """
+    OpenAI API Provider.
+
+    Clients are shared per (base_url, api_key) so connection pools survive
+    across the short-lived provider instances created for each agent run.
+    ``base_url`` points the provider at any OpenAI-compatible endpoint, such
+    as ``ab mock-server``.
+    """
+
+    _clients: Dict[tuple, Any] = {}
+    _clients_lock = threading.Lock()
+    max_tool_rounds = 8
+
+    def __init__(self, model_name: str = "gpt-3.5-turbo", base_url: Optional[str] = None, api_key: Optional[str] = None):
         self.model_name = model_name
+        self.base_url = base_url or os.environ.get("OPENAI_BASE_URL")
         try:
             import openai
-            self.client = openai.OpenAI()
         except ImportError:
             raise ImportError("openai package is not installed. Run `pip install openai`.")
-        except Exception:
-            # Handle missing API key or other init errors generically
-            # For now we assume env var OPENAI_API_KEY is set
-            self.client = openai.OpenAI()
+        # Local stand-in servers do not check keys, so don't require one for them
+        api_key = api_key or os.environ.get("OPENAI_API_KEY") or ("unused" if self.base_url else None)
+        key = (self.base_url, api_key)
+        with self._clients_lock:
+            client = self._clients.get(key)
+            if client is None:
+                # Retries are handled by ResilientLLM, not inside the client
+                client = openai.OpenAI(base_url=self.base_url, api_key=api_key, max_retries=0)
+                self._clients[key] = client
+        self.client = client
 
-    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None) -> str:
+    def _messages(self, prompt: str, system_prompt: str, history: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -61,28 +330,154 @@ class OpenAILLM(LLMProvider):
             messages.extend(history)
             
         messages.append({"role": "user", "content": prompt})
-        
-        # Simple tool definition (omitted for phase 1 of LLM integration - just text generation first)
-        # TODO: Add tool calling support
-        
+        return messages
+
+    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+                 callbacks: Any = None) -> str:
+        """
+        Return the model's answer to ``prompt``.
+
+        With ``tools``, tool calls requested by the model are run through
+        ``Tool.invoke`` (so process tools run in their pool) and their
+        outputs sent back, for up to ``max_tool_rounds`` rounds.
+        """
+        check_cancelled()
+        messages: List[Dict[str, Any]] = self._messages(prompt, system_prompt, history)
+        specs = {"tools": self._tool_specs(tools)} if tools else {}
+        for _ in range(self.max_tool_rounds + 1):
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    **specs,
+                    **self._request_options(),
+                )
+            except Exception as e:
+                raise self._translate_error(e) from e
+            if response.usage is not None:
+                record_usage(f"openai:{self.model_name}", response.usage.prompt_tokens, response.usage.completion_tokens)
+            message = response.choices[0].message
+            if not tools or not message.tool_calls:
+                return message.content or ""
+            messages.append({"role": "assistant", "content": message.content,
+                             "tool_calls": [call.model_dump() for call in message.tool_calls]})
+            messages.extend(self._run_tools(tools, message.tool_calls, callbacks))
+            check_cancelled()
+        raise LLMError(f"No answer after {self.max_tool_rounds} rounds of tool calls", provider="openai")
+
+    @staticmethod
+    def _tool_specs(tools: List[Tool]) -> List[Dict[str, Any]]:
+        return [{"type": "function", "function": {
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.parameters or {"type": "object", "properties": {}},
+        }} for tool in tools]
+
+    @staticmethod
+    def _run_tools(tools: List[Tool], calls: List[Any], callbacks: Any = None) -> List[Dict[str, Any]]:
+        """Run the requested tools; failures are reported to the model as the tool's output."""
+        by_name = {tool.name: tool for tool in tools}
+        results = []
+        for call in calls:
+            tool = by_name.get(call.function.name)
+            try:
+                if tool is None:
+                    raise KeyError(f"Unknown tool {call.function.name!r}")
+                output = tool.invoke(json.loads(call.function.arguments or "{}"), callbacks=callbacks)
+            except RunCancelledError:
+                raise
+            except Exception as e:
+                output = f"Error: {type(e).__name__}: {e}"
+            results.append({"role": "tool", "tool_call_id": call.id, "content": str(output)})
+        return results
+
+    def stream(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+               callbacks: Any = None) -> Iterator[str]:
+        """Stream the answer; with ``tools`` the tool loop runs first and the answer arrives in one piece."""
+        check_cancelled()
+        if tools:
+            yield self.generate(prompt, system_prompt=system_prompt, tools=tools, history=history, callbacks=callbacks)
+            return
         try:
             response = self.client.chat.completions.create(
                 model=self.model_name,
-                messages=messages
+                messages=self._messages(prompt, system_prompt, history),
+                stream=True,
+                stream_options={"include_usage": True},
+                **self._request_options(),
             )
-            return response.choices[0].message.content
+            with response:
+                for chunk in response:
+                    # Leaving the block closes the connection, so a cancelled run stops the generation
+                    check_cancelled()
+                    if chunk.usage is not None:
+                        record_usage(f"openai:{self.model_name}", chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except RunCancelledError:
+            raise
         except Exception as e:
-            return f"Error calling OpenAI: {str(e)}"
+            raise self._translate_error(e) from e
+
+    @staticmethod
+    def _request_options() -> Dict[str, Any]:
+        """Cap the HTTP timeout at the time left before the run's deadline."""
+        remaining = remaining_time()
+        return {} if remaining is None else {"timeout": max(remaining, 0.001)}
+
+    @staticmethod
+    def _translate_error(error: Exception) -> LLMError:
+        """Map an openai exception onto the LLMError hierarchy."""
+        import openai
+
+        message = f"Error calling OpenAI: {error}"
+        if isinstance(error, openai.APITimeoutError):
+            return LLMTimeoutError(message, provider="openai")
+        if isinstance(error, openai.APIConnectionError):
+            return LLMError(message, provider="openai", retryable=True)
+        if isinstance(error, openai.APIStatusError):
+            status = error.status_code
+            retry_after = None
+            headers = error.response.headers
+            if headers.get("retry-after-ms"):
+                retry_after = float(headers["retry-after-ms"]) / 1000
+            elif headers.get("retry-after"):
+                try:
+                    retry_after = float(headers["retry-after"])
+                except ValueError:
+                    retry_after = None
+            if status == 429:
+                return RateLimitError(message, provider="openai", status_code=status, retry_after=retry_after)
+            return LLMError(message, provider="openai", status_code=status, retry_after=retry_after,
+                            retryable=status in (408, 409) or status >= 500)
+        return LLMError(message, provider="openai")
 
 class LLMFactory:
     """Factory to get the correct LLM provider."""
     
     @staticmethod
-    def create(model_str: str) -> LLMProvider:
+    def create(model_str: Union[str, List[str]], circuit_breaker: Any = None) -> LLMProvider:
         """
         Create a provider instance from a model string.
         Format: provider:model_name (e.g., openai:gpt-4, mock:echo)
+
+        Simulated models take their profile as a query string,
+        e.g. ``sim:gpt-4?latency=lognormal&latency_mean=0.8&tps=40&seed=1``.
+        OpenAI models accept a ``base_url``, e.g.
+        ``openai:gpt-4?base_url=http://127.0.0.1:8000/v1``.
+
+        A list of model strings builds a FallbackLLM that tries them in order,
+        each behind a CircuitBreaker (configured by ``circuit_breaker``).
         """
+        if not isinstance(model_str, str):
+            models = list(model_str)
+            if not models:
+                raise ValueError("Model fallback list is empty")
+            if len(models) == 1:
+                return LLMFactory.create(models[0])
+            from agentblueprint_core.resilience import FallbackLLM
+            return FallbackLLM([(m, LLMFactory.create(m)) for m in models], config=circuit_breaker)
+
         if ":" in model_str:
             provider, model_name = model_str.split(":", 1)
         else:
@@ -92,10 +487,16 @@ class LLMFactory:
             model_name = model_str
 
         if provider == "openai":
-            return OpenAILLM(model_name=model_name)
+            model_name, _, query = model_name.partition("?")
+            params = dict(parse_qsl(query))
+            return OpenAILLM(model_name=model_name, base_url=params.get("base_url"))
         elif provider == "mock" or provider == "echo":
             # We ignore model_name for mock currently
             return MockLLM()
+        elif provider == "sim":
+            model_name, _, query = model_name.partition("?")
+            profile = SimulationProfile.from_params(dict(parse_qsl(query)))
+            return SimulatedLLM(model_name=model_name, profile=profile)
         else:
             # Fallback or error
             raise ValueError(f"Unknown provider: {provider}")
@@ -2,8 +2,9 @@
 Memory systems for AgentBlueprint agents.
 """
 from abc import ABC, abstractmethod
+from array import array
 from typing import List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 class Memory(BaseModel, ABC):
     """Abstract base class for agent memory."""
@@ -38,6 +39,53 @@ class SimpleMemory(Memory):
     def get_context(self) -> str:
         return "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in self.messages])
 
+class CompactMemory(Memory):
+    """
+    Message buffer without a dict per message.
+
+    Roles are interned in a small per-memory table and stored as one byte
+    per message; message texts are appended to a single UTF-8 buffer and
+    located through an offsets array. Histories are materialized on read.
+
+    Example:
+        >>> memory = CompactMemory()
+        >>> memory.add("user", "Hi")
+        >>> memory.get_history()
+        [{'role': 'user', 'content': 'Hi'}]
+    """
+    _roles: List[str] = PrivateAttr(default_factory=list)
+    _role_ids: array = PrivateAttr(default_factory=lambda: array("B"))
+    _offsets: array = PrivateAttr(default_factory=lambda: array("Q", [0]))
+    _text: bytearray = PrivateAttr(default_factory=bytearray)
+
+    def add(self, role: str, content: str) -> None:
+        try:
+            role_id = self._roles.index(role)
+        except ValueError:
+            if len(self._roles) == 256:
+                raise ValueError("CompactMemory supports at most 256 distinct roles")
+            role_id = len(self._roles)
+            self._roles.append(role)
+        self._text += content.encode("utf-8")
+        self._offsets.append(len(self._text))
+        self._role_ids.append(role_id)
+
+    def __len__(self) -> int:
+        return len(self._role_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the message buffers."""
+        return len(self._text) + self._offsets.itemsize * len(self._offsets) + len(self._role_ids)
+
+    def get_history(self) -> List[Dict[str, str]]:
+        text, offsets = self._text, self._offsets
+        return [{"role": self._roles[role_id], "content": text[offsets[i]:offsets[i + 1]].decode("utf-8")}
+                for i, role_id in enumerate(self._role_ids)]
+
+    def get_context(self) -> str:
+        return "\n".join([f"{msg['role'].upper()}: {msg['content']}" for msg in self.get_history()])
+
 class NoOpMemory(Memory):
     """Memory that stores nothing."""
     def add(self, role: str, content: str) -> None:
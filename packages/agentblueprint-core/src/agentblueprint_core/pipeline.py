@@ -0,0 +1,217 @@
+"""
+Pipeline-parallel execution of a chain of stages over a stream of items.
+
+Each stage has its own worker threads, connected to the next stage by a
+bounded queue, so stage N works on item i while stage N-1 works on item
+i+1. A full queue blocks the stage feeding it (backpressure), and the
+number of items in flight is capped, so an endless input stream runs in
+bounded memory.
+"""
+import asyncio
+import contextvars
+import queue
+import threading
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, List, Optional, Union
+
+from agentblueprint_core.context import CancellationToken, RunCancelledError, cancellation_scope, current_token
+
+_DONE = object()
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+class Pipeline:
+    """
+    Runs ``stages`` (one-argument callables) in sequence over many items.
+
+    Args:
+        stages: Stage functions; each receives the previous stage's output.
+        concurrency: Workers per stage, one number for all stages or a list.
+        queue_size: Capacity of the queue in front of each stage.
+        ordered: Yield results in input order (default) or as they finish.
+
+    The first exception raised by a stage cancels the pipeline and is
+    re-raised by ``results()``; so is cancellation of the enclosing run.
+
+    Example:
+        >>> pipeline = Pipeline([str.upper, str.strip], concurrency=2)
+        >>> pipeline.start([" a ", " b "])
+        >>> list(pipeline.results())
+        ['A', 'B']
+    """
+
+    def __init__(self, stages: List[Callable[[Any], Any]], concurrency: Union[int, List[int]] = 1,
+                 queue_size: int = 8, ordered: bool = True):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        if isinstance(concurrency, int):
+            concurrency = [concurrency] * len(stages)
+        if len(concurrency) != len(stages) or min(concurrency) < 1 or queue_size < 1:
+            raise ValueError("Need a concurrency of at least 1 per stage and a positive queue_size")
+        self.stages = stages
+        self.concurrency = list(concurrency)
+        self.ordered = ordered
+        self.token = CancellationToken(parent=current_token())
+        # The output queue is unbounded; the in-flight cap bounds it instead
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in stages] + [queue.Queue()]
+        self._slots = threading.Semaphore(queue_size * len(stages) + sum(self.concurrency))
+        self._active = list(self.concurrency)
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._started = False
+
+    def _spawn(self, target: Callable[..., Any], *args: Any) -> None:
+        # Each thread needs its own copy of the caller's context
+        ctx = contextvars.copy_context()
+        threading.Thread(target=ctx.run, args=(target, *args), daemon=True,
+                         name="agentblueprint-pipeline").start()
+
+    def _start_workers(self) -> None:
+        if self._started:
+            raise RuntimeError("Pipeline already started")
+        self._started = True
+        for stage, workers in enumerate(self.concurrency):
+            for _ in range(workers):
+                self._spawn(self._work, stage)
+
+    def start(self, items: Iterable[Any]) -> None:
+        """Start the workers and feed ``items`` from a background thread."""
+        self._start_workers()
+        self._spawn(self._feed, items)
+
+    def start_async(self, items: Union[Iterable[Any], AsyncIterable[Any]]) -> None:
+        """Like ``start``; async iterables are consumed on the running event loop."""
+        if not hasattr(items, "__aiter__"):
+            self.start(items)
+            return
+        self._start_workers()
+        asyncio.get_running_loop().create_task(self._afeed(items))
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        # Wait for room, giving up if the pipeline is cancelled
+        while not self.token.cancelled:
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _admit(self, index: int, item: Any) -> bool:
+        while not self._slots.acquire(timeout=0.1):
+            if self.token.cancelled:
+                return False
+        return self._put(self._queues[0], (index, item))
+
+    def _end_input(self) -> None:
+        for _ in range(self.concurrency[0]):
+            self._queues[0].put(_DONE)
+
+    def _feed(self, items: Iterable[Any]) -> None:
+        try:
+            for index, item in enumerate(items):
+                if not self._admit(index, item):
+                    break
+        except Exception as exc:
+            self._fail(exc)
+        finally:
+            self._end_input()
+
+    async def _afeed(self, items: AsyncIterable[Any]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            index = 0
+            async for item in items:
+                if not await loop.run_in_executor(None, self._admit, index, item):
+                    break
+                index += 1
+        except Exception as exc:
+            self._fail(exc)
+        finally:
+            await loop.run_in_executor(None, self._end_input)
+
+    def _fail(self, exc: BaseException) -> None:
+        with self._lock:
+            first = self._error is None and not self.token.cancelled
+            if first:
+                self._error = exc
+        if first:
+            self.token.cancel(f"pipeline stage failed: {exc}")
+            self._queues[-1].put(_Failure(exc))
+
+    def _work(self, stage: int) -> None:
+        fn = self.stages[stage]
+        inbox, outbox = self._queues[stage], self._queues[stage + 1]
+        with cancellation_scope(self.token):
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                if self.token.cancelled:
+                    # Drain so upstream stages never block on a full queue
+                    continue
+                index, value = item
+                try:
+                    result = fn(value)
+                except RunCancelledError as exc:
+                    if not self.token.cancelled:
+                        self._fail(exc)
+                    continue
+                except Exception as exc:
+                    self._fail(exc)
+                    continue
+                self._put(outbox, (index, result))
+        with self._lock:
+            self._active[stage] -= 1
+            last = self._active[stage] == 0
+        if last:
+            # The last worker of a stage passes end-of-stream on
+            downstream = self.concurrency[stage + 1] if stage + 1 < len(self.stages) else 1
+            for _ in range(downstream):
+                outbox.put(_DONE)
+
+    def results(self) -> Iterator[Any]:
+        """Yield final-stage outputs; closing the iterator cancels the pipeline."""
+        buffered = {}
+        next_index = 0
+        try:
+            while True:
+                item = self._queues[-1].get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.exc
+                index, value = item
+                if not self.ordered:
+                    self._slots.release()
+                    yield value
+                    continue
+                buffered[index] = value
+                while next_index in buffered:
+                    self._slots.release()
+                    yield buffered.pop(next_index)
+                    next_index += 1
+            # Cancelled from outside: items were dropped
+            self.token.raise_if_cancelled()
+        finally:
+            self.close()
+
+    async def aresults(self) -> AsyncIterator[Any]:
+        """``results()`` for asyncio; waits for items off the event loop."""
+        loop = asyncio.get_running_loop()
+        results = self.results()
+        try:
+            while True:
+                value = await loop.run_in_executor(None, next, results, _DONE)
+                if value is _DONE:
+                    return
+                yield value
+        finally:
+            # The iterator may still be running in the executor; cancelling
+            # lets it finish on its own
+            self.close()
+
+    def close(self) -> None:
+        """Stop feeding and abandon items in flight."""
+        self.token.cancel("pipeline closed")
@@ -0,0 +1,142 @@
+"""
+Process-pool execution for CPU-bound tools.
+
+Tools that declare ``execution = "process"`` run in a pool of worker
+processes, one pool per tool class, so heavy local work no longer contends
+for the GIL with the threads running other agents. Arguments, the tool
+instance and the result cross the process boundary by pickling.
+"""
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from agentblueprint_core.context import RunCancelledError, current_token
+from agentblueprint_core.tools import Tool
+
+class ToolTimeoutError(TimeoutError):
+    """A process tool did not return within its timeout."""
+
+def _call_tool(tool: Tool, kwargs: Dict[str, Any]) -> Any:
+    return tool.run(**kwargs)
+
+class ToolProcessPool:
+    """
+    Worker processes for one tool class.
+
+    Workers use the ``spawn`` start method, which is safe while other
+    threads are running. After ``max_calls_per_worker`` calls a worker is
+    replaced to contain leaks; a call that exceeds ``timeout`` gets its pool
+    terminated and rebuilt, since a stuck process cannot be interrupted.
+    Other calls that were running in that pool are resubmitted to the new
+    one, within their own timeouts.
+
+    Example:
+        >>> pool = ToolProcessPool.for_tool(tool)  # doctest: +SKIP
+        >>> pool.call(tool, {"code": "print(1)"})  # doctest: +SKIP
+    """
+
+    _pools: Dict[type, "ToolProcessPool"] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, size: Optional[int] = None, max_calls_per_worker: Optional[int] = None):
+        self.size = size or os.cpu_count() or 1
+        self.max_calls_per_worker = max_calls_per_worker
+        self._lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        # Pools terminated because one call got stuck
+        self._terminated: "weakref.WeakSet[concurrent.futures.ProcessPoolExecutor]" = weakref.WeakSet()
+        self._calls = 0
+
+    @classmethod
+    def for_tool(cls, tool: Tool) -> "ToolProcessPool":
+        """The shared pool for ``tool``'s class, sized from its attributes."""
+        with cls._pools_lock:
+            pool = cls._pools.get(type(tool))
+            if pool is None:
+                pool = cls(tool.pool_size, tool.max_calls_per_worker)
+                cls._pools[type(tool)] = pool
+            return pool
+
+    @classmethod
+    def shutdown_all(cls) -> None:
+        """Stop every tool pool (they are rebuilt on next use)."""
+        with cls._pools_lock:
+            pools, cls._pools = list(cls._pools.values()), {}
+        for pool in pools:
+            pool.shutdown()
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is not None and self.max_calls_per_worker and sys.version_info < (3, 11):
+                # No max_tasks_per_child: recycle the whole pool once every worker is due
+                if self._calls >= self.size * self.max_calls_per_worker:
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+            if self._executor is None:
+                kwargs: Dict[str, Any] = {"mp_context": multiprocessing.get_context("spawn")}
+                if self.max_calls_per_worker and sys.version_info >= (3, 11):
+                    kwargs["max_tasks_per_child"] = self.max_calls_per_worker
+                self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.size, **kwargs)
+                self._calls = 0
+            self._calls += 1
+            return self._executor
+
+    def call(self, tool: Tool, kwargs: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run ``tool.run(**kwargs)`` in a worker and return its result.
+
+        If the run is cancelled while waiting, a call that has not started is
+        withdrawn and RunCancelledError is raised; a started one is left to
+        finish in its worker.
+        """
+        token = current_token()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_call_tool, tool, kwargs)
+                return self._wait(future, executor, tool, token, deadline, timeout)
+            except BrokenProcessPool:
+                if executor not in self._terminated:
+                    # Broken by this call or a crashed worker, not by a sibling's timeout
+                    self._discard(executor)
+                    raise
+
+    def _wait(self, future: concurrent.futures.Future, executor: concurrent.futures.ProcessPoolExecutor,
+              tool: Tool, token: Any, deadline: Optional[float], timeout: Optional[float]) -> Any:
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            wait_for = remaining if token is None else min(0.1, remaining if remaining is not None else 0.1)
+            try:
+                return future.result(timeout=wait_for)
+            except concurrent.futures.TimeoutError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._discard(executor, terminate=True)
+                    raise ToolTimeoutError(f"Tool {tool.name!r} did not finish within {timeout}s")
+                if token is not None and token.cancelled:
+                    future.cancel()
+                    raise RunCancelledError(token.reason or "cancelled")
+
+    def _discard(self, executor: concurrent.futures.ProcessPoolExecutor, terminate: bool = False) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+            if terminate:
+                self._terminated.add(executor)
+        if terminate:
+            # Private, but the only way to stop a worker stuck in user code
+            for proc in list((getattr(executor, "_processes", None) or {}).values()):
+                proc.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,479 @@
+"""
+Resilient call layer for LLM providers.
+
+Wraps any ``LLMProvider`` with retries (exponential backoff with jitter,
+honouring ``Retry-After``), per-attempt and overall deadlines, and request
+hedging to cut tail latency.
+"""
+import collections
+import concurrent.futures
+import contextvars
+import math
+import random
+import threading
+import time
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel
+
+from agentblueprint_core.context import (
+    DeadlineExceededError,
+    RunCancelledError,
+    cancellable_sleep,
+    check_cancelled,
+    deadline_scope,
+    remaining_time,
+)
+from agentblueprint_core.llm import LLMError, LLMProvider, LLMTimeoutError
+from agentblueprint_core.tools import Tool
+
+class RetryPolicy(BaseModel):
+    """
+    How a ResilientLLM retries, times out and hedges calls.
+
+    Attributes:
+        max_attempts: Total attempts including the first one.
+        initial_backoff: Backoff before the second attempt, in seconds.
+        max_backoff: Upper bound for a single backoff.
+        multiplier: Growth factor of the backoff per attempt.
+        jitter: Randomise each backoff uniformly in ``[0, backoff]``.
+        attempt_timeout: Seconds one attempt may take before it is abandoned.
+        total_timeout: Seconds all attempts together may take.
+        hedge_percentile: Send a duplicate request once an attempt has run
+            longer than this latency percentile (0-1) of recent calls. Calls
+            with tools are never hedged, as a duplicate would run the tools twice.
+        hedge_delay: Fixed hedging delay in seconds; overrides the percentile.
+        hedge_min_samples: Observed calls needed before percentile hedging starts.
+    """
+    max_attempts: int = 3
+    initial_backoff: float = 0.5
+    max_backoff: float = 30.0
+    multiplier: float = 2.0
+    jitter: bool = True
+    attempt_timeout: Optional[float] = None
+    total_timeout: Optional[float] = None
+    hedge_percentile: Optional[float] = None
+    hedge_delay: Optional[float] = None
+    hedge_min_samples: int = 20
+
+    def backoff(self, attempt: int, rng: random.Random) -> float:
+        """Backoff before attempt number ``attempt + 1`` (``attempt`` starts at 1)."""
+        delay = min(self.max_backoff, self.initial_backoff * self.multiplier ** (attempt - 1))
+        return rng.uniform(0, delay) if self.jitter else delay
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies, shared per endpoint.
+
+    Example:
+        >>> tracker = LatencyTracker.for_key("openai:gpt-4")
+        >>> tracker.observe(0.8)
+        >>> tracker.percentile(0.95)
+        0.8
+    """
+
+    _trackers: Dict[str, "LatencyTracker"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_key(cls, key: str) -> "LatencyTracker":
+        with cls._registry_lock:
+            tracker = cls._trackers.get(key)
+            if tracker is None:
+                tracker = cls._trackers[key] = cls()
+            return tracker
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._registry_lock:
+            cls._trackers.clear()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[index]
+
+class ResilientLLM(LLMProvider):
+    """
+    Provider wrapper adding retries, deadlines and hedged requests.
+
+    Errors are raised as ``LLMError`` subclasses; only errors marked
+    ``retryable`` are retried. Each attempt's timeout is passed to the
+    provider as its deadline, which caps the request. With
+    ``attempt_timeout``, ``total_timeout`` or hedging, attempts run on a
+    shared pool so a provider that overruns can be abandoned; abandoned
+    attempts (timed out or beaten by a hedge) finish in the background and
+    their results are discarded. Otherwise the call is made inline.
+
+    Example:
+        >>> llm = ResilientLLM(LLMFactory.create("openai:gpt-4"),
+        ...                    RetryPolicy(attempt_timeout=20, hedge_percentile=0.95),
+        ...                    key="openai:gpt-4")  # doctest: +SKIP
+    """
+
+    _executor = concurrent.futures.ThreadPoolExecutor(max_workers=64, thread_name_prefix="agentblueprint-llm")
+
+    def __init__(self, provider: LLMProvider, policy: Optional[RetryPolicy] = None,
+                 key: Optional[str] = None, rng: Optional[random.Random] = None):
+        self.provider = provider
+        self.policy = policy or RetryPolicy()
+        # Without a key the latencies are this wrapper's own, not shared
+        self.latency = LatencyTracker.for_key(key) if key is not None else LatencyTracker()
+        self._rng = rng or random.Random()
+
+    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+                 callbacks: Any = None) -> str:
+        policy = self.policy
+        deadline = time.monotonic() + policy.total_timeout if policy.total_timeout is not None else None
+        attempt = 0
+        while True:
+            attempt += 1
+            check_cancelled()
+            timeout = policy.attempt_timeout
+            # The run's deadline bounds each attempt, so a stuck call is abandoned in time
+            run_remaining = remaining_time()
+            if run_remaining is not None:
+                timeout = run_remaining if timeout is None else min(timeout, run_remaining)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMTimeoutError(f"Deadline exceeded after {attempt - 1} attempts", retryable=False)
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            try:
+                return self._attempt(timeout, prompt, system_prompt, tools, history, callbacks)
+            except LLMError as e:
+                # An attempt cut short by the run's deadline reports the deadline
+                check_cancelled()
+                if not e.retryable or attempt >= policy.max_attempts:
+                    raise
+                delay = policy.backoff(attempt, self._rng)
+                if e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                cancellable_sleep(delay)
+
+    def stream(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+               callbacks: Any = None) -> Iterator[str]:
+        """
+        Stream with retries until the first chunk arrives.
+
+        Once output has been yielded a failure is raised rather than retried.
+        Hedging and the per-attempt timeout do not apply to streams.
+        """
+        policy = self.policy
+        deadline = time.monotonic() + policy.total_timeout if policy.total_timeout is not None else None
+        attempt = 0
+        while True:
+            attempt += 1
+            check_cancelled()
+            started = False
+            try:
+                for chunk in self.provider.stream(prompt, system_prompt=system_prompt, tools=tools, history=history,
+                                                  callbacks=callbacks):
+                    started = True
+                    yield chunk
+                return
+            except LLMError as e:
+                if started or not e.retryable or attempt >= policy.max_attempts:
+                    raise
+                delay = policy.backoff(attempt, self._rng)
+                if e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                cancellable_sleep(delay)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.policy.hedge_delay is not None:
+            return self.policy.hedge_delay
+        if self.policy.hedge_percentile is None or len(self.latency) < self.policy.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.policy.hedge_percentile)
+
+    def _call(self, timeout: Optional[float], prompt: str, system_prompt: str, tools: Optional[List[Tool]],
+              history: Optional[List[Dict[str, str]]], callbacks: Any = None) -> str:
+        start = time.monotonic()
+        try:
+            # The attempt's timeout becomes the provider's deadline, so it bounds the request itself
+            with deadline_scope(timeout):
+                result = self.provider.generate(prompt, system_prompt=system_prompt, tools=tools, history=history,
+                                                callbacks=callbacks)
+        except DeadlineExceededError:
+            # Only the attempt ran out of time unless the caller's own deadline passed too
+            check_cancelled()
+            if timeout is None:
+                raise
+            raise LLMTimeoutError(f"Attempt exceeded {timeout:.3f}s")
+        self.latency.observe(time.monotonic() - start)
+        return result
+
+    def _attempt(self, timeout: Optional[float], prompt: str, system_prompt: str,
+                 tools: Optional[List[Tool]], history: Optional[List[Dict[str, str]]], callbacks: Any = None) -> str:
+        hedge_delay = None if tools else self._hedge_delay()
+        if hedge_delay is None and self.policy.attempt_timeout is None and self.policy.total_timeout is None:
+            # Only the caller's deadline applies, and the provider already honours it
+            try:
+                return self._call(timeout, prompt, system_prompt, tools, history, callbacks)
+            except (LLMError, RunCancelledError):
+                raise
+            except Exception as e:
+                raise LLMError(str(e), retryable=False) from e
+
+        start = time.monotonic()
+        # Copy the context so usage and deadlines follow the call onto the worker
+        def submit() -> concurrent.futures.Future:
+            return self._executor.submit(contextvars.copy_context().run, self._call,
+                                         timeout, prompt, system_prompt, tools, history, callbacks)
+
+        futures = [submit()]
+        if hedge_delay is not None and (timeout is None or hedge_delay < timeout):
+            done, _ = concurrent.futures.wait(futures, timeout=hedge_delay)
+            if not done:
+                futures.append(submit())
+
+        errors: List[BaseException] = []
+        pending = set(futures)
+        while pending:
+            remaining = None if timeout is None else timeout - (time.monotonic() - start)
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = concurrent.futures.wait(pending, timeout=remaining,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                errors.append(future.exception())
+
+        for future in pending:
+            future.cancel()
+        if errors:
+            error = errors[0]
+            if isinstance(error, (LLMError, RunCancelledError)):
+                raise error
+            raise LLMError(str(error), retryable=False) from error
+        raise LLMTimeoutError(f"Attempt exceeded {timeout:.3f}s")
+
+class CircuitOpenError(LLMError):
+    """No endpoint in a fallback chain is currently accepting traffic."""
+    retryable = True
+
+class CircuitBreakerConfig(BaseModel):
+    """
+    When a CircuitBreaker trips and how it recovers.
+
+    Attributes:
+        window: Length of the rolling window of observed calls, in seconds.
+        min_calls: Calls needed in the window before the breaker may trip.
+        error_rate_threshold: Trip when this fraction of calls failed.
+        slow_call_threshold: Calls slower than this many seconds count as slow.
+        slow_call_rate_threshold: Trip when this fraction of calls was slow.
+        open_duration: Seconds to stay open before letting a probe through.
+    """
+    window: float = 30.0
+    min_calls: int = 10
+    error_rate_threshold: float = 0.5
+    slow_call_threshold: Optional[float] = None
+    slow_call_rate_threshold: float = 0.5
+    open_duration: float = 10.0
+
+class CircuitBreaker:
+    """
+    Per-endpoint health tracker with closed, open and half-open states.
+
+    While open, ``allow()`` is False so callers route elsewhere. After
+    ``open_duration`` one probe call is admitted (half-open); its outcome
+    closes the breaker or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _breakers: Dict[str, "CircuitBreaker"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, config: Optional[CircuitBreakerConfig] = None):
+        self.config = config or CircuitBreakerConfig()
+        self.state = self.CLOSED
+        self._calls: Deque[tuple] = collections.deque()
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_key(cls, key: str, config: Optional[CircuitBreakerConfig] = None) -> "CircuitBreaker":
+        """
+        The process-wide breaker of endpoint ``key``, created with ``config`` on first use.
+
+        Raises:
+            ValueError: If the breaker exists with a different ``config``.
+        """
+        with cls._registry_lock:
+            breaker = cls._breakers.get(key)
+            if breaker is None:
+                breaker = cls._breakers[key] = cls(config)
+            elif config is not None and config != breaker.config:
+                raise ValueError(f"Circuit breaker for '{key}' already exists with a different config: "
+                                 f"{breaker.config!r}")
+            return breaker
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._registry_lock:
+            cls._breakers.clear()
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now; admits a single half-open probe."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.config.open_duration:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, success: bool, latency: float) -> None:
+        now = time.monotonic()
+        cfg = self.config
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+                if success and (cfg.slow_call_threshold is None or latency <= cfg.slow_call_threshold):
+                    self.state = self.CLOSED
+                    self._calls.clear()
+                else:
+                    self._trip(now)
+                return
+
+            slow = cfg.slow_call_threshold is not None and latency > cfg.slow_call_threshold
+            self._calls.append((now, success, slow))
+            while self._calls and now - self._calls[0][0] > cfg.window:
+                self._calls.popleft()
+            if self.state != self.CLOSED or len(self._calls) < cfg.min_calls:
+                return
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            slow_calls = sum(1 for _, _, s in self._calls if s)
+            if (failures / len(self._calls) >= cfg.error_rate_threshold
+                    or slow_calls / len(self._calls) >= cfg.slow_call_rate_threshold):
+                self._trip(now)
+
+    def release(self) -> None:
+        """Give up an admitted call without an outcome (cancelled or abandoned); a probe may be sent again."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def _trip(self, now: float) -> None:
+        self.state = self.OPEN
+        self._opened_at = now
+        self._calls.clear()
+
+class FallbackLLM(LLMProvider):
+    """
+    Try an ordered list of providers, skipping those whose circuit is open.
+
+    Retryable failures fail over to the next provider immediately; the
+    outer ResilientLLM decides whether the whole chain is retried.
+    Non-retryable errors (such as a malformed request) are raised as is
+    and do not count against the endpoint's circuit.
+    """
+
+    def __init__(self, providers: List[tuple], config: Optional[CircuitBreakerConfig] = None):
+        self.providers = [(key, provider, CircuitBreaker.for_key(key, config)) for key, provider in providers]
+
+    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+                 callbacks: Any = None) -> str:
+        last_error: Optional[LLMError] = None
+        for key, provider, breaker in self.providers:
+            if not breaker.allow():
+                continue
+            start = time.monotonic()
+            outcome: Optional[bool] = None
+            try:
+                result = provider.generate(prompt, system_prompt=system_prompt, tools=tools, history=history,
+                                           callbacks=callbacks)
+                outcome = True
+            except LLMError as e:
+                # A client error (bad request, auth) means the endpoint answered; it is not the endpoint's fault
+                outcome = not e.retryable
+                if not e.retryable:
+                    raise
+                last_error = e
+                continue
+            except RunCancelledError:
+                raise
+            except Exception:
+                outcome = False
+                raise
+            finally:
+                self._settle(breaker, outcome, start)
+            return result
+        if last_error is not None:
+            raise last_error
+        keys = ", ".join(key for key, _, _ in self.providers)
+        raise CircuitOpenError(f"All circuits open: {keys}")
+
+    @staticmethod
+    def _settle(breaker: CircuitBreaker, outcome: Optional[bool], start: float) -> None:
+        if outcome is None:
+            # Cancelled, past its deadline or abandoned: says nothing about the endpoint
+            breaker.release()
+        else:
+            breaker.record(outcome, time.monotonic() - start)
+
+    def stream(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+               callbacks: Any = None) -> Iterator[str]:
+        """Stream from the first healthy provider; fail over only before the first chunk."""
+        last_error: Optional[LLMError] = None
+        for key, provider, breaker in self.providers:
+            if not breaker.allow():
+                continue
+            start = time.monotonic()
+            started = False
+            outcome: Optional[bool] = None
+            try:
+                for chunk in provider.stream(prompt, system_prompt=system_prompt, tools=tools, history=history,
+                                             callbacks=callbacks):
+                    started = True
+                    yield chunk
+                outcome = True
+            except LLMError as e:
+                # A client error (bad request, auth) means the endpoint answered; it is not the endpoint's fault
+                outcome = not e.retryable
+                if started or not e.retryable:
+                    raise
+                last_error = e
+                continue
+            except RunCancelledError:
+                raise
+            except Exception:
+                outcome = False
+                raise
+            finally:
+                # Also covers a stream abandoned by its consumer (GeneratorExit)
+                self._settle(breaker, outcome, start)
+            return
+        if last_error is not None:
+            raise last_error
+        keys = ", ".join(key for key, _, _ in self.providers)
+        raise CircuitOpenError(f"All circuits open: {keys}")
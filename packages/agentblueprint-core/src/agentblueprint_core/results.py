@@ -0,0 +1,105 @@
+"""
+Spill-to-disk storage for intermediate graph results.
+
+Small node outputs stay in memory; outputs larger than the spill threshold
+are written to a temporary file and kept only as a reference, then read
+back from disk each time a consumer needs them. Results are released
+as soon as their last consumer has read them, so peak memory follows the
+graph's frontier rather than its size.
+"""
+import json
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+class ResultRef:
+    """Reference to an output spilled to ``path`` (``json`` marks non-text values)."""
+
+    __slots__ = ("path", "size", "json")
+
+    def __init__(self, path: Path, size: int, json: bool):
+        self.path = path
+        self.size = size
+        self.json = json
+
+    def __repr__(self) -> str:
+        return f"ResultRef({str(self.path)!r}, size={self.size})"
+
+class ResultStore:
+    """
+    Node results, kept inline or spilled to temporary files.
+
+    Args:
+        spill_threshold: Encoded size in bytes above which a result is
+            spilled; None keeps everything in memory.
+        spill_dir: Parent directory for spill files (default: the system
+            temp directory). Each store uses its own subdirectory.
+
+    Example:
+        >>> store = ResultStore(spill_threshold=1024)
+        >>> store.put("a", "x" * 4096)
+        >>> store.get("a") == "x" * 4096
+        True
+        >>> store.release("a")
+        >>> store.close()
+    """
+
+    def __init__(self, spill_threshold: Optional[int] = None, spill_dir: Optional[str] = None):
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self._values: Dict[str, Any] = {}
+        self._dir: Optional[Path] = None
+        self._spills = 0
+        self._lock = threading.Lock()
+
+    def _spill_path(self, key: str) -> Path:
+        with self._lock:
+            if self._dir is None:
+                self._dir = Path(tempfile.mkdtemp(prefix="agentblueprint-results-", dir=self.spill_dir))
+            self._spills += 1
+            return self._dir / f"{self._spills}.out"
+
+    def put(self, key: str, value: Any) -> None:
+        if self.spill_threshold is not None and not isinstance(value, (int, float, bool, type(None))):
+            is_text = isinstance(value, str)
+            # Cheap pre-check: a str encodes to at most 4 bytes per character
+            if not is_text or len(value) * 4 > self.spill_threshold:
+                data = (value if is_text else json.dumps(value, default=str)).encode("utf-8")
+                if len(data) > self.spill_threshold:
+                    path = self._spill_path(key)
+                    path.write_bytes(data)
+                    value = ResultRef(path, len(data), json=not is_text)
+        self.release(key)
+        self._values[key] = value
+
+    def get(self, key: str) -> Any:
+        value = self._values[key]
+        if not isinstance(value, ResultRef):
+            return value
+        text = value.path.read_bytes().decode("utf-8")
+        return json.loads(text) if value.json else text
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._values))
+
+    def spilled(self, key: str) -> bool:
+        return isinstance(self._values.get(key), ResultRef)
+
+    def release(self, key: str) -> None:
+        """Forget a result and delete its spill file."""
+        value = self._values.pop(key, None)
+        if isinstance(value, ResultRef):
+            value.path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Release everything."""
+        self._values.clear()
+        with self._lock:
+            spill_dir, self._dir = self._dir, None
+        if spill_dir is not None:
+            shutil.rmtree(spill_dir, ignore_errors=True)
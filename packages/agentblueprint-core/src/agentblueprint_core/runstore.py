@@ -0,0 +1,101 @@
+"""
+Run store for checkpointing graph workflow runs.
+
+Each run is an append-only JSONL file named after its run ID. The first
+line records the workflow and its input; every finished node appends its
+status and result. Resuming a run replays the file and re-executes only the
+nodes that did not complete.
+"""
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RUN_DIR_ENV = "AGENTBLUEPRINT_RUN_DIR"
+
+def default_run_dir() -> Path:
+    """``$AGENTBLUEPRINT_RUN_DIR``, else ``$XDG_STATE_HOME/agentblueprint/runs``."""
+    if os.environ.get(RUN_DIR_ENV):
+        return Path(os.environ[RUN_DIR_ENV])
+    base = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+    return base / "agentblueprint" / "runs"
+
+class RunStore:
+    """
+    Directory of append-only run logs.
+
+    Example:
+        >>> store = RunStore("/tmp/runs")
+        >>> run_id = store.start("my_graph", "input")
+        >>> store.record(run_id, "node_a", "done", result="output")
+        >>> store.completed(run_id)
+        {'node_a': 'output'}
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root is not None else default_run_dir()
+
+    def _path(self, run_id: str) -> Path:
+        return self.root / f"{run_id}.jsonl"
+
+    def _append(self, run_id: str, entry: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self._path(run_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(self, workflow: str, initial_input: Any, run_id: Optional[str] = None) -> str:
+        """Open a new run log and return its ID."""
+        run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._append(run_id, {"event": "start", "workflow": workflow, "input": initial_input, "ts": time.time()})
+        return run_id
+
+    def record(self, run_id: str, node_id: str, status: str, result: Any = None,
+               error: Optional[str] = None, **extra: Any) -> None:
+        """Checkpoint one node's outcome."""
+        entry = {"event": "node", "node": node_id, "status": status, "result": result,
+                 "error": error, "ts": time.time(), **extra}
+        self._append(run_id, entry)
+
+    def entries(self, run_id: str) -> List[Dict[str, Any]]:
+        """All log lines of a run; a torn final line (crash mid-write) is ignored."""
+        path = self._path(run_id)
+        if not path.exists():
+            raise KeyError(f"Unknown run '{run_id}' in {self.root}")
+        entries = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return entries
+
+    def info(self, run_id: str) -> Dict[str, Any]:
+        """The run's start record (workflow name and input)."""
+        return self.entries(run_id)[0]
+
+    def completed(self, run_id: str) -> Dict[str, Any]:
+        """Results of the nodes whose latest checkpoint is successful."""
+        latest: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries(run_id):
+            if entry.get("event") == "node":
+                latest[entry["node"]] = entry
+        return {node: e["result"] for node, e in latest.items() if e["status"] in ("done", "reused")}
+
+    def routes(self, run_id: str) -> Dict[str, List[str]]:
+        """Targets selected by the router nodes that completed."""
+        routes: Dict[str, List[str]] = {}
+        for entry in self.entries(run_id):
+            if entry.get("event") == "node" and entry["status"] == "done" and "routes" in entry:
+                routes[entry["node"]] = entry["routes"]
+        return routes
+
+    def runs(self) -> List[str]:
+        """Run IDs in the store, oldest first."""
+        if not self.root.exists():
+            return []
+        return [p.stem for p in sorted(self.root.glob("*.jsonl"), key=lambda p: p.stat().st_mtime)]
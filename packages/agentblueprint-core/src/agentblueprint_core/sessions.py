@@ -0,0 +1,260 @@
+"""
+Per-session agent memory for agents that serve many users.
+
+A ``SessionMemoryManager`` keeps one Memory per session ID. Runs in the same
+session are serialized; different sessions run concurrently. Sessions are
+kept in least-recently-used order, and when more than ``max_sessions`` are
+resident or their messages exceed ``max_bytes``, idle sessions are evicted
+from RAM to a ``SessionStore`` and reloaded on their next run.
+"""
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from agentblueprint_core.memory import CompactMemory, Memory
+
+logger = logging.getLogger(__name__)
+
+SESSION_DIR_ENV = "AGENTBLUEPRINT_SESSION_DIR"
+
+def default_session_dir() -> Path:
+    """``$AGENTBLUEPRINT_SESSION_DIR``, else ``$XDG_STATE_HOME/agentblueprint/sessions``."""
+    if os.environ.get(SESSION_DIR_ENV):
+        return Path(os.environ[SESSION_DIR_ENV])
+    base = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+    return base / "agentblueprint" / "sessions"
+
+def memory_size(memory: Memory) -> int:
+    """Approximate bytes held by a memory's messages."""
+    nbytes = getattr(memory, "nbytes", None)
+    if nbytes is not None:
+        return nbytes
+    return sum(len(msg["role"]) + len(msg["content"]) for msg in memory.get_history())
+
+class SessionStore:
+    """
+    Directory of evicted session histories, one JSON file per session.
+
+    Example:
+        >>> store = SessionStore("/tmp/sessions")
+        >>> store.save("user-1", [{"role": "user", "content": "Hi"}])
+        >>> store.load("user-1")
+        [{'role': 'user', 'content': 'Hi'}]
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root is not None else default_session_dir()
+
+    def _path(self, session_id: str) -> Path:
+        return self.root / f"{quote(session_id, safe='')}.json"
+
+    def save(self, session_id: str, messages: List[Dict[str, str]]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(session_id)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(messages), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load(self, session_id: str) -> Optional[List[Dict[str, str]]]:
+        """The saved history, or None for an unknown session."""
+        try:
+            return json.loads(self._path(session_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def delete(self, session_id: str) -> None:
+        self._path(session_id).unlink(missing_ok=True)
+
+class SessionMemoryManager:
+    """
+    One Memory per session, with LRU eviction of idle sessions.
+
+    Args:
+        memory_factory: Creates the memory of a new session.
+        max_sessions: Most sessions kept in RAM; None for no limit.
+        max_bytes: Most bytes of messages kept in RAM (see ``memory_size``);
+            None for no limit.
+        store: Where evicted sessions are saved. Without a store, evicted
+            sessions are forgotten.
+
+    Sessions in use by a run are never evicted, so the limits can be
+    exceeded while that many sessions are active at once. Evicted sessions
+    are saved outside the manager lock, so a slow store only delays runs
+    of the session being saved. A session that fails to save is logged and
+    stays resident, to be saved again on a later eviction; only ``evict``
+    and ``flush`` raise the error.
+
+    Example:
+        >>> sessions = SessionMemoryManager(max_sessions=1000, store=SessionStore("/tmp/sessions"))
+        >>> agent = Agent(name="chat", model="mock", sessions=sessions)
+        >>> agent.run("Hi", session_id="user-1")  # doctest: +SKIP
+    """
+
+    def __init__(self, memory_factory: Callable[[], Memory] = CompactMemory, max_sessions: Optional[int] = None,
+                 max_bytes: Optional[int] = None, store: Optional[SessionStore] = None):
+        self.memory_factory = memory_factory
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.store = store
+        self._sessions: "OrderedDict[str, Memory]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._pins: Dict[str, int] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        # Evicted sessions whose save is in progress, held by their session lock
+        self._saving: Dict[str, threading.Lock] = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of messages in resident sessions, as of their last run."""
+        return self._nbytes
+
+    @contextmanager
+    def _locked(self, session_id: str) -> Iterator[None]:
+        """Hold the manager lock once ``session_id`` is not being saved."""
+        while True:
+            with self._lock:
+                saving = self._saving.get(session_id)
+                if saving is None:
+                    yield
+                    return
+            # A reload must read the finished save
+            with saving:
+                pass
+
+    def _load(self, session_id: str) -> Memory:
+        memory = self._sessions.get(session_id)
+        if memory is not None:
+            self._sessions.move_to_end(session_id)
+            return memory
+        memory = self.memory_factory()
+        for msg in (self.store.load(session_id) if self.store else None) or []:
+            memory.add(msg["role"], msg["content"])
+        self._sessions[session_id] = memory
+        self._resize(session_id)
+        return memory
+
+    def _resize(self, session_id: str) -> None:
+        size = memory_size(self._sessions[session_id])
+        self._nbytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+
+    def _over_limit(self) -> bool:
+        return (self.max_sessions is not None and len(self._sessions) > self.max_sessions) or \
+            (self.max_bytes is not None and self._nbytes > self.max_bytes)
+
+    def _evict_idle(self) -> List[Tuple[str, Memory, threading.Lock]]:
+        evicted = []
+        for session_id in list(self._sessions):
+            if not self._over_limit():
+                break
+            if not self._pins.get(session_id):
+                evicted.extend(self._evict(session_id))
+        return evicted
+
+    def _evict(self, session_id: str) -> List[Tuple[str, Memory, threading.Lock]]:
+        """Drop an idle session from RAM; returns it for ``_save`` unless there is no store."""
+        memory = self._sessions.pop(session_id)
+        self._nbytes -= self._sizes.pop(session_id)
+        lock = self._locks.pop(session_id, None) or threading.Lock()
+        if self.store is None:
+            return []
+        # Idle sessions have no run holding or waiting for their lock
+        lock.acquire()
+        self._saving[session_id] = lock
+        return [(session_id, memory, lock)]
+
+    def _save(self, evicted: List[Tuple[str, Memory, threading.Lock]]) -> Optional[Exception]:
+        """Write evicted sessions to the store; called without the manager lock. Returns the first error."""
+        error = None
+        for session_id, memory, lock in evicted:
+            failed = False
+            try:
+                self.store.save(session_id, memory.get_history())
+            except Exception as e:
+                logger.exception("Could not save session %s; keeping it in memory", session_id)
+                error, failed = error or e, True
+            finally:
+                with self._lock:
+                    del self._saving[session_id]
+                    if failed:
+                        # First in line for the next eviction, which retries the save
+                        self._sessions[session_id] = memory
+                        self._sessions.move_to_end(session_id, last=False)
+                        self._locks[session_id] = lock
+                        self._resize(session_id)
+                lock.release()
+        return error
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[Memory]:
+        """Hold ``session_id``'s memory for one run; other runs of the session wait."""
+        with self._locked(session_id):
+            memory = self._load(session_id)
+            self._pins[session_id] = self._pins.get(session_id, 0) + 1
+            lock = self._locks.setdefault(session_id, threading.Lock())
+        try:
+            with lock:
+                yield memory
+        finally:
+            with self._lock:
+                self._pins[session_id] -= 1
+                if not self._pins[session_id]:
+                    del self._pins[session_id]
+                if session_id in self._sessions:
+                    self._resize(session_id)
+                evicted = self._evict_idle()
+            self._save(evicted)
+
+    def get(self, session_id: str) -> Memory:
+        """``session_id``'s memory, loading or creating it (for inspection)."""
+        with self._locked(session_id):
+            memory = self._load(session_id)
+            evicted = self._evict_idle()
+        self._save(evicted)
+        return memory
+
+    def evict(self, session_id: str) -> None:
+        """Move an idle session out of RAM now."""
+        evicted = []
+        with self._lock:
+            if session_id in self._sessions and not self._pins.get(session_id):
+                evicted = self._evict(session_id)
+        error = self._save(evicted)
+        if error is not None:
+            raise error
+
+    def flush(self) -> None:
+        """Evict every idle session, e.g. before shutting down."""
+        evicted = []
+        with self._lock:
+            for session_id in list(self._sessions):
+                if not self._pins.get(session_id):
+                    evicted.extend(self._evict(session_id))
+        error = self._save(evicted)
+        if error is not None:
+            raise error
+
+    def delete(self, session_id: str) -> None:
+        """Forget a session, in RAM and in the store."""
+        with self._locked(session_id):
+            if session_id in self._sessions:
+                self._sessions.pop(session_id)
+                self._nbytes -= self._sizes.pop(session_id)
+                if not self._pins.get(session_id):
+                    self._locks.pop(session_id, None)
+            if self.store is not None:
+                self.store.delete(session_id)
@@ -0,0 +1,159 @@
+"""
+Single-flight coalescing of identical concurrent LLM requests.
+
+When several nodes send byte-identical requests at the same moment, only
+one reaches the provider; the others attach to it and share its result.
+"""
+import concurrent.futures
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from agentblueprint_core.context import CancellationToken, check_cancelled, detached_scope, remaining_time
+from agentblueprint_core.llm import LLMProvider, LLMTimeoutError
+from agentblueprint_core.tools import Tool
+
+# How often waiters check their own cancellation and deadline
+_POLL_INTERVAL = 0.05
+
+class _Flight:
+    __slots__ = ("future", "token", "waiters")
+
+    def __init__(self, future: concurrent.futures.Future, token: CancellationToken):
+        self.future = future
+        self.token = token
+        self.waiters = 0
+
+def _run_detached(token: CancellationToken, fn: Callable[[], Any]) -> Any:
+    with detached_scope(token):
+        return fn()
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share a key.
+
+    The call runs on a worker thread, outside the cancellation and deadline
+    of the caller that started it, so one caller giving up never fails the
+    others. Each waiter leaves on its own timeout, cancellation or deadline;
+    when the last waiter leaves, the call is cancelled. Errors are re-raised
+    in every waiter.
+
+    Example:
+        >>> group = SingleFlight()
+        >>> group.do("key", lambda: 42)
+        42
+    """
+
+    _executor = concurrent.futures.ThreadPoolExecutor(max_workers=64, thread_name_prefix="agentblueprint-flight")
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        # Re-entrant: done callbacks may fire synchronously while we hold it
+        self._lock = threading.RLock()
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run ``fn`` unless an identical call is in flight, and return its result."""
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            flight = self._attach(key, fn)
+            try:
+                self._wait(flight, end, timeout)
+            finally:
+                self._leave(key, flight)
+            if flight.future.cancelled() or flight.token.cancelled:
+                # Stopped because its callers left, not because of this caller: start a new flight
+                continue
+            return flight.future.result()
+
+    def _attach(self, key: str, fn: Callable[[], Any]) -> _Flight:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None or flight.token.cancelled:
+                token = CancellationToken()
+                # Copy the context so usage is still attributed to the first caller
+                future = self._executor.submit(contextvars.copy_context().run, _run_detached, token, fn)
+                flight = self._flights[key] = _Flight(future, token)
+                flight.future.add_done_callback(lambda _, k=key, f=flight: self._forget(k, f))
+            else:
+                self.shared += 1
+            flight.waiters += 1
+            return flight
+
+    def _wait(self, flight: _Flight, end: Optional[float], timeout: Optional[float]) -> None:
+        # Poll so the caller's own cancellation and deadline end the wait
+        while True:
+            check_cancelled()
+            step = _POLL_INTERVAL
+            for left in (remaining_time(), None if end is None else end - time.monotonic()):
+                if left is not None:
+                    step = min(step, left)
+            if end is not None and step <= 0:
+                raise LLMTimeoutError(f"Coalesced call did not finish within {timeout}s")
+            done, _ = concurrent.futures.wait([flight.future], timeout=max(step, 0.0))
+            if done:
+                return
+
+    def _leave(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.future.done():
+                # Nobody wants the result: stop the call if it has not started,
+                # ask it to stop otherwise, and let new callers start afresh
+                flight.future.cancel()
+                flight.token.cancel("all callers left")
+                self._forget(key, flight)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+def request_key(model: str, prompt: str, system_prompt: str = "", tools: Optional[List[Tool]] = None,
+                history: Optional[List[Dict[str, str]]] = None) -> str:
+    """Stable digest identifying an LLM request."""
+    payload = json.dumps({
+        "model": model,
+        "system": system_prompt,
+        "prompt": prompt,
+        "tools": [t.name for t in tools or []],
+        "history": history or [],
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class CoalescingLLM(LLMProvider):
+    """
+    Provider wrapper that shares in-flight results of identical requests.
+
+    All instances use one process-wide SingleFlight group, so identical
+    requests coalesce across agents, nodes and concurrent workflow runs.
+    A caller stops waiting when its own run is cancelled or its deadline
+    passes (``timeout`` bounds the wait further), and the shared call is
+    cancelled once no caller is waiting for it.
+    """
+
+    group = SingleFlight()
+
+    def __init__(self, provider: LLMProvider, key: str, timeout: Optional[float] = None):
+        self.provider = provider
+        self.key = key
+        self.timeout = timeout
+
+    def generate(self, prompt: str, system_prompt: str = "", tools: List[Tool] = None, history: List[Dict[str, str]] = None,
+                 callbacks: Any = None) -> str:
+        # Snapshot history: the caller's memory list may grow while we wait
+        history = list(history) if history else None
+        key = request_key(self.key, prompt, system_prompt, tools, history)
+        return self.group.do(
+            key,
+            lambda: self.provider.generate(prompt, system_prompt=system_prompt, tools=tools, history=history,
+                                           callbacks=callbacks),
+            timeout=self.timeout,
+        )
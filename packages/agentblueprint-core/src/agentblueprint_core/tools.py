@@ -6,7 +6,11 @@ to perform specific tasks.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+import importlib
+import threading
+from typing import Any, Callable, Optional
+
+from agentblueprint_core.context import check_cancelled, remaining_time
 
 
 class Tool(ABC):
@@ -20,6 +24,11 @@ class Tool(ABC):
         name: Unique identifier for the tool
         description: Human-readable description of what the tool does
         parameters: Optional parameter schema for the tool
+        execution: ``"thread"`` (default) runs in the caller; ``"process"``
+            runs in a per-tool process pool, for CPU-bound tools
+        pool_size: Worker processes for a process tool (default: CPU count)
+        timeout: Seconds before a process tool call is abandoned
+        max_calls_per_worker: Recycle a worker process after this many calls
         
     Example:
         >>> class CalculatorTool(Tool):
@@ -37,6 +46,10 @@ class Tool(ABC):
     name: str
     description: str
     parameters: Optional[dict[str, Any]] = None
+    execution: str = "thread"
+    pool_size: Optional[int] = None
+    timeout: Optional[float] = None
+    max_calls_per_worker: Optional[int] = None
     
     @abstractmethod
     def run(self, **kwargs) -> Any:
@@ -54,6 +67,34 @@ class Tool(ABC):
         """
         pass
     
+    def invoke(self, arguments: Optional[dict[str, Any]] = None, callbacks: Any = None) -> Any:
+        """
+        Run the tool as the framework does, honouring ``execution``.
+
+        ``arguments`` are passed to ``run`` as keyword arguments.
+        ``on_tool_start``/``on_tool_end`` fire on ``callbacks`` (a
+        CallbackManager) in the calling process, also for process tools.
+        Raises RunCancelledError when the surrounding run was cancelled; process
+        tools are also bounded by the run's remaining deadline.
+        """
+        kwargs = dict(arguments or {})
+        check_cancelled()
+        if callbacks is not None:
+            callbacks.on_tool_start(self.name, kwargs)
+        if self.execution == "process":
+            from agentblueprint_core.process_pool import ToolProcessPool
+
+            timeout = self.timeout
+            remaining = remaining_time()
+            if remaining is not None:
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            result = ToolProcessPool.for_tool(self).call(self, kwargs, timeout=timeout)
+        else:
+            result = self.run(**kwargs)
+        if callbacks is not None:
+            callbacks.on_tool_end(self.name, result)
+        return result
+
     def to_dict(self) -> dict[str, Any]:
         """
         Convert tool to dictionary for serialization.
@@ -68,12 +109,32 @@ class Tool(ABC):
         }
 
 
+ToolFactory = Callable[[], Tool]
+
+ENTRY_POINT_GROUP = "agentblueprint.tools"
+
+def _import_factory(import_path: str) -> ToolFactory:
+    """Build a factory that imports ``"module:attr"`` only when called."""
+    def factory() -> Tool:
+        module_name, attr = import_path.split(":", 1)
+        return getattr(importlib.import_module(module_name), attr)()
+    return factory
+
+def _entry_point_factory(entry_point: Any) -> ToolFactory:
+    return lambda: entry_point.load()()
+
 class ToolRegistry:
     """
     Global registry for tool discovery and management.
     
     Provides a centralized location for registering and
-    retrieving tools by name.
+    retrieving tools by name. The registry holds lightweight factories;
+    a tool is imported and instantiated on its first ``get()``. Tools
+    published by installed packages under the ``agentblueprint.tools``
+    entry-point group are discovered automatically.
+    
+    Writes replace the factory table instead of mutating it, so
+    ``scoped()`` snapshots are free and lookups need no lock.
     
     Example:
         >>> class MyTool(Tool):
@@ -88,7 +149,10 @@ class ToolRegistry:
         'my_tool'
     """
     
+    _factories: dict[str, ToolFactory] = {}
     _tools: dict[str, Tool] = {}
+    _discovered = False
+    _lock = threading.RLock()
     
     @classmethod
     def register(cls, tool: Tool) -> None:
@@ -98,7 +162,51 @@ class ToolRegistry:
         Args:
             tool: Tool instance to register
         """
-        cls._tools[tool.name] = tool
+        with cls._lock:
+            cls._factories = {**cls._factories, tool.name: lambda: tool}
+            cls._tools[tool.name] = tool
+    
+    @classmethod
+    def register_factory(cls, name: str, factory: ToolFactory) -> None:
+        """
+        Register a callable that creates the tool on first use.
+        
+        Args:
+            name: Name the tool is looked up by
+            factory: Zero-argument callable returning a Tool (e.g. the class)
+        """
+        with cls._lock:
+            cls._factories = {**cls._factories, name: factory}
+            cls._tools.pop(name, None)
+    
+    @classmethod
+    def register_lazy(cls, name: str, import_path: str) -> None:
+        """
+        Register a tool class to be imported and instantiated on first use.
+        
+        Args:
+            name: Name the tool is looked up by
+            import_path: ``"package.module:ClassName"`` of the tool class
+        """
+        if name not in cls._factories:
+            cls.register_factory(name, _import_factory(import_path))
+    
+    @classmethod
+    def discover(cls) -> None:
+        """
+        Register factories for tools advertised through entry points.
+        
+        Runs once; tools registered explicitly take precedence.
+        """
+        if cls._discovered:
+            return
+        with cls._lock:
+            if cls._discovered:
+                return
+            from importlib.metadata import entry_points
+            found = {ep.name: _entry_point_factory(ep) for ep in entry_points(group=ENTRY_POINT_GROUP)}
+            cls._factories = {**found, **cls._factories}
+            cls._discovered = True
     
     @classmethod
     def get(cls, name: str) -> Optional[Tool]:
@@ -111,17 +219,55 @@ class ToolRegistry:
         Returns:
             Tool instance if found, None otherwise
         """
-        return cls._tools.get(name)
+        tool = cls._tools.get(name)
+        if tool is not None:
+            return tool
+        cls.discover()
+        factory = cls._factories.get(name)
+        if factory is None:
+            return None
+        with cls._lock:
+            tool = cls._tools.get(name)
+            if tool is None:
+                tool = cls._tools[name] = factory()
+        return tool
     
     @classmethod
     def list_all(cls) -> list[Tool]:
         """
         List all registered tools.
         
+        Lazily registered tools are instantiated by this call.
+        
         Returns:
             List of all registered tool instances
         """
-        return list(cls._tools.values())
+        return [cls.get(name) for name in cls.names()]
+    
+    @classmethod
+    def names(cls) -> list[str]:
+        """
+        List the names of all registered tools without instantiating them.
+        
+        Returns:
+            List of registered tool names
+        """
+        cls.discover()
+        return list(cls._factories)
+    
+    @classmethod
+    def scoped(cls) -> "ScopedToolRegistry":
+        """
+        Snapshot the global registry into an instance-scoped one.
+        
+        Registrations on the scoped registry stay private to it, so
+        concurrent workflows cannot overwrite each other's tools.
+        
+        Returns:
+            A ScopedToolRegistry sharing the current factory table
+        """
+        cls.discover()
+        return ScopedToolRegistry(cls._factories)
     
     @classmethod
     def clear(cls) -> None:
@@ -129,5 +275,62 @@ class ToolRegistry:
         Clear the registry.
         
         This is mainly useful for testing to ensure a clean state.
+        Entry points are rediscovered on next use.
         """
-        cls._tools.clear()
+        with cls._lock:
+            cls._factories = {}
+            cls._tools.clear()
+            cls._discovered = False
+
+class ScopedToolRegistry:
+    """
+    Per-run tool registry derived from the global ToolRegistry.
+    
+    Shares the global factory table until its first write (copy-on-write)
+    and keeps its own tool instances.
+    
+    Example:
+        >>> registry = ToolRegistry.scoped()
+        >>> registry.register(MyTool())
+        >>> registry.get("my_tool").name
+        'my_tool'
+    """
+    
+    def __init__(self, factories: dict[str, ToolFactory]):
+        self._factories = factories
+        self._tools: dict[str, Tool] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, tool: Tool) -> None:
+        """Register a tool instance in this scope only."""
+        with self._lock:
+            self._factories = {**self._factories, tool.name: lambda: tool}
+            self._tools[tool.name] = tool
+    
+    def register_factory(self, name: str, factory: ToolFactory) -> None:
+        """Register a tool factory in this scope only."""
+        with self._lock:
+            self._factories = {**self._factories, name: factory}
+            self._tools.pop(name, None)
+    
+    def get(self, name: str) -> Optional[Tool]:
+        """Get a tool by name, instantiating it on first use."""
+        tool = self._tools.get(name)
+        if tool is not None:
+            return tool
+        factory = self._factories.get(name)
+        if factory is None:
+            return None
+        with self._lock:
+            tool = self._tools.get(name)
+            if tool is None:
+                tool = self._tools[name] = factory()
+        return tool
+    
+    def names(self) -> list[str]:
+        """List tool names visible in this scope."""
+        return list(self._factories)
+    
+    def list_all(self) -> list[Tool]:
+        """List all tools visible in this scope, instantiating them."""
+        return [self.get(name) for name in self.names()]
@@ -0,0 +1,173 @@
+"""
+Token usage accounting and budgets for AgentBlueprint.
+
+Providers report usage with ``record_usage``; it lands in the
+``UsageTracker`` active in the current context, attributed to the current
+agent and workflow node. Workflows activate a tracker per run and stop
+scheduling work once its token budget is spent.
+"""
+import contextlib
+import contextvars
+import re
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from pydantic import BaseModel
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local estimate of the number of BPE tokens in ``text``.
+
+    Words and punctuation count as one token each, with long words counted
+    as one token per five characters. Close enough for pre-flight checks.
+
+    Example:
+        >>> estimate_tokens("Hello, world!")
+        4
+    """
+    return sum(max(1, (len(piece) + 4) // 5) for piece in _TOKEN_RE.findall(text))
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    The longest prefix of ``text`` estimated at no more than ``max_tokens``.
+
+    Example:
+        >>> truncate_tokens("Hello, world!", 2)
+        'Hello,'
+    """
+    used = 0
+    for match in _TOKEN_RE.finditer(text):
+        piece = match.group()
+        used += max(1, (len(piece) + 4) // 5)
+        if used > max_tokens:
+            return text[:match.start()].rstrip()
+    return text
+
+class TokenUsage(BaseModel):
+    """Token counts for one or more provider calls."""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    calls: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int) -> None:
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.calls += 1
+
+class UsageTracker:
+    """
+    Thread-safe aggregation of token usage per agent, node and model.
+
+    Args:
+        budget: Optional cap on total tokens for this tracker.
+        parent: Tracker that also receives every record (e.g. a CLI-wide total).
+
+    Example:
+        >>> tracker = UsageTracker(budget=1000)
+        >>> with tracker.activate():
+        ...     record_usage("mock:echo", 10, 5)
+        >>> tracker.total.total_tokens
+        15
+    """
+
+    def __init__(self, budget: Optional[int] = None, parent: Optional["UsageTracker"] = None):
+        self.budget = budget
+        self.parent = parent
+        self.total = TokenUsage()
+        self.by_agent: Dict[str, TokenUsage] = {}
+        self.by_node: Dict[str, TokenUsage] = {}
+        self.by_model: Dict[str, TokenUsage] = {}
+        self.budget_exhausted = False
+        self._lock = threading.Lock()
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int,
+               agent: Optional[str] = None, node: Optional[str] = None) -> None:
+        with self._lock:
+            self.total.add(prompt_tokens, completion_tokens)
+            for bucket, key in ((self.by_model, model), (self.by_agent, agent), (self.by_node, node)):
+                if key is not None:
+                    bucket.setdefault(key, TokenUsage()).add(prompt_tokens, completion_tokens)
+        if self.parent is not None:
+            self.parent.record(model, prompt_tokens, completion_tokens, agent=agent, node=node)
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Tokens left in the budget, or None when unlimited."""
+        if self.budget is None:
+            return None
+        return max(0, self.budget - self.total.total_tokens)
+
+    def can_afford(self, estimated_tokens: int = 0) -> bool:
+        """
+        Whether new work estimated at ``estimated_tokens`` fits the budget.
+
+        Returns False (and marks the budget exhausted) once it is spent.
+        """
+        remaining = self.remaining
+        if remaining is None:
+            return True
+        if remaining <= 0 or estimated_tokens > remaining:
+            self.budget_exhausted = True
+            return False
+        return True
+
+    def summary(self) -> Dict[str, object]:
+        """Plain-dict report of all totals, suitable for printing or JSON."""
+        def dump(bucket: Dict[str, TokenUsage]) -> Dict[str, Dict[str, int]]:
+            return {k: {**v.model_dump(), "total_tokens": v.total_tokens} for k, v in bucket.items()}
+
+        with self._lock:
+            return {
+                "total": {**self.total.model_dump(), "total_tokens": self.total.total_tokens},
+                "by_model": dump(self.by_model),
+                "by_agent": dump(self.by_agent),
+                "by_node": dump(self.by_node),
+                "budget": self.budget,
+                "budget_exhausted": self.budget_exhausted,
+            }
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["UsageTracker"]:
+        """Make this the tracker that ``record_usage`` reports to."""
+        token = _tracker.set(self)
+        try:
+            yield self
+        finally:
+            _tracker.reset(token)
+
+_tracker: contextvars.ContextVar[Optional[UsageTracker]] = contextvars.ContextVar("agentblueprint_usage", default=None)
+_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("agentblueprint_agent", default=None)
+_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("agentblueprint_node", default=None)
+
+def current_tracker() -> Optional[UsageTracker]:
+    return _tracker.get()
+
+def usage_labels() -> Tuple[Optional[str], Optional[str]]:
+    """The agent and node that usage is currently attributed to."""
+    return _agent.get(), _node.get()
+
+@contextlib.contextmanager
+def usage_scope(agent: Optional[str] = None, node: Optional[str] = None) -> Iterator[None]:
+    """Attribute usage recorded inside the block to ``agent`` and/or ``node``."""
+    tokens = []
+    if agent is not None:
+        tokens.append((_agent, _agent.set(agent)))
+    if node is not None:
+        tokens.append((_node, _node.set(node)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+def record_usage(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """Report one provider call to the active tracker, if any."""
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.record(model, prompt_tokens, completion_tokens, agent=_agent.get(), node=_node.get())
@@ -2,19 +2,62 @@
 Workflow orchestration for AgentBlueprint.
 """
 from abc import ABC, abstractmethod
-from typing import Any, Optional, List, Dict, Set
-from pydantic import BaseModel, Field
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Literal, Optional, List, Dict, Set, Union
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 import concurrent.futures
+import functools
+import heapq
+import json
+import re
 
 from agentblueprint_core.agent import Agent
+from agentblueprint_core.executors import Executor, get_executor, use_executor
+from agentblueprint_core.llm import estimate_prompt_tokens
+from agentblueprint_core.artifacts import ArtifactStore, node_key
+from agentblueprint_core.context import (
+    CancellationToken, DeadlineExceededError, RunCancelledError, cancellation_scope, check_cancelled,
+    current_token, deadline_scope, remaining_time,
+)
+from agentblueprint_core.graph import CompactGraph
+from agentblueprint_core.pipeline import Pipeline
+from agentblueprint_core.results import ResultStore
+from agentblueprint_core.runstore import RunStore
+from agentblueprint_core.usage import UsageTracker, current_tracker, estimate_tokens, truncate_tokens, usage_scope
 
 class Workflow(BaseModel, ABC):
-    """Base class for workflows."""
+    """
+    Base class for workflows.
+
+    Each run records token usage in its own UsageTracker (chained to any
+    tracker already active, such as the CLI's). With ``token_budget`` set, no
+    new agent is scheduled once the run's usage plus the estimated prompt of
+    the next agent would exceed it; the run then returns what it has.
+
+    Concurrent work goes to ``executor``: an Executor, an executor name
+    (``"threads"``, ``"asyncio"``, ``"processes"``) or a dict with ``type``
+    and options. When unset, the enclosing workflow's executor or the shared
+    thread pool is used.
+
+    ``run(..., deadline=seconds)`` (or ``timeout`` as the default) bounds the
+    whole run. The deadline propagates to agents, provider HTTP calls and
+    tools, which give up with ``DeadlineExceededError`` once it passes.
+    """
     name: str = "default_workflow"
+    token_budget: Optional[int] = None
+    executor: Optional[Any] = None
+    timeout: Optional[float] = None
+
+    def _usage_tracker(self) -> UsageTracker:
+        return UsageTracker(budget=self.token_budget, parent=current_tracker())
+
+    def _executor(self) -> Executor:
+        return get_executor(self.executor)
+
+    def _deadline_scope(self, deadline: Optional[float]):
+        return deadline_scope(deadline if deadline is not None else self.timeout)
     
     @abstractmethod
-    @abstractmethod
-    def run(self, initial_input: Any, callbacks: list = None) -> Any:
+    def run(self, initial_input: Any, callbacks: list = None, deadline: Optional[float] = None) -> Any:
         """Execute the workflow."""
         pass
 
@@ -25,19 +68,70 @@ class SequentialWorkflow(Workflow):
     """
     agents: List[Agent]
     
-    def run(self, initial_input: Any, callbacks: list = None) -> Any:
+    def run(self, initial_input: Any, callbacks: list = None, deadline: Optional[float] = None) -> Any:
         from agentblueprint_core.callbacks import CallbackManager
         cm = CallbackManager(callbacks)
         cm.on_workflow_start(self.name, initial_input)
 
         current_input = initial_input
-        for agent in self.agents:
-            # Pass callbacks down to agent
-            current_input = agent.run(str(current_input), callbacks=callbacks)
+        with self._usage_tracker().activate() as tracker, use_executor(self._executor()), \
+                self._deadline_scope(deadline):
+            for agent in self.agents:
+                if not tracker.can_afford(estimate_prompt_tokens(str(current_input), agent.system_prompt)):
+                    break
+                # Pass callbacks down to agent
+                current_input = agent.run(str(current_input), callbacks=callbacks)
 
         cm.on_workflow_end(self.name, current_input)
         return current_input
 
+    def _pipeline(self, callbacks: list, concurrency: Union[int, List[int]], queue_size: int,
+                  ordered: bool) -> Pipeline:
+        tracker = self._usage_tracker()
+        executor = self._executor()
+
+        def stage(agent: Agent) -> Callable[[Any], Any]:
+            def run_stage(value: Any) -> Any:
+                with tracker.activate(), use_executor(executor):
+                    # Out of budget: pass the item through as far as it got, like run()
+                    if tracker.budget_exhausted or \
+                            not tracker.can_afford(estimate_prompt_tokens(str(value), agent.system_prompt)):
+                        return value
+                    return agent.run(str(value), callbacks=callbacks)
+            return run_stage
+
+        return Pipeline([stage(agent) for agent in self.agents], concurrency=concurrency,
+                        queue_size=queue_size, ordered=ordered)
+
+    def stream(self, inputs: Iterable[Any], callbacks: list = None, concurrency: Union[int, List[int]] = 1,
+               queue_size: int = 8, ordered: bool = True) -> Iterator[Any]:
+        """
+        Run the chain over a stream of inputs, pipelining the agents.
+
+        Each agent gets ``concurrency`` worker threads of its own (or one
+        count per agent), connected by queues of ``queue_size`` items, so
+        agent N handles item i while agent N-1 handles item i+1. Results are
+        yielded in input order, or as they finish with ``ordered=False``.
+        ``token_budget`` applies to the whole stream. Closing the iterator
+        cancels items in flight; the first agent error is raised.
+
+        Example:
+            >>> for summary in wf.stream(documents, concurrency=[4, 2, 1]):  # doctest: +SKIP
+            ...     print(summary)
+        """
+        pipeline = self._pipeline(callbacks, concurrency, queue_size, ordered)
+        pipeline.start(inputs)
+        return pipeline.results()
+
+    async def astream(self, inputs: Union[Iterable[Any], AsyncIterable[Any]], callbacks: list = None,
+                      concurrency: Union[int, List[int]] = 1, queue_size: int = 8,
+                      ordered: bool = True) -> AsyncIterator[Any]:
+        """``stream`` for asyncio: accepts an async iterable and yields without blocking the loop."""
+        pipeline = self._pipeline(callbacks, concurrency, queue_size, ordered)
+        pipeline.start_async(inputs)
+        async for result in pipeline.aresults():
+            yield result
+
 class ParallelWorkflow(Workflow):
     """
     A workflow that runs agents in parallel.
@@ -46,87 +140,728 @@ class ParallelWorkflow(Workflow):
     """
     agents: List[Agent]
     
-    def run(self, initial_input: Any, callbacks: list = None) -> Dict[str, Any]:
+    def run(self, initial_input: Any, callbacks: list = None, deadline: Optional[float] = None) -> Dict[str, Any]:
         from agentblueprint_core.callbacks import CallbackManager
         cm = CallbackManager(callbacks)
         cm.on_workflow_start(self.name, initial_input)
         
         results = {}
-        with concurrent.futures.ThreadPoolExecutor() as executor:
+        executor = self._executor()
+        with self._usage_tracker().activate() as tracker, use_executor(executor), self._deadline_scope(deadline):
             # Submit all agents with callbacks
             future_to_agent = {
-                executor.submit(agent.run, str(initial_input), callbacks=callbacks): agent 
+                executor.submit_agent(agent, str(initial_input), callbacks=callbacks): agent
                 for agent in self.agents
+                if tracker.can_afford(estimate_prompt_tokens(str(initial_input), agent.system_prompt))
             }
             
-            for future in concurrent.futures.as_completed(future_to_agent):
-                agent = future_to_agent[future]
-                try:
-                    data = future.result()
-                    results[agent.name] = data
-                except Exception as exc:
-                    results[agent.name] = f"Error: {exc}"
+            try:
+                for future in concurrent.futures.as_completed(future_to_agent, timeout=remaining_time()):
+                    agent = future_to_agent[future]
+                    try:
+                        data = future.result()
+                        results[agent.name] = data
+                    except Exception as exc:
+                        results[agent.name] = f"Error: {exc}"
+            except concurrent.futures.TimeoutError:
+                # Agents check the deadline themselves; don't wait for stragglers
+                for future, agent in future_to_agent.items():
+                    if agent.name not in results:
+                        future.cancel()
+                        results[agent.name] = "Error: Deadline exceeded"
         
         cm.on_workflow_end(self.name, results)
         return results
 
+class Condition(BaseModel):
+    """Text predicate: ``contains`` a substring (case-insensitive) and/or matches a regex ``pattern``."""
+    contains: Optional[str] = None
+    pattern: Optional[str] = None
+
+    def matches(self, text: str) -> bool:
+        if self.contains is not None and self.contains.lower() not in text.lower():
+            return False
+        if self.pattern is not None and not re.search(self.pattern, text):
+            return False
+        return True
+
+class Route(Condition):
+    """A router branch: when the condition holds (or ``default``), ``targets`` run."""
+    targets: List[str]
+    default: bool = False
+
+class LoopSpec(BaseModel):
+    """
+    Repeat a node's agent, feeding each output back in as the next input.
+
+    Stops when ``until`` matches the output (or the ``critic`` agent's verdict
+    on it, which is appended as feedback otherwise), or after
+    ``max_iterations``.
+    """
+    max_iterations: int = Field(default=3, ge=1)
+    until: Optional[Condition] = None
+    critic: Optional[Agent] = None
+
+def _run_loop(node_id: str, agent: Agent, loop: LoopSpec, node_input: str, callbacks: list = None) -> str:
+    with usage_scope(node=node_id):
+        current = node_input
+        for _ in range(loop.max_iterations):
+            output = agent.run(current, callbacks=callbacks)
+            verdict = loop.critic.run(output, callbacks=callbacks) if loop.critic is not None else output
+            if loop.until is not None and loop.until.matches(verdict):
+                break
+            current = output if loop.critic is None else f"{output}\n\nFeedback: {verdict}"
+        return output
+
+# A splitter agent separates chunks with lines containing only this
+CHUNK_DELIMITER = "---"
+
+class MapSpec(BaseModel):
+    """
+    Split a node's input into chunks and run its agent over each one.
+
+    ``split`` is ``lines`` or ``tokens`` (``chunk_size`` of each per chunk), or
+    ``agent``: the ``splitter`` agent rewrites the input into chunks separated
+    by ``---`` lines. At most ``max_concurrency`` chunks run at once (default:
+    as many as the executor allows). The node's result is the list of chunk
+    outputs, in order.
+    """
+    split: Literal["lines", "tokens", "agent"] = "lines"
+    chunk_size: int = Field(default=100, ge=1)
+    splitter: Optional[Agent] = None
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def _check_splitter(self) -> "MapSpec":
+        if self.split == "agent" and self.splitter is None:
+            raise ValueError("split: agent needs a splitter agent")
+        return self
+
+class ReduceSpec(BaseModel):
+    """
+    Combine items (map outputs, or one per dependency) by tree reduction.
+
+    Items are joined in groups of up to ``fan_in`` whose estimated size stays
+    within ``max_input_tokens``, and each group is reduced by the node's
+    agent; rounds repeat until one result is left, so no single prompt
+    holds every item.
+    """
+    fan_in: int = Field(default=4, ge=2)
+    max_input_tokens: Optional[int] = Field(default=None, ge=1)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
+def _fan_out(fn: Callable[[str], str], items: List[str], max_concurrency: Optional[int]) -> List[str]:
+    """Apply ``fn`` to every item on the current executor, keeping input order."""
+    executor = get_executor()
+    outputs: List[Any] = [None] * len(items)
+    pending: Dict[concurrent.futures.Future, int] = {}
+    queued = iter(enumerate(items))
+    limit = max_concurrency or len(items)
+    try:
+        while True:
+            for index, item in queued:
+                check_cancelled()
+                pending[executor.submit(fn, item)] = index
+                if len(pending) >= limit:
+                    break
+            if not pending:
+                return outputs
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                outputs[pending.pop(future)] = future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def _split(text: str, spec: MapSpec, callbacks: list = None) -> List[str]:
+    if spec.split == "agent":
+        output = spec.splitter.run(text, callbacks=callbacks)
+        chunks = re.split(rf"^\s*{re.escape(CHUNK_DELIMITER)}\s*$", output, flags=re.MULTILINE)
+    elif spec.split == "tokens":
+        chunks, current, size = [], [], 0
+        for piece in re.findall(r"\S+\s*", text):
+            tokens = estimate_tokens(piece)
+            if current and size + tokens > spec.chunk_size:
+                chunks.append("".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += tokens
+        chunks.append("".join(current))
+    else:
+        lines = text.splitlines(keepends=True)
+        chunks = ["".join(lines[i:i + spec.chunk_size]) for i in range(0, len(lines), spec.chunk_size)]
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+def _run_map(node_id: str, agent: Agent, spec: MapSpec, node_input: str, callbacks: list = None) -> List[str]:
+    with usage_scope(node=node_id):
+        chunks = _split(node_input, spec, callbacks=callbacks)
+        return _fan_out(functools.partial(agent.run, callbacks=callbacks), chunks, spec.max_concurrency)
+
+def _reduce_groups(items: List[str], spec: ReduceSpec) -> List[List[str]]:
+    groups: List[List[str]] = []
+    size = 0
+    for item in items:
+        tokens = estimate_tokens(item)
+        fits = spec.max_input_tokens is None or size + tokens <= spec.max_input_tokens
+        if groups and len(groups[-1]) < spec.fan_in and fits:
+            groups[-1].append(item)
+            size += tokens
+        else:
+            groups.append([item])
+            size = tokens
+    if len(groups) == len(items) > 1:
+        # Every item is over the limit on its own; pair them so rounds still shrink
+        groups = [items[i:i + 2] for i in range(0, len(items), 2)]
+    return groups
+
+def _run_reduce(node_id: str, agent: Agent, spec: ReduceSpec, items: List[str], callbacks: list = None) -> str:
+    with usage_scope(node=node_id):
+        if not items:
+            return ""
+        reduce_group = functools.partial(agent.run, callbacks=callbacks)
+        while True:
+            groups = _reduce_groups(items, spec)
+            items = _fan_out(reduce_group, ["\n\n".join(group) for group in groups], spec.max_concurrency)
+            if len(items) == 1:
+                return items[0]
+
+def _run_chain(steps: List[Any], node_input: str, callbacks: list = None) -> str:
+    """Run fused nodes back to back, formatting each input as the scheduler would."""
+    text = node_input
+    previous = None
+    for node_id, agent in steps:
+        if previous is not None:
+            text = f"Output from {previous}: {text}"
+        with usage_scope(node=node_id):
+            text = agent.run(text, callbacks=callbacks)
+        previous = node_id
+    return text
+
+def _as_text(result: Any) -> str:
+    if isinstance(result, str):
+        return result
+    if isinstance(result, list) and all(isinstance(item, str) for item in result):
+        # Map nodes produce a list of chunk outputs
+        return "\n\n".join(result)
+    return json.dumps(result, default=str)
+
+def _parse_json(text: str) -> Any:
+    # Models often wrap JSON in a Markdown code fence
+    fenced = re.fullmatch(r"\s*```(?:json)?\s*(.*?)\s*```\s*", text, flags=re.DOTALL)
+    return json.loads(fenced.group(1) if fenced else text)
+
+def _json_path(value: Any, path: str) -> Any:
+    """Follow ``$.a.b[0]`` (or ``a.b.0``) through dicts and lists."""
+    if isinstance(value, str):
+        value = _parse_json(value)
+    for part in re.findall(r"[^.\[\]$]+", path):
+        try:
+            value = value[int(part)] if isinstance(value, list) else value[part]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise ValueError(f"JSON path {path!r} not found") from None
+    return value
+
+class Projection(BaseModel):
+    """
+    The part of a dependency's output that a node receives.
+
+    ``select`` is a JSON path (``$.findings[0].title``) into the output,
+    ``summarize`` has an agent condense it and ``max_tokens`` keeps only the
+    first tokens; they apply in that order.
+    """
+    select: Optional[str] = None
+    summarize: Optional[Agent] = None
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+
+    def apply(self, value: Any, callbacks: list = None) -> Any:
+        if self.select is not None:
+            value = _json_path(value, self.select)
+        if self.summarize is not None:
+            value = self.summarize.run(_as_text(value), callbacks=callbacks)
+        if self.max_tokens is not None:
+            value = truncate_tokens(_as_text(value), self.max_tokens)
+        return value
+
 class WorkflowNode(BaseModel):
+    """
+    A step of a GraphWorkflow.
+
+    ``timeout`` bounds this node's run. Nodes with ``critical=False`` may be
+    skipped when the run is short of time (see
+    ``GraphWorkflow.skip_noncritical_below``).
+
+    A node with ``routes`` is a router: the first route whose condition
+    matches its agent's output (or, without an agent, its input) selects the
+    successors that run; the other route targets are skipped. A router passes
+    its input through to the selected targets. A node with ``loop`` runs its
+    agent repeatedly (see LoopSpec); ``map`` and ``reduce`` nodes fan its
+    agent out over chunks of their input and combine the pieces (see MapSpec
+    and ReduceSpec).
+
+    With ``output_type="json"`` the agent's output is parsed, and
+    ``projections`` (keyed by dependency) pick what this node receives
+    from each input instead of the whole output (see Projection).
+    """
     id: str
-    agent: Agent
+    agent: Optional[Agent] = None
     depends_on: List[str] = Field(default_factory=list)
+    timeout: Optional[float] = None
+    critical: bool = True
+    routes: List[Route] = Field(default_factory=list)
+    loop: Optional[LoopSpec] = None
+    map: Optional[MapSpec] = None
+    reduce: Optional[ReduceSpec] = None
+    output_type: Literal["text", "json"] = "text"
+    projections: Dict[str, Projection] = Field(default_factory=dict)
+    # Upstream nodes fused into this one by the compiler, in run order
+    fused: List["WorkflowNode"] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def _check_agent(self) -> "WorkflowNode":
+        if self.agent is not None and not (self.routes or self.loop or self.map or self.reduce):
+            return self
+        if self.agent is None and not self.routes:
+            raise ValueError(f"Node {self.id} needs an agent (only routers may omit it)")
+        kinds = [kind for kind in ("routes", "loop", "map", "reduce") if getattr(self, kind)]
+        if len(kinds) > 1:
+            raise ValueError(f"Node {self.id} can only be one of routes, loop, map or reduce")
+        return self
+
+    def parse_output(self, result: Any) -> Any:
+        """Decode the agent's output according to ``output_type``."""
+        if self.output_type == "text":
+            return result
+        try:
+            return [_parse_json(item) for item in result] if isinstance(result, list) else _parse_json(result)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Node {self.id} did not return valid JSON: {exc}") from None
+
+    @property
+    def plain(self) -> bool:
+        """True for a node that runs its agent once on its input."""
+        return not self.routes and self.loop is None and self.map is None and self.reduce is None \
+            and not self.fused
+
+    def select(self, text: str) -> List[str]:
+        """Targets of the first matching route, else of the default route."""
+        for route in self.routes:
+            if not route.default and route.matches(text):
+                return route.targets
+        return next((route.targets for route in self.routes if route.default), [])
+
+class GraphResult(dict):
+    """
+    Node outputs of a GraphWorkflow run, keyed by node ID.
+
+    Attributes:
+        run_id: ID of the checkpointed run, if a run store was used.
+        status: Node ID to ``done``, ``reused`` (memoized), ``resumed``,
+            ``failed``, ``timed_out``, ``cancelled``, ``skipped`` (a dependency
+            failed, or non-critical and out of time) or ``pending`` (never
+            started).
+        errors: Node ID to error message for failed nodes.
+        routes: Router node ID to the targets it selected.
+    """
+
+    def __init__(self, results: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None):
+        super().__init__(results or {})
+        self.run_id = run_id
+        self.status: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.routes: Dict[str, List[str]] = {}
+
+class WorkflowRunError(RuntimeError):
+    """A graph node failed; ``result`` holds the partial GraphResult."""
+
+    def __init__(self, message: str, node_id: str, result: GraphResult):
+        super().__init__(message)
+        self.node_id = node_id
+        self.result = result
+
+class _GraphRun:
+    """Mutable state of one GraphWorkflow run."""
+
+    __slots__ = ("initial_input", "callbacks", "cm", "tracker", "executor", "token", "results", "completed",
+                 "store", "artifacts", "values")
+
+    def __init__(self, initial_input: Any, callbacks: list, tracker: UsageTracker, executor: Executor,
+                 token: CancellationToken, results: GraphResult, completed: Dict[str, Any],
+                 store: Optional[RunStore], artifacts: Optional[ArtifactStore], values: ResultStore):
+        from agentblueprint_core.callbacks import CallbackManager
+
+        self.initial_input = initial_input
+        self.callbacks = callbacks
+        self.cm = CallbackManager(callbacks)
+        self.tracker = tracker
+        self.executor = executor
+        self.token = token
+        self.results = results
+        self.completed = completed
+        self.store = store
+        self.artifacts = artifacts
+        # Node outputs while the run needs them; ``results`` is filled at the end
+        self.values = values
+
+    def record(self, node_id: str, status: str, result: Any = None, error: Optional[str] = None,
+               **extra: Any) -> None:
+        self.results.status[node_id] = status
+        if error is not None:
+            self.results.errors[node_id] = error
+        if self.store is not None:
+            self.store.record(self.results.run_id, node_id, status, result=result, error=error, **extra)
+        self.cm.on_node_end(node_id, status, error if error is not None else result)
 
 class GraphWorkflow(Workflow):
     """
     A workflow that executes agents based on a dependency graph (DAG).
+
+    ``on_failure`` decides what happens when a node fails:
+
+    - ``fail_fast`` (default): cancel running and queued nodes through the
+      run's CancellationToken and raise WorkflowRunError.
+    - ``continue``: keep running branches that do not depend on the failed
+      node, then raise WorkflowRunError with the partial result.
+    - ``best_effort``: like ``continue``, but return the partial result; check
+      ``result.status`` for failed and skipped nodes.
+
+    With ``checkpoint_dir`` set (or a ``run_store`` passed to ``run``), each
+    node's result is checkpointed as it completes, and a failed or
+    interrupted run can be resumed by its run ID.
+
+    With a deadline and ``skip_noncritical_below`` set, non-critical nodes
+    are skipped once fewer seconds than that remain; their dependents run
+    without their output.
+
+    With ``memoize``, node results are stored by content hash (agent config
+    plus resolved input) and reused on later runs, so after a prompt change
+    only the affected node and whatever its new output feeds are executed.
+
+    For large graphs, ``outputs`` lists the nodes whose results are
+    returned; other results are released as soon as every consumer has
+    read them. Results larger than ``spill_threshold`` bytes are kept in
+    temporary files (under ``spill_dir``) instead of memory while needed.
     """
     nodes: List[WorkflowNode]
+    on_failure: Literal["fail_fast", "continue", "best_effort"] = "fail_fast"
+    skip_noncritical_below: Optional[float] = None
+    checkpoint_dir: Optional[str] = None
+    memoize: bool = False
+    artifact_dir: Optional[str] = None
+    outputs: Optional[List[str]] = None
+    spill_threshold: Optional[int] = Field(default=None, ge=0)
+    spill_dir: Optional[str] = None
+    # Longest-path cost per node, set by the compiler to prioritize ready nodes
+    _costs: Dict[str, float] = PrivateAttr(default_factory=dict)
+    _graph: Optional[CompactGraph] = PrivateAttr(default=None)
+    _graph_nodes: Optional[List[WorkflowNode]] = PrivateAttr(default=None)
     
-    def run(self, initial_input: Any, callbacks: list = None) -> Dict[str, Any]:
+    def run(self, initial_input: Any, callbacks: list = None, deadline: Optional[float] = None,
+            resume: Optional[str] = None, run_store: Optional[RunStore] = None,
+            artifact_store: Optional[ArtifactStore] = None) -> GraphResult:
+        """
+        Execute the graph.
+
+        Args:
+            initial_input: Input for the nodes without dependencies.
+            callbacks: Callback handlers.
+            deadline: Seconds the whole run may take (default ``timeout``).
+            resume: Run ID of an earlier checkpointed run. Its completed nodes
+                are reused; only failed and pending nodes run again.
+            run_store: Where to checkpoint. Defaults to ``checkpoint_dir`` (or
+                the default run directory when resuming); without either the
+                run is not checkpointed.
+            artifact_store: Memoize nodes in this store. Defaults to one in
+                ``artifact_dir`` when ``memoize`` is set.
+
+        Raises:
+            WorkflowRunError: A node failed and ``on_failure`` is not
+                ``best_effort``. Its ``result`` holds the partial GraphResult.
+            RunCancelledError: The enclosing cancellation scope was cancelled.
+        """
         from agentblueprint_core.callbacks import CallbackManager
         cm = CallbackManager(callbacks)
+
+        store = run_store
+        if store is None and (self.checkpoint_dir is not None or resume is not None):
+            store = RunStore(self.checkpoint_dir)
+        completed: Dict[str, Any] = {}
+        run_id = None
+        if store is not None and resume is not None:
+            completed = store.completed(resume)
+            run_id = resume
+        elif store is not None:
+            run_id = store.start(self.name, initial_input)
+        results = GraphResult(run_id=run_id)
+        if resume is not None and store is not None:
+            results.routes.update(store.routes(resume))
+        artifacts = artifact_store
+        if artifacts is None and self.memoize:
+            artifacts = ArtifactStore(self.artifact_dir)
+
         cm.on_workflow_start(self.name, initial_input)
-        
-        results = {}
-        pending_nodes = {node.id: node for node in self.nodes}
-        executed = set()
-        
-        while pending_nodes:
-            # Find nodes ready to execute (all dependencies met)
-            ready_nodes = []
-            for node_id, node in pending_nodes.items():
-                if all(dep in executed for dep in node.depends_on):
-                    ready_nodes.append(node)
-            
-            if not ready_nodes:
-                if pending_nodes:
-                    raise ValueError("Cycle detected or missing dependency in graph workflow")
-                break
-                
-            # Execute ready nodes in parallel
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future_to_node = {}
-                for node in ready_nodes:
-                    # Construct input
-                    if not node.depends_on:
-                        node_input = str(initial_input)
-                    else:
-                        # Combine outputs from dependencies
-                        inputs = [f"Output from {dep}: {results[dep]}" for dep in node.depends_on]
-                        node_input = "\n\n".join(inputs)
-                    
-                    # Pass callbacks
-                    future = executor.submit(node.agent.run, node_input, callbacks=callbacks)
-                    future_to_node[future] = node
-                
-                for future in concurrent.futures.as_completed(future_to_node):
-                    node = future_to_node[future]
-                    try:
-                        res = future.result()
-                        results[node.id] = res
-                        executed.add(node.id)
-                        del pending_nodes[node.id]
-                    except Exception as exc:
-                        raise RuntimeError(f"Node {node.id} failed: {exc}")
-                        
+        executor = self._executor()
+        token = CancellationToken(parent=current_token())
+        with self._usage_tracker().activate() as tracker, use_executor(executor), cancellation_scope(token), \
+                self._deadline_scope(deadline):
+            values = ResultStore(self.spill_threshold, self.spill_dir)
+            run = _GraphRun(initial_input, callbacks, tracker, executor, token, results, completed, store,
+                            artifacts, values)
+            try:
+                self._run_graph(run)
+                for node_id in self.outputs if self.outputs is not None else [node.id for node in self.nodes]:
+                    if node_id in values:
+                        results[node_id] = values.get(node_id)
+            finally:
+                values.close()
+
+        failed = [node_id for node_id, status in results.status.items() if status in ("failed", "timed_out")]
+        if failed and self.on_failure != "best_effort":
+            hint = f" (resume with run ID {results.run_id})" if results.run_id else ""
+            raise WorkflowRunError(f"Node {failed[0]} failed: {results.errors[failed[0]]}{hint}", failed[0], results)
+        if not failed:
+            # Cancelled from outside (an enclosing run or caller-held token)
+            token.raise_if_cancelled()
         cm.on_workflow_end(self.name, results)
         return results
+
+    @model_validator(mode="after")
+    def _link_routes(self) -> "GraphWorkflow":
+        # Route targets implicitly depend on their router
+        ids = {node.id for node in self.nodes}
+        targets = {}
+        for node in self.nodes:
+            for route in node.routes:
+                for target in route.targets:
+                    if target not in ids:
+                        raise ValueError(f"Router {node.id} routes to unknown node {target}")
+                    targets.setdefault(target, []).append(node.id)
+        for node in self.nodes:
+            for router in targets.get(node.id, []):
+                if router not in node.depends_on:
+                    node.depends_on.append(router)
+            unknown = set(node.projections) - set(node.depends_on)
+            if unknown:
+                raise ValueError(f"Node {node.id} has projections for non-dependencies: {', '.join(sorted(unknown))}")
+        unknown = set(self.outputs or []) - ids
+        if unknown:
+            raise ValueError(f"Unknown output nodes: {', '.join(sorted(unknown))}")
+        return self
+
+    def _inputs(self, node: WorkflowNode, run: _GraphRun) -> Dict[str, Any]:
+        """Outputs of the node's dependencies (skipped ones have none), projected per edge."""
+        inputs = {}
+        with usage_scope(node=node.id):
+            for dep in node.depends_on:
+                if dep in run.values:
+                    projection = node.projections.get(dep)
+                    value = run.values.get(dep)
+                    inputs[dep] = projection.apply(value, callbacks=run.callbacks) if projection else value
+        return inputs
+
+    def _node_input(self, node: WorkflowNode, run: _GraphRun, graph: CompactGraph) -> str:
+        if not node.depends_on:
+            return str(run.initial_input)
+        inputs = self._inputs(node, run)
+        if len(node.depends_on) == 1 and self.nodes[graph.index[node.depends_on[0]]].routes:
+            # Routers pass their input through unchanged
+            return _as_text(inputs.get(node.depends_on[0], ""))
+        return "\n\n".join(f"Output from {dep}: {_as_text(value)}" for dep, value in inputs.items())
+
+    def _reduce_items(self, node: WorkflowNode, run: _GraphRun) -> List[str]:
+        if not node.depends_on:
+            return [str(run.initial_input)]
+        items: List[str] = []
+        for value in self._inputs(node, run).values():
+            items.extend(map(_as_text, value) if isinstance(value, list) else [_as_text(value)])
+        return items
+
+    def _submit(self, node: WorkflowNode, node_input: str, items: Optional[List[str]],
+                run: _GraphRun) -> concurrent.futures.Future:
+        with deadline_scope(node.timeout):
+            if node.fused:
+                steps = [(step.id, step.agent) for step in node.fused] + [(node.id, node.agent)]
+                return run.executor.submit(_run_chain, steps, node_input, callbacks=run.callbacks)
+            if node.loop is not None:
+                return run.executor.submit(_run_loop, node.id, node.agent, node.loop, node_input,
+                                           callbacks=run.callbacks)
+            if node.map is not None:
+                return run.executor.submit(_run_map, node.id, node.agent, node.map, node_input,
+                                           callbacks=run.callbacks)
+            if node.reduce is not None:
+                return run.executor.submit(_run_reduce, node.id, node.agent, node.reduce, items,
+                                           callbacks=run.callbacks)
+            return run.executor.submit_agent(node.agent, node_input, callbacks=run.callbacks, node_id=node.id)
+
+    def _compact(self) -> CompactGraph:
+        # Rebuilt when the node list is replaced (e.g. by model_copy)
+        if self._graph is None or self._graph_nodes is not self.nodes or len(self._graph) != len(self.nodes):
+            self._graph, self._graph_nodes = CompactGraph.from_nodes(self.nodes), self.nodes
+        return self._graph
+
+    def _run_graph(self, run: _GraphRun) -> None:
+        results = run.results
+        graph = self._compact()
+        nodes = self.nodes
+        # Schedule each node as soon as its own dependencies finish
+        waiting = graph.in_degrees()
+        # Readers left per result; declared outputs are kept to the end
+        readers = graph.out_degrees()
+        keep = set(self.outputs) if self.outputs is not None else set(graph.index)
+        # Route targets that were not selected; never executed
+        unselected: Set[str] = set()
+        for i, node in enumerate(nodes):
+            if node.id in run.completed:
+                run.values.put(node.id, run.completed[node.id])
+                results.status[node.id] = "resumed"
+                if node.id in results.routes:
+                    unselected |= self._unselected(node, results.routes[node.id])
+                for dependent in graph.dependents(i):
+                    waiting[dependent] -= 1
+            else:
+                results.status[node.id] = "pending"
+        # Heap of (-critical path cost, index): longest path first, else declaration order
+        costs = self._costs
+        ready = [(-costs.get(node.id, 0.0), i) for i, node in enumerate(nodes)
+                 if waiting[i] == 0 and node.id not in run.completed]
+        heapq.heapify(ready)
+        running: Dict[concurrent.futures.Future, WorkflowNode] = {}
+        inputs: Dict[str, str] = {}  # Router inputs, passed through once routed
+        keys: Dict[str, Optional[str]] = {}
+        failed = False
+
+        def finish(node: WorkflowNode, result: Any, status: str) -> None:
+            run.values.put(node.id, result)
+            run.record(node.id, status, result=result)
+            release(node)
+
+        def route(node: WorkflowNode, label: str) -> None:
+            selected = node.select(label)
+            results.routes[node.id] = selected
+            unselected.update(self._unselected(node, selected))
+            node_input = inputs.pop(node.id)
+            run.values.put(node.id, node_input)
+            run.record(node.id, "done", result=node_input, routes=selected)
+            release(node)
+
+        def consumed(node: WorkflowNode) -> None:
+            # Called once per node, when it has read its inputs or will never read them
+            for dep in graph.deps(graph.index[node.id]):
+                readers[dep] -= 1
+                if readers[dep] == 0 and nodes[dep].id not in keep:
+                    run.values.release(nodes[dep].id)
+
+        def release(node: WorkflowNode) -> None:
+            for dependent in graph.dependents(graph.index[node.id]):
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    heapq.heappush(ready, (-costs.get(nodes[dependent].id, 0.0), dependent))
+
+        def skip_dependents(node: WorkflowNode) -> None:
+            stack = [graph.index[node.id]]
+            while stack:
+                for dependent in graph.dependents(stack.pop()):
+                    if results.status.get(nodes[dependent].id) == "pending":
+                        run.record(nodes[dependent].id, "skipped")
+                        consumed(nodes[dependent])
+                        stack.append(dependent)
+
+        def fail(node: WorkflowNode, status: str, error: str) -> None:
+            nonlocal failed
+            failed = True
+            run.record(node.id, status, error=error)
+            if self.on_failure == "fail_fast":
+                # Stop paying for work whose result would be thrown away
+                run.token.cancel(f"node {node.id} failed")
+                for other in running:
+                    other.cancel()
+            else:
+                skip_dependents(node)
+
+        while ready or running:
+            while ready and not run.token.cancelled and not run.tracker.budget_exhausted:
+                node = nodes[heapq.heappop(ready)[1]]
+                remaining = remaining_time()
+                # Lazy evaluation: unselected branches, and nodes fed only by them, never run
+                pruned = node.id in unselected or all(dep in unselected for dep in node.depends_on)
+                if pruned and node.depends_on:
+                    unselected.add(node.id)
+                    run.record(node.id, "skipped")
+                    consumed(node)
+                    release(node)
+                    continue
+                short_of_time = not node.critical and self.skip_noncritical_below is not None \
+                    and remaining is not None and remaining < self.skip_noncritical_below
+                if short_of_time:
+                    run.record(node.id, "skipped")
+                    consumed(node)
+                    release(node)
+                    continue
+                try:
+                    node_input = self._node_input(node, run, graph)
+                    items = self._reduce_items(node, run) if node.reduce is not None else None
+                except Exception as exc:
+                    fail(node, "timed_out" if isinstance(exc, DeadlineExceededError) else "failed",
+                         f"Could not build input: {exc}")
+                    continue
+                finally:
+                    consumed(node)
+                if node.routes:
+                    inputs[node.id] = node_input
+                if node.agent is None:
+                    # Predicate-only router
+                    route(node, node_input)
+                    continue
+                if run.artifacts is not None and node.plain:
+                    keys[node.id] = node_key(node.agent, node_input)
+                    hit, cached = run.artifacts.get(keys[node.id]) if keys[node.id] else (False, None)
+                    if hit:
+                        finish(node, cached, "reused")
+                        continue
+                if not run.tracker.can_afford(estimate_prompt_tokens(node_input, node.agent.system_prompt)):
+                    break
+                run.cm.on_node_start(node.id, node_input)
+                running[self._submit(node, node_input, items, run)] = node
+
+            if not running:
+                break
+            done, _ = concurrent.futures.wait(running, timeout=remaining_time(),
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+            if not done:
+                # Run deadline passed: cancel, and stop waiting for nodes that ignore it
+                failed = True
+                run.token.cancel("deadline exceeded")
+                for future, node in running.items():
+                    future.cancel()
+                    run.record(node.id, "timed_out", error="Deadline exceeded")
+                running.clear()
+                break
+            for future in done:
+                node = running.pop(future)
+                try:
+                    result = node.parse_output(future.result())
+                except DeadlineExceededError as exc:
+                    status, error = "timed_out", str(exc)
+                except (RunCancelledError, concurrent.futures.CancelledError):
+                    run.record(node.id, "cancelled")
+                    continue
+                except Exception as exc:
+                    status, error = "failed", str(exc)
+                else:
+                    status = "done"
+                if status != "done":
+                    fail(node, status, error)
+                    continue
+                if node.routes:
+                    route(node, _as_text(result))
+                    continue
+                if keys.get(node.id):
+                    run.artifacts.put(keys[node.id], result)
+                finish(node, result, "done")
+
+        if not failed and not run.token.cancelled and not run.tracker.budget_exhausted \
+                and "pending" in results.status.values():
+            raise ValueError("Cycle detected or missing dependency in graph workflow")
+
+    @staticmethod
+    def _unselected(node: WorkflowNode, selected: List[str]) -> Set[str]:
+        return {target for route in node.routes for target in route.targets if target not in selected}
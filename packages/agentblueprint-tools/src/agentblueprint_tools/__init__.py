@@ -1,16 +1,49 @@
 """
 Pre-built tools for AgentBlueprint.
-"""
 
-from agentblueprint_tools.basic import CalculatorTool, EchoTool
-from agentblueprint_tools.python_repl import PythonREPLTool
-from agentblueprint_tools.http_client import HTTPClientTool
-from agentblueprint_tools.web_search import WebSearchTool
-from agentblueprint_tools.filesystem import FileReadTool, FileWriteTool
-from agentblueprint_tools.system_info import SystemTimeTool, SystemInfoTool
+Tool classes are imported on first attribute access, so importing this
+package does not pull in httpx or duckduckgo-search until they are used.
+"""
+import importlib
 
 __version__ = "0.1.0"
 
+# Tool name -> "module:Class" for every built-in tool. Installed copies are
+# also advertised through the "agentblueprint.tools" entry-point group.
+BUILTIN_TOOLS = {
+    "calculator": "agentblueprint_tools.basic:CalculatorTool",
+    "echo": "agentblueprint_tools.basic:EchoTool",
+    "python_repl": "agentblueprint_tools.python_repl:PythonREPLTool",
+    "http_client": "agentblueprint_tools.http_client:HTTPClientTool",
+    "web_search": "agentblueprint_tools.web_search:WebSearchTool",
+    "file_read": "agentblueprint_tools.filesystem:FileReadTool",
+    "file_write": "agentblueprint_tools.filesystem:FileWriteTool",
+    "get_time": "agentblueprint_tools.system_info:SystemTimeTool",
+    "get_sys_info": "agentblueprint_tools.system_info:SystemInfoTool",
+}
+
+_CLASSES = {path.split(":", 1)[1]: path for path in BUILTIN_TOOLS.values()}
+
+def register_builtin_tools() -> None:
+    """
+    Register every built-in tool with the ToolRegistry without importing it.
+
+    Only needed when the package runs from a source tree without installed
+    metadata; otherwise entry-point discovery finds the tools.
+    """
+    from agentblueprint_core import ToolRegistry
+
+    for name, import_path in BUILTIN_TOOLS.items():
+        ToolRegistry.register_lazy(name, import_path)
+
+def __getattr__(name):
+    if name in _CLASSES:
+        module_name, attr = _CLASSES[name].split(":", 1)
+        value = getattr(importlib.import_module(module_name), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     "CalculatorTool", 
     "EchoTool", 
@@ -20,5 +53,7 @@ __all__ = [
     "FileReadTool",
     "FileWriteTool",
     "SystemTimeTool",
-    "SystemInfoTool"
+    "SystemInfoTool",
+    "BUILTIN_TOOLS",
+    "register_builtin_tools",
 ]
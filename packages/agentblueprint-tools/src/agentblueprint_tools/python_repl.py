@@ -13,6 +13,9 @@ class PythonREPLTool(Tool):
     """
     name = "python_repl"
     description = "Executes Python code and returns stdout/stderr. Input should be valid python code."
+    execution = "process"
+    timeout = 30.0
+    max_calls_per_worker = 100
     
     def run(self, code: str) -> str:
         """Execute the python code and return the output."""
@@ -0,0 +1,122 @@
+"""
+Tests for the OpenAI-compatible mock server.
+"""
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("openai")
+
+from agentblueprint_core import Agent, CallbackHandler, Distribution, LLMFactory, OpenAILLM, SimulationProfile, Tool
+from agentblueprint_cli.mock_server import MockOpenAIServer
+
+@pytest.fixture
+def server():
+    def start(**kwargs):
+        srv = MockOpenAIServer(port=0, **kwargs)
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(srv.http.start())
+            ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait(5)
+        started.append((srv, loop))
+        return srv
+
+    started = []
+    yield start
+    for srv, loop in started:
+        asyncio.run_coroutine_threadsafe(srv.http.shutdown(drain_timeout=1), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+
+def test_chat_completion_and_streaming(server):
+    srv = server(profile=SimulationProfile(response_tokens=Distribution(mean=4)))
+    llm = LLMFactory.create(f"openai:bench?base_url={srv.base_url}")
+    assert isinstance(llm, OpenAILLM)
+
+    assert llm.generate("hello world") == "MOCK (bench): hello world lorem"
+    assert "".join(llm.stream("hello world")) == "MOCK (bench): hello world lorem"
+
+def test_tool_calls_and_embeddings(server):
+    srv = server()
+    client = OpenAILLM(base_url=srv.base_url).client
+
+    tools = [{"type": "function", "function": {"name": "calculator", "parameters": {"type": "object"}}}]
+    response = client.chat.completions.create(
+        model="bench", messages=[{"role": "user", "content": "2+2"}], tools=tools
+    )
+    call = response.choices[0].message.tool_calls[0]
+    assert call.function.name == "calculator"
+    assert response.usage.prompt_tokens == 1
+
+    emb = client.embeddings.create(model="emb", input=["a", "b"], dimensions=16)
+    assert len(emb.data) == 2
+    assert len(emb.data[0].embedding) == 16
+
+def test_agent_tool_calls_fire_tool_callbacks(server):
+    class Lookup(Tool):
+        name = "lookup"
+        description = "Looks things up"
+
+        def run(self, input: str) -> str:
+            return input.upper()
+
+    class Recorder(CallbackHandler):
+        def __init__(self):
+            self.events = []
+
+        def on_tool_start(self, name, input_args):
+            self.events.append(("start", name, input_args))
+
+        def on_tool_end(self, name, output):
+            self.events.append(("end", name, output))
+
+    srv = server()
+    handler = Recorder()
+    agent = Agent(name="a", model=f"openai:bench?base_url={srv.base_url}", tools=[Lookup()])
+    assert agent.run("find x", callbacks=[handler]).startswith("MOCK (bench)")
+    assert handler.events == [("start", "lookup", {"input": "find x"}), ("end", "lookup", "FIND X")]
+
+def test_rate_limit_returns_429_with_retry_after(server):
+    import openai
+    srv = server(profile=SimulationProfile(rate_limit_rate=1.0, retry_after=2))
+    client = openai.OpenAI(base_url=srv.base_url, api_key="unused", max_retries=0)
+    with pytest.raises(openai.RateLimitError) as info:
+        client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x"}])
+    assert info.value.response.headers["retry-after"] == "2"
+
+def test_streams_hold_a_concurrency_slot_until_done(server):
+    import openai
+    srv = server(profile=SimulationProfile(response_tokens=Distribution(mean=10), tokens_per_second=50),
+                 max_concurrency=1)
+    client = openai.OpenAI(base_url=srv.base_url, api_key="unused", max_retries=0)
+    stream = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "x"}], stream=True)
+    next(iter(stream))
+    with pytest.raises(openai.RateLimitError):
+        client.chat.completions.create(model="m", messages=[{"role": "user", "content": "y"}])
+    list(stream)
+    assert client.chat.completions.create(model="m", messages=[{"role": "user", "content": "z"}]).choices
+
+def test_openai_provider_runs_requested_tools(server):
+    class LookupTool(Tool):
+        name = "lookup"
+        description = "Looks things up"
+
+        def __init__(self):
+            self.calls = []
+
+        def run(self, input: str) -> str:
+            self.calls.append(input)
+            return "found it"
+
+    srv = server(profile=SimulationProfile(response_tokens=Distribution(mean=3)))
+    tool = LookupTool()
+    answer = OpenAILLM(model_name="bench", base_url=srv.base_url).generate("find x", tools=[tool])
+    assert tool.calls == ["find x"]
+    assert answer == "MOCK (bench): find x"
@@ -0,0 +1,127 @@
+"""
+Tests for the long-lived workflow server.
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from agentblueprint_core import Agent, SequentialWorkflow
+from agentblueprint_cli.server import WorkflowServer
+
+@pytest.fixture
+def server(request):
+    workflows = {
+        "echo": SequentialWorkflow(name="echo", agents=[
+            Agent(name="a", model="sim:m?tokens=5", system_prompt="A"),
+        ]),
+        "slow": SequentialWorkflow(name="slow", agents=[
+            Agent(name="s", model="sim:m?tokens=200&tps=20", system_prompt="S"),
+        ]),
+    }
+    srv = WorkflowServer(workflows, port=0, **getattr(request, "param", {}))
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(srv.http.start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait(5)
+    yield srv, loop
+    if not srv.draining:
+        asyncio.run_coroutine_threadsafe(srv.shutdown(drain_timeout=1), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+
+def post(srv, path, body):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{srv.http.port}{path}", data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"}, method="POST",
+    )
+    return urllib.request.urlopen(request, timeout=5)
+
+def test_run_returns_result_and_usage(server):
+    srv, _ = server
+    data = json.load(post(srv, "/workflows/echo/run", {"input": "hello"}))
+    assert data["result"].startswith("SIM (m): hello")
+    assert data["usage"]["total"]["calls"] == 1
+
+    with pytest.raises(urllib.error.HTTPError) as info:
+        post(srv, "/workflows/missing/run", {"input": "x"})
+    assert info.value.code == 404
+
+def test_stream_emits_agent_events_and_tokens(server):
+    srv, _ = server
+    events = []
+    with post(srv, "/workflows/echo/stream", {"input": "hello"}) as response:
+        assert response.headers["Content-Type"] == "text/event-stream"
+        for line in response:
+            line = line.decode().strip()
+            if line.startswith("event: "):
+                events.append(line[7:])
+
+    assert events[0] == "workflow_start"
+    assert events.count("token") == 5
+    assert events[-1] == "result"
+
+@pytest.mark.parametrize("server", [{"max_concurrency": 1}], indirect=True)
+def test_client_disconnect_cancels_the_stream_run(server):
+    srv, _ = server
+    body = json.dumps({"input": "x"}).encode()
+    with socket.create_connection(("127.0.0.1", srv.http.port), timeout=5) as sock:
+        sock.sendall(b"POST /workflows/slow/stream HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\n"
+                     + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        received = b""
+        while b"event: token" not in received:
+            received += sock.recv(4096)
+
+    # With one worker, this run waits until the abandoned 10s stream stops
+    start = time.monotonic()
+    data = json.load(post(srv, "/workflows/echo/run", {"input": "hello"}))
+    assert data["result"].startswith("SIM (m): hello")
+    assert time.monotonic() - start < 3
+
+def test_drain_refuses_new_runs(server):
+    srv, loop = server
+    asyncio.run_coroutine_threadsafe(srv.shutdown(drain_timeout=1), loop).result(5)
+    assert srv.draining
+
+def raw_request(srv, data):
+    with socket.create_connection(("127.0.0.1", srv.http.port), timeout=5) as sock:
+        sock.sendall(data)
+        received = b""
+        while chunk := sock.recv(4096):
+            received += chunk
+    return received
+
+def test_unreadable_requests_get_client_errors(server):
+    srv, _ = server
+    srv.http.max_body_size = 100
+    assert raw_request(srv, b"GARBAGE\r\n\r\n").startswith(b"HTTP/1.1 400")
+    assert raw_request(srv, b"POST /workflows/echo/run HTTP/1.1\r\nContent-Length: ten\r\n\r\n").startswith(
+        b"HTTP/1.1 400")
+    assert raw_request(srv, b"POST /workflows/echo/run HTTP/1.1\r\nContent-Length: 1000000000\r\n\r\n").startswith(
+        b"HTTP/1.1 413")
+    assert raw_request(srv, b"GET /health HTTP/1.1\r\nX-Big: " + b"x" * 100_000 + b"\r\n\r\n").startswith(
+        b"HTTP/1.1 431")
+    assert json.load(post(srv, "/workflows/echo/run", {"input": "hello"}))["result"].startswith("SIM (m)")
+
+@pytest.mark.parametrize("server", [{"max_concurrency": 1}], indirect=True)
+def test_drain_timeout_cancels_in_flight_runs(server):
+    srv, loop = server
+    threading.Thread(target=lambda: pytest.raises(Exception, post, srv, "/workflows/slow/run", {"input": "x"}),
+                     daemon=True).start()
+    time.sleep(0.3)
+    asyncio.run_coroutine_threadsafe(srv.shutdown(drain_timeout=0.1), loop).result(5)
+
+    # The 10s run stops once its request is given up
+    start = time.monotonic()
+    srv.executor.shutdown(wait=True)
+    assert time.monotonic() - start < 3
@@ -0,0 +1,42 @@
+"""
+Regression tests for CLI startup cost.
+"""
+import os
+import subprocess
+import sys
+
+# Cumulative import time budget for `ab --help`, in microseconds
+STARTUP_BUDGET_US = int(os.environ.get("AGENTBLUEPRINT_STARTUP_BUDGET_US", 250_000))
+HEAVY_MODULES = {"pydantic", "rich", "httpx", "openai", "duckduckgo_search", "yaml"}
+
+def import_times(*args):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "agentblueprint_cli.main", *args],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.rstrip()] = int(cumulative)
+    return times
+
+def test_help_stays_within_import_budget():
+    times = import_times("--help")
+    top_level = {name.strip(): us for name, us in times.items() if not name.startswith("  ")}
+    imported = {name.strip().split(".")[0] for name in times}
+
+    assert not HEAVY_MODULES & imported
+    assert sum(top_level.values()) < STARTUP_BUDGET_US
+
+def test_tools_are_not_imported_until_used():
+    from agentblueprint_core import ToolRegistry
+    from agentblueprint_tools import register_builtin_tools
+
+    ToolRegistry.clear()
+    register_builtin_tools()
+    assert "http_client" in ToolRegistry.names()
+    assert "http_client" not in ToolRegistry._tools
+    assert ToolRegistry.get("http_client").name == "http_client"
+    ToolRegistry.clear()
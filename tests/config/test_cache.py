@@ -0,0 +1,61 @@
+"""
+Tests for the compiled workflow cache.
+"""
+import pytest
+from agentblueprint_config import WorkflowCache, load_and_parse
+from agentblueprint_core import GraphWorkflow
+
+CONFIG = """
+agents:
+  a1:
+    model: mock
+    system_prompt: {prompt}
+workflow:
+  type: graph
+  nodes:
+    - id: step_1
+      agent: a1
+"""
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "workflow.yaml"
+    path.write_text(CONFIG.format(prompt="A1"))
+    return path
+
+def test_second_load_is_served_from_cache(config_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    first = load_and_parse(str(config_file), use_cache=True, cache_dir=cache_dir)
+    assert isinstance(first, GraphWorkflow)
+    assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+    calls = []
+    cached = WorkflowCache(cache_dir).load(str(config_file), lambda *a: calls.append(a))
+    assert not calls
+    assert cached.run("x") == first.run("x")
+
+def test_cache_is_invalidated_when_file_changes(config_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    load_and_parse(str(config_file), use_cache=True, cache_dir=cache_dir)
+    config_file.write_text(CONFIG.format(prompt="B2"))
+
+    workflow = load_and_parse(str(config_file), use_cache=True, cache_dir=cache_dir)
+    assert workflow.nodes[0].agent.system_prompt == "B2"
+    assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+def test_corrupt_entry_is_a_miss(config_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    load_and_parse(str(config_file), use_cache=True, cache_dir=cache_dir)
+    next(cache_dir.glob("*.pkl")).write_bytes(b"garbage")
+    workflow = load_and_parse(str(config_file), use_cache=True, cache_dir=cache_dir)
+    assert workflow.nodes[0].agent.system_prompt == "A1"
+
+def test_cache_is_invalidated_when_package_code_changes(config_file, tmp_path, monkeypatch):
+    from agentblueprint_config import cache
+    cache_dir = tmp_path / "cache"
+    load_and_parse(str(config_file), use_cache=True, cache_dir=cache_dir)
+    monkeypatch.setattr(cache, "code_fingerprint", lambda: "changed")
+
+    calls = []
+    WorkflowCache(cache_dir).load(str(config_file), lambda *a: calls.append(a))
+    assert calls
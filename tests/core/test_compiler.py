@@ -0,0 +1,69 @@
+"""
+Unit tests for the workflow compiler.
+"""
+import pytest
+from agentblueprint_core import Agent, GraphWorkflow, RunStore, WorkflowNode, compile_workflow
+
+def agent(name):
+    return Agent(name=name, model="mock", system_prompt=name)
+
+def test_plan_prunes_merges_and_fuses_nodes():
+    a, b = agent("A"), agent("B")
+    wf = GraphWorkflow(name="g", outputs=["report", "summary"], nodes=[
+        WorkflowNode(id="fetch", agent=a),
+        WorkflowNode(id="fetch_copy", agent=a),
+        WorkflowNode(id="clean", agent=b, depends_on=["fetch"]),
+        WorkflowNode(id="report", agent=a, depends_on=["clean"]),
+        WorkflowNode(id="summary", agent=b, depends_on=["fetch_copy", "fetch"]),
+        WorkflowNode(id="unused", agent=b, depends_on=["fetch"]),
+    ])
+    plan = compile_workflow(wf)
+    # fetch_copy is not merged: summary needs both copies
+    assert plan.removed == {
+        "unused": "no declared output depends on it",
+        "clean": "fused into report",
+    }
+    assert [node.id for node in plan.workflow.nodes] == ["fetch", "fetch_copy", "report", "summary"]
+    assert plan.fused == {"report": ["clean"]}
+    assert plan.levels == {"fetch": 0, "fetch_copy": 0, "report": 1, "summary": 1}
+    assert plan.critical_path == ["fetch", "report"]
+    assert len(wf.nodes) == 6
+
+    result = plan.run("x")
+    assert result["report"] == wf.run("x")["report"]
+    assert set(result) == {"report", "summary"}
+
+def test_plan_keeps_every_node_without_declared_outputs():
+    a = agent("A")
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="one", agent=a),
+        WorkflowNode(id="two", agent=a),
+    ])
+    plan = compile_workflow(wf)
+    assert plan.aliases == {"two": "one"}
+    assert plan.run("x") == {"one": "ECHO (A): x", "two": "ECHO (A): x"}
+
+def test_plan_does_not_fuse_checkpointed_runs(tmp_path):
+    a, b = agent("A"), agent("B")
+    wf = GraphWorkflow(name="g", outputs=["report"], memoize=True, nodes=[
+        WorkflowNode(id="clean", agent=b),
+        WorkflowNode(id="report", agent=a, depends_on=["clean"]),
+    ])
+    plan = compile_workflow(wf)
+    assert plan.fused == {} and [node.id for node in plan.workflow.nodes] == ["clean", "report"]
+    assert plan.describe()[-1].startswith("Fusion skipped")
+
+    unpersisted = wf.model_copy(update={"memoize": False})
+    fused = compile_workflow(unpersisted)
+    assert fused.fused == {"report": ["clean"]}
+    assert not any(line.startswith("Fusion skipped") for line in fused.describe())
+    assert compile_workflow(unpersisted, checkpointed=True).fused == {}
+    with pytest.raises(ValueError, match="checkpointed=True"):
+        fused.run("x", run_store=RunStore(str(tmp_path)))
+
+def test_plan_does_not_merge_agents_with_different_timeouts():
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="fast", agent=Agent(name="A", model="mock", system_prompt="A", timeout=1)),
+        WorkflowNode(id="slow", agent=Agent(name="A", model="mock", system_prompt="A", timeout=30)),
+    ])
+    assert compile_workflow(wf).aliases == {}
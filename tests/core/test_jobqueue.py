@@ -0,0 +1,65 @@
+"""
+Unit tests for the durable job queue.
+"""
+import time
+
+import pytest
+from agentblueprint_core import Agent, JobQueue, JobWorker, SequentialWorkflow
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), retry_backoff=0)
+
+def test_claim_complete_roundtrip(queue):
+    job_id = queue.enqueue({"input": "hi"})
+    job = queue.claim("w1")
+    assert job.id == job_id and job.attempts == 1
+    assert queue.claim("w2") is None
+
+    assert queue.complete(job.id, "w1", "done!")
+    assert queue.get(job_id).result == "done!"
+    assert queue.stats() == {"queued": 0, "running": 0, "done": 1, "dead": 0}
+
+def test_expired_lease_is_reclaimed_and_stale_worker_loses_it(queue):
+    queue.enqueue({"input": "hi"})
+    first = queue.claim("w1", visibility_timeout=0.01)
+    time.sleep(0.02)
+    second = queue.claim("w2", visibility_timeout=60)
+    assert second.id == first.id and second.attempts == 2
+    assert not queue.complete(first.id, "w1", "late")
+    assert queue.complete(second.id, "w2", "ok")
+
+def test_failures_retry_then_dead_letter(queue):
+    job_id = queue.enqueue({"input": "x"}, max_attempts=2)
+    queue.fail(queue.claim("w").id, "w", "boom")
+    assert queue.get(job_id).status == "queued"
+    queue.fail(queue.claim("w").id, "w", "boom again")
+    assert queue.get(job_id).status == "dead"
+    assert [j.error for j in queue.dead_letters()] == ["boom again"]
+
+    assert queue.requeue_dead() == 1
+    assert queue.get(job_id).status == "queued"
+
+def test_worker_runs_jobs_through_workflow(queue):
+    workflow = SequentialWorkflow(name="s", agents=[Agent(name="a", model="mock", system_prompt="A")])
+    ids = [queue.enqueue({"input": f"item {i}"}) for i in range(3)]
+    handled = JobWorker(queue, workflow, poll_interval=0.01).run(exit_when_empty=True)
+    assert handled == 3
+    assert [queue.get(i).result for i in ids] == [f"ECHO (A): item {i}" for i in range(3)]
+
+def test_exit_when_empty_waits_for_delayed_retries(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), retry_backoff=0.1)
+
+    class FlakyWorkflow:
+        calls = 0
+
+        def run(self, initial_input):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("transient")
+            return f"ok: {initial_input}"
+
+    job_id = queue.enqueue({"input": "x"})
+    handled = JobWorker(queue, FlakyWorkflow(), poll_interval=0.01).run(exit_when_empty=True)
+    assert handled == 2
+    assert queue.get(job_id).result == "ok: x"
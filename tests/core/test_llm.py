@@ -0,0 +1,78 @@
+"""
+Unit tests for AgentBlueprint LLM providers.
+"""
+import time
+
+import pytest
+from agentblueprint_core import (
+    Distribution,
+    LLMFactory,
+    LLMTimeoutError,
+    RateLimitError,
+    SimulatedLLM,
+    SimulationProfile,
+)
+
+@pytest.fixture(autouse=True)
+def reset_simulation():
+    SimulatedLLM.reset()
+    yield
+    SimulatedLLM.reset()
+
+def test_factory_creates_simulated_provider():
+    provider = LLMFactory.create("sim:gpt-4?latency=0.01&tokens=5&seed=3")
+    assert isinstance(provider, SimulatedLLM)
+    assert provider.model_name == "gpt-4"
+    assert provider.profile.ttft.mean == 0.01
+    assert provider.profile.seed == 3
+
+    assert provider.generate("hello").startswith("SIM (gpt-4): hello")
+    assert len(list(provider.stream("hello"))) == 5
+
+def test_simulated_latency_and_streaming():
+    profile = SimulationProfile(ttft=Distribution(mean=0.05), tokens_per_second=100,
+                                response_tokens=Distribution(mean=6))
+    provider = SimulatedLLM("gpt-4", profile=profile)
+
+    start = time.perf_counter()
+    chunks = list(provider.stream("hi"))
+    elapsed = time.perf_counter() - start
+
+    assert len(chunks) == 6
+    assert elapsed >= 0.05 + 5 * 0.01
+
+def test_simulated_is_deterministic_when_seeded():
+    def outcomes():
+        SimulatedLLM.reset()
+        provider = LLMFactory.create("sim:m?tokens=lognormal&tokens_mean=20&rate_limit_rate=0.3&seed=42")
+        out = []
+        for i in range(20):
+            try:
+                out.append(provider.generate(f"prompt {i % 5}"))
+            except RateLimitError as e:
+                out.append(("429", e.retry_after))
+        return out
+
+    first = outcomes()
+    assert first == outcomes()
+    assert any(isinstance(o, tuple) for o in first)
+
+def test_simulated_occurrence_counts_are_bounded(monkeypatch):
+    monkeypatch.setattr(SimulatedLLM, "max_tracked_requests", 3)
+    provider = LLMFactory.create("sim:m?tokens=8&seed=1")
+    first = provider.generate("p0")
+    for i in range(10):
+        provider.generate(f"p{i}")
+    assert len(SimulatedLLM._occurrences) == 3
+    # "p0" was forgotten, so it is sampled as a first occurrence again
+    assert provider.generate("p0") == first
+
+def test_simulated_timeout_and_empirical_distribution():
+    profile = SimulationProfile(timeout_rate=1.0, timeout_after=0.01)
+    with pytest.raises(LLMTimeoutError):
+        SimulatedLLM("m", profile=profile).generate("x")
+
+    dist = Distribution(kind="empirical", samples=[0.1, 0.2])
+    import random
+    rng = random.Random(0)
+    assert {dist.sample(rng) for _ in range(50)} == {0.1, 0.2}
@@ -0,0 +1,198 @@
+"""
+Unit tests for the resilient LLM call layer.
+"""
+import threading
+import time
+
+import pytest
+from agentblueprint_core import (
+    Agent,
+    LatencyTracker,
+    LLMError,
+    LLMProvider,
+    LLMTimeoutError,
+    RateLimitError,
+    ResilientLLM,
+    RetryPolicy,
+)
+
+class ScriptedLLM(LLMProvider):
+    """Plays back a list of outcomes: exceptions are raised, numbers are sleeps."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, system_prompt="", tools=None, history=None, callbacks=None):
+        with self.lock:
+            step = self.script[min(self.calls, len(self.script) - 1)]
+            self.calls += 1
+        if isinstance(step, Exception):
+            raise step
+        time.sleep(step)
+        return f"ok: {prompt}"
+
+@pytest.fixture(autouse=True)
+def reset_latency():
+    LatencyTracker.reset()
+
+def test_retries_retryable_errors_and_honors_retry_after():
+    provider = ScriptedLLM([RateLimitError("429", retry_after=0.05), LLMError("500", retryable=True), 0])
+    llm = ResilientLLM(provider, RetryPolicy(initial_backoff=0.001, jitter=False))
+
+    start = time.monotonic()
+    assert llm.generate("x") == "ok: x"
+    assert provider.calls == 3
+    assert time.monotonic() - start >= 0.05
+
+def test_non_retryable_errors_are_raised_immediately():
+    provider = ScriptedLLM([LLMError("bad request", status_code=400)])
+    with pytest.raises(LLMError, match="bad request"):
+        ResilientLLM(provider, RetryPolicy()).generate("x")
+    assert provider.calls == 1
+
+def test_attempt_timeout_then_retry():
+    provider = ScriptedLLM([1.0, 0])
+    llm = ResilientLLM(provider, RetryPolicy(attempt_timeout=0.05, initial_backoff=0))
+    assert llm.generate("x") == "ok: x"
+
+    provider = ScriptedLLM([1.0])
+    llm = ResilientLLM(provider, RetryPolicy(max_attempts=5, total_timeout=0.1, initial_backoff=0))
+    with pytest.raises(LLMTimeoutError):
+        llm.generate("x")
+
+def test_hedging_takes_the_faster_duplicate():
+    provider = ScriptedLLM([0.5, 0])
+    llm = ResilientLLM(provider, RetryPolicy(hedge_delay=0.02))
+
+    start = time.monotonic()
+    assert llm.generate("x") == "ok: x"
+    assert time.monotonic() - start < 0.3
+    assert provider.calls == 2
+
+def test_calls_with_tools_are_not_hedged():
+    from agentblueprint_core import Tool
+
+    class Noop(Tool):
+        name = "noop"
+        description = "Does nothing"
+
+        def run(self):
+            return None
+
+    provider = ScriptedLLM([0.1, 0])
+    assert ResilientLLM(provider, RetryPolicy(hedge_delay=0.01)).generate("x", tools=[Noop()]) == "ok: x"
+    assert provider.calls == 1
+
+def test_provider_sees_the_attempt_timeout_and_deadline_only_calls_run_inline():
+    from agentblueprint_core import deadline_scope, remaining_time
+
+    seen = []
+
+    class DeadlineLLM(LLMProvider):
+        def generate(self, prompt, system_prompt="", tools=None, history=None, callbacks=None):
+            seen.append((remaining_time(), threading.current_thread()))
+            return "ok"
+
+    ResilientLLM(DeadlineLLM(), RetryPolicy(attempt_timeout=2)).generate("x")
+    assert seen[-1][0] is not None and seen[-1][0] <= 2
+    assert seen[-1][1] is not threading.current_thread()
+
+    with deadline_scope(30):
+        ResilientLLM(DeadlineLLM(), RetryPolicy()).generate("x")
+    assert 2 < seen[-1][0] <= 30
+    assert seen[-1][1] is threading.current_thread()
+
+def test_percentile_hedging_uses_observed_latency():
+    tracker = LatencyTracker.for_key("k")
+    for v in range(1, 101):
+        tracker.observe(v / 1000)
+    assert tracker.percentile(0.95) == 0.095
+
+    llm = ResilientLLM(ScriptedLLM([0]), RetryPolicy(hedge_percentile=0.95), key="k")
+    assert llm._hedge_delay() == 0.095
+
+def test_unkeyed_wrappers_keep_their_own_latency_tracker():
+    first, second = ResilientLLM(ScriptedLLM([0])), ResilientLLM(ScriptedLLM([0]))
+    assert first.latency is not second.latency
+    assert not LatencyTracker._trackers
+
+def test_agents_do_not_retry_unless_configured():
+    agent = Agent(name="a", model="sim:m?error_rate=1&seed=1")
+    assert agent.retry is None
+    with pytest.raises(LLMError):
+        agent.run("hi")
+
+def test_agent_raises_structured_errors():
+    agent = Agent(name="a", model="sim:m?error_rate=1", retry=RetryPolicy(max_attempts=2, initial_backoff=0))
+    with pytest.raises(LLMError) as info:
+        agent.run("hi")
+    assert info.value.status_code == 500
+
+def test_circuit_breaker_trips_and_recovers_through_probe():
+    from agentblueprint_core import CircuitBreaker, CircuitBreakerConfig
+    breaker = CircuitBreaker(CircuitBreakerConfig(min_calls=4, error_rate_threshold=0.5, open_duration=0.05))
+    for ok in (True, False, False, True):
+        breaker.record(ok, 0.01)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True, 0.01)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_cancelled_probe_lets_the_breaker_probe_again():
+    from agentblueprint_core import CircuitBreaker, CircuitBreakerConfig, FallbackLLM, RunCancelledError
+    CircuitBreaker.reset()
+    primary = ScriptedLLM([RunCancelledError("cancelled"), 0])
+    llm = FallbackLLM([("primary", primary)], config=CircuitBreakerConfig(min_calls=2, open_duration=0.05))
+    breaker = llm.providers[0][2]
+    breaker.record(False, 0.01)
+    breaker.record(False, 0.01)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    with pytest.raises(RunCancelledError):
+        llm.generate("x")
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert llm.generate("x") == "ok: x"
+    assert breaker.state == CircuitBreaker.CLOSED
+    CircuitBreaker.reset()
+
+def test_client_errors_do_not_trip_the_breaker():
+    from agentblueprint_core import CircuitBreaker, CircuitBreakerConfig, FallbackLLM
+    CircuitBreaker.reset()
+    config = CircuitBreakerConfig(min_calls=2, open_duration=60)
+    llm = FallbackLLM([("primary", ScriptedLLM([LLMError("400", retryable=False)]))], config=config)
+    for _ in range(4):
+        with pytest.raises(LLMError, match="400"):
+            llm.generate("x")
+    assert llm.providers[0][2].state == CircuitBreaker.CLOSED
+
+    assert CircuitBreaker.for_key("primary", config) is llm.providers[0][2]
+    assert CircuitBreaker.for_key("primary") is llm.providers[0][2]
+    with pytest.raises(ValueError, match="different config"):
+        CircuitBreaker.for_key("primary", CircuitBreakerConfig(min_calls=3))
+    CircuitBreaker.reset()
+
+def test_fallback_chain_routes_around_open_circuit():
+    from agentblueprint_core import CircuitBreaker, CircuitBreakerConfig, FallbackLLM, LLMFactory
+    CircuitBreaker.reset()
+    primary = ScriptedLLM([LLMError("down", retryable=True)])
+    secondary = ScriptedLLM([0])
+    llm = FallbackLLM([("primary", primary), ("secondary", secondary)],
+                      config=CircuitBreakerConfig(min_calls=2, open_duration=60))
+
+    for _ in range(5):
+        assert llm.generate("x") == "ok: x"
+    assert primary.calls == 2
+    assert secondary.calls == 5
+
+    chain = LLMFactory.create(["sim:a?error_rate=1", "mock:echo"])
+    assert isinstance(chain, FallbackLLM)
+    agent = Agent(name="a", model=["sim:a?error_rate=1", "mock:echo"], system_prompt="S")
+    assert agent.run("hi") == "ECHO (S): hi"
+    CircuitBreaker.reset()
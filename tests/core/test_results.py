@@ -0,0 +1,19 @@
+"""
+Unit tests for the spill-to-disk ResultStore.
+"""
+from agentblueprint_core import ResultStore
+
+def test_large_results_spill_and_are_deleted_on_release(tmp_path):
+    store = ResultStore(spill_threshold=16, spill_dir=str(tmp_path))
+    store.put("small", "short")
+    store.put("text", "x" * 100)
+    store.put("items", ["a" * 10, "b" * 10])
+    assert not store.spilled("small") and store.spilled("text") and store.spilled("items")
+    assert store.get("text") == "x" * 100
+    assert store.get("items") == ["a" * 10, "b" * 10]
+
+    store.release("text")
+    assert "text" not in store
+    assert len(list(tmp_path.rglob("*.out"))) == 1
+    store.close()
+    assert list(tmp_path.iterdir()) == []
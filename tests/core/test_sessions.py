@@ -0,0 +1,105 @@
+"""
+Unit tests for per-session agent memory.
+"""
+import threading
+import time
+
+import pytest
+from agentblueprint_core import Agent, CompactMemory, SessionMemoryManager, SessionStore
+
+def test_compact_memory_interns_roles_in_one_buffer():
+    memory = CompactMemory()
+    memory.add("user", "héllo")
+    memory.add("assistant", "hi")
+    memory.add("user", "")
+    assert memory.get_history() == [
+        {"role": "user", "content": "héllo"},
+        {"role": "assistant", "content": "hi"},
+        {"role": "user", "content": ""},
+    ]
+    assert len(memory) == 3 and memory._roles == ["user", "assistant"]
+    assert memory.get_context() == "USER: héllo\nASSISTANT: hi\nUSER: "
+
+def test_sessions_have_separate_memory_and_are_evicted_lru(tmp_path):
+    sessions = SessionMemoryManager(max_sessions=2, store=SessionStore(str(tmp_path)))
+    agent = Agent(name="chat", model="mock", sessions=sessions)
+    agent.run("from a", session_id="a")
+    agent.run("from b", session_id="b")
+    agent.run("again a", session_id="a")
+    agent.run("from c/d", session_id="c/d")
+
+    # "b" was least recently used
+    assert "b" not in sessions and "a" in sessions and len(sessions) == 2
+    assert [m["content"] for m in sessions.get("a").get_history()][::2] == ["from a", "again a"]
+    assert len(list(tmp_path.iterdir())) == 1
+
+    agent.run("back", session_id="b")
+    assert [m["content"] for m in sessions.get("b").get_history()][::2] == ["from b", "back"]
+
+def test_byte_cap_evicts_idle_sessions():
+    sessions = SessionMemoryManager(max_bytes=200)
+    for i in range(5):
+        with sessions.session(f"s{i}") as memory:
+            memory.add("user", "x" * 60)
+    assert sessions.nbytes <= 200
+    assert list(sessions._sessions) == ["s3", "s4"]
+
+def test_runs_of_one_session_are_serialized():
+    sessions = SessionMemoryManager()
+    agent = Agent(name="chat", model="mock", sessions=sessions)
+    threads = [threading.Thread(target=agent.run, args=(f"m{i}",), kwargs={"session_id": "s"}) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    history = sessions.get("s").get_history()
+    assert [m["role"] for m in history] == ["user", "assistant"] * 8
+
+def test_session_id_requires_a_session_manager():
+    with pytest.raises(ValueError, match="session manager"):
+        Agent(name="chat", model="mock").run("hi", session_id="s")
+
+def test_eviction_saves_outside_the_manager_lock(tmp_path):
+    release = threading.Event()
+
+    class SlowStore(SessionStore):
+        def save(self, session_id, messages):
+            release.wait(5)
+            super().save(session_id, messages)
+
+    sessions = SessionMemoryManager(max_sessions=1, store=SlowStore(str(tmp_path)))
+    with sessions.session("a") as memory:
+        memory.add("user", "hi")
+    evicting = threading.Thread(target=sessions.get, args=("b",))
+    evicting.start()
+    while "a" in sessions:
+        time.sleep(0.001)
+
+    # Other sessions are served while "a" is being saved; reloading "a" waits for the save
+    done = threading.Event()
+    other = threading.Thread(target=sessions.get, args=("c",))
+    other.start()
+    reload = threading.Thread(target=lambda: done.set() if sessions.get("a").get_history() else None)
+    reload.start()
+    time.sleep(0.05)
+    assert "c" in sessions and not done.is_set()
+    release.set()
+    for t in (evicting, other, reload):
+        t.join()
+    assert done.is_set()
+
+def test_failed_save_keeps_the_session_resident(tmp_path, caplog):
+    class BrokenStore(SessionStore):
+        def save(self, session_id, messages):
+            raise OSError("disk full")
+
+    sessions = SessionMemoryManager(max_sessions=1, store=BrokenStore(str(tmp_path)))
+    agent = Agent(name="chat", model="mock", sessions=sessions)
+    agent.run("from a", session_id="a")
+    # Evicting "a" fails, which must not fail the unrelated run of "b"
+    assert agent.run("from b", session_id="b") == "ECHO: from b"
+    assert "a" in sessions and "could not save session a" in caplog.text.lower()
+    assert [m["content"] for m in sessions.get("a").get_history()][::2] == ["from a"]
+    with pytest.raises(OSError, match="disk full"):
+        sessions.flush()
+    assert len(sessions) == 2
@@ -0,0 +1,126 @@
+"""
+Unit tests for single-flight request coalescing.
+"""
+import threading
+import time
+
+import pytest
+from agentblueprint_core import (
+    Agent, CancellationToken, CoalescingLLM, LLMError, LLMProvider, ParallelWorkflow, RunCancelledError,
+    SingleFlight, cancellation_scope, check_cancelled,
+)
+
+class CountingLLM(LLMProvider):
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, system_prompt="", tools=None, history=None, callbacks=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"{system_prompt}: {prompt}"
+
+def run_concurrently(fn, n):
+    results, errors = [], []
+
+    def target():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+def test_identical_requests_share_one_call():
+    provider = CountingLLM()
+    llm = CoalescingLLM(provider, key="m")
+    results, errors = run_concurrently(lambda: llm.generate("p", system_prompt="s"), 8)
+    assert not errors
+    assert results == ["s: p"] * 8
+    assert provider.calls == 1
+    assert CoalescingLLM.group.in_flight() == 0
+
+    llm.generate("other", system_prompt="s")
+    assert provider.calls == 2
+
+def test_errors_propagate_to_every_waiter():
+    provider = CountingLLM(error=LLMError("boom"))
+    llm = CoalescingLLM(provider, key="err")
+    results, errors = run_concurrently(lambda: llm.generate("p"), 4)
+    assert not results
+    assert len(errors) == 4 and all(isinstance(e, LLMError) for e in errors)
+    assert provider.calls == 1
+
+def test_abandoned_call_is_released():
+    group = SingleFlight()
+    with pytest.raises(LLMError):
+        group.do("k", lambda: time.sleep(0.2), timeout=0.01)
+    assert group.in_flight() == 0
+
+def test_one_caller_cancelling_does_not_fail_the_others():
+    group = SingleFlight()
+
+    def slow():
+        for _ in range(8):
+            time.sleep(0.05)
+            check_cancelled()
+        return "done"
+
+    outcomes = {}
+
+    def call(name, token):
+        with cancellation_scope(token):
+            start = time.monotonic()
+            try:
+                outcomes[name] = group.do("k", slow)
+            except RunCancelledError as e:
+                outcomes[name] = e
+            outcomes[name + "_took"] = time.monotonic() - start
+
+    token_a, token_b = CancellationToken(), CancellationToken()
+    threads = [threading.Thread(target=call, args=("a", token_a)), threading.Thread(target=call, args=("b", token_b))]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    token_a.cancel("run a stopped")
+    for t in threads:
+        t.join()
+    assert isinstance(outcomes["a"], RunCancelledError) and outcomes["a_took"] < 0.25
+    assert outcomes["b"] == "done"
+
+def test_flight_is_cancelled_when_every_caller_left():
+    group = SingleFlight()
+    stopped = threading.Event()
+
+    def slow():
+        try:
+            while True:
+                time.sleep(0.01)
+                check_cancelled()
+        except RunCancelledError:
+            stopped.set()
+            raise
+
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel).start()
+    with cancellation_scope(token), pytest.raises(RunCancelledError):
+        group.do("k", slow)
+    assert stopped.wait(1)
+    assert group.in_flight() == 0
+
+def test_parallel_workflow_with_coalescing_agents():
+    agents = [Agent(name=f"a{i}", model="sim:m?latency=0.05", system_prompt="same", coalesce=True) for i in range(4)]
+    before = CoalescingLLM.group.shared
+    results = ParallelWorkflow(name="fan", agents=agents).run("x")
+    assert len(set(results.values())) == 1
+    assert CoalescingLLM.group.shared - before == 3
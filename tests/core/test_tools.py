@@ -0,0 +1,146 @@
+"""
+Unit tests for the tool registry.
+"""
+import os
+import time
+
+import pytest
+from agentblueprint_core import CallbackHandler, CallbackManager, Tool, ToolProcessPool, ToolRegistry, ToolTimeoutError
+
+class CountingTool(Tool):
+    name = "counting"
+    description = "Counts instantiations"
+    created = 0
+
+    def __init__(self):
+        CountingTool.created += 1
+
+    def run(self, text: str) -> str:
+        return text
+
+class PidTool(Tool):
+    name = "pid"
+    description = "Returns the worker pid"
+    execution = "process"
+    pool_size = 1
+    max_calls_per_worker = 1
+    timeout = 5.0
+
+    def run(self, delay: float = 0.0) -> int:
+        time.sleep(delay)
+        return os.getpid()
+
+class RecordingHandler(CallbackHandler):
+    def __init__(self):
+        self.events = []
+
+    def on_tool_start(self, name, input_args):
+        self.events.append(("start", name, input_args))
+
+    def on_tool_end(self, name, output):
+        self.events.append(("end", name, output))
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    ToolRegistry.clear()
+    CountingTool.created = 0
+    yield
+    ToolRegistry.clear()
+
+def test_factories_are_instantiated_on_first_get():
+    ToolRegistry.register_factory("counting", CountingTool)
+    assert "counting" in ToolRegistry.names()
+    assert CountingTool.created == 0
+
+    assert ToolRegistry.get("counting") is ToolRegistry.get("counting")
+    assert CountingTool.created == 1
+
+def test_entry_points_are_discovered():
+    pytest.importorskip("agentblueprint_tools")
+    names = ToolRegistry.names()
+    if "calculator" not in names:
+        pytest.skip("agentblueprint-tools metadata not installed")
+    assert ToolRegistry.get("calculator").run(expression="2+3") == "5"
+
+def test_scoped_registries_are_isolated():
+    ToolRegistry.register_factory("counting", CountingTool)
+    first, second = ToolRegistry.scoped(), ToolRegistry.scoped()
+
+    class Override(CountingTool):
+        description = "override"
+
+    first.register(Override())
+    assert first.get("counting").description == "override"
+    assert second.get("counting").description == "Counts instantiations"
+    assert ToolRegistry.get("counting").description == "Counts instantiations"
+
+    # Snapshots do not see later global registrations
+    ToolRegistry.register_factory("late", CountingTool)
+    assert second.get("late") is None
+
+def test_parse_workflow_resolves_against_scoped_registry():
+    from agentblueprint_config import ConfigLoader
+
+    registry = ToolRegistry.scoped()
+    registry.register_factory("counting", CountingTool)
+    config = {
+        "agents": {"a": {"model": "mock", "tools": ["counting"]}},
+        "workflow": {"type": "sequential", "steps": [{"agent": "a"}]},
+    }
+    workflow = ConfigLoader.parse_workflow(config, registry=registry)
+    assert workflow.agents[0].tools[0].name == "counting"
+    assert ToolRegistry.get("counting") is None
+
+def test_process_tool_runs_in_recycled_workers_with_parent_callbacks():
+    handler = RecordingHandler()
+    tool = PidTool()
+    try:
+        first = tool.invoke(callbacks=CallbackManager([handler]))
+        second = tool.invoke()
+        assert os.getpid() not in (first, second)
+        assert first != second  # max_calls_per_worker=1 recycles the worker
+        assert handler.events == [("start", "pid", {}), ("end", "pid", first)]
+    finally:
+        ToolProcessPool.shutdown_all()
+
+def test_invoke_passes_an_argument_named_callbacks_to_the_tool():
+    class ArgsTool(Tool):
+        name = "args"
+        description = "Returns its arguments"
+
+        def run(self, **kwargs):
+            return kwargs
+
+    handler = RecordingHandler()
+    assert ArgsTool().invoke({"callbacks": "x"}, callbacks=CallbackManager([handler])) == {"callbacks": "x"}
+    assert handler.events == [("start", "args", {"callbacks": "x"}), ("end", "args", {"callbacks": "x"})]
+
+def test_process_tool_timeout_rebuilds_pool():
+    tool = PidTool()
+    tool.timeout = 0.5
+    try:
+        with pytest.raises(ToolTimeoutError):
+            tool.invoke({"delay": 30})
+        tool.timeout = 30
+        assert tool.invoke() != os.getpid()
+    finally:
+        ToolProcessPool.shutdown_all()
+
+def test_sibling_calls_survive_a_timed_out_call():
+    import threading
+
+    sibling, stuck = PidTool(), PidTool()
+    sibling.pool_size, sibling.max_calls_per_worker, sibling.timeout = 2, None, 20.0
+    stuck.timeout = 1.0
+    results = []
+    try:
+        thread = threading.Thread(target=lambda: results.append(sibling.invoke({"delay": 1.5})))
+        thread.start()
+        time.sleep(0.3)
+        with pytest.raises(ToolTimeoutError):
+            stuck.invoke({"delay": 30})
+        thread.join()
+        # Its pool was terminated with the stuck call; it was rerun on the new one
+        assert results and results[0] != os.getpid()
+    finally:
+        ToolProcessPool.shutdown_all()
@@ -0,0 +1,51 @@
+"""
+Unit tests for token usage accounting and budgets.
+"""
+from agentblueprint_core import (
+    Agent,
+    GraphWorkflow,
+    ParallelWorkflow,
+    SequentialWorkflow,
+    UsageTracker,
+    WorkflowNode,
+    estimate_tokens,
+)
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hello, world!") == 4
+    assert estimate_tokens("internationalization") == 4
+
+def test_usage_is_aggregated_per_agent_node_and_model():
+    a = Agent(name="A", model="mock", system_prompt="A")
+    b = Agent(name="B", model="sim:m?tokens=7", system_prompt="B")
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="n1", agent=a),
+        WorkflowNode(id="n2", agent=b, depends_on=["n1"]),
+    ])
+    with UsageTracker().activate() as usage:
+        wf.run("Start")
+
+    assert usage.total.calls == 2
+    assert set(usage.by_agent) == {"A", "B"}
+    assert set(usage.by_node) == {"n1", "n2"}
+    assert usage.by_model["sim:m"].completion_tokens == 7
+    assert usage.summary()["total"]["total_tokens"] == usage.total.total_tokens
+
+def test_parallel_usage_reaches_outer_tracker():
+    agents = [Agent(name=n, model="mock") for n in "ABC"]
+    with UsageTracker().activate() as usage:
+        ParallelWorkflow(name="p", agents=agents).run("x")
+    assert usage.total.calls == 3
+
+def test_budget_stops_scheduling():
+    agent = Agent(name="A", model="mock", system_prompt="A")
+    wf = SequentialWorkflow(name="s", agents=[agent] * 10, token_budget=30)
+    with UsageTracker().activate() as usage:
+        wf.run("one two three")
+    # The budget is checked before each agent, so the last call may overshoot it
+    assert 0 < usage.total.calls < 10
+
+    nodes = [WorkflowNode(id=f"n{i}", agent=agent, depends_on=[f"n{i-1}"] if i else []) for i in range(10)]
+    results = GraphWorkflow(name="g", nodes=nodes, token_budget=30).run("one two three")
+    assert 0 < len(results) < 10
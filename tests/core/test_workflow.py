@@ -1,15 +1,45 @@
 """
 Unit tests for AgentBlueprint Workflows.
 """
+import asyncio
+import time
+
 import pytest
 from agentblueprint_core import (
     Agent, 
     SequentialWorkflow, 
     ParallelWorkflow, 
     GraphWorkflow, 
-    WorkflowNode
+    WorkflowNode,
+    Route,
+    LoopSpec,
+    Condition,
+    MapSpec,
+    ReduceSpec,
+    Projection,
+    CompactGraph,
+    GraphBuilder,
+    CallbackHandler,
+    RunStore,
+    ArtifactStore,
+    WorkflowRunError,
+    DeadlineExceededError,
+    ThreadExecutor,
+    AsyncioExecutor,
+    ProcessExecutor,
+    UsageTracker,
+    deadline_scope,
+    get_executor,
+    use_executor,
 )
 
+class EndOrder(CallbackHandler):
+    def __init__(self):
+        self.ended = []
+
+    def on_agent_end(self, name, response):
+        self.ended.append(name)
+
 @pytest.fixture
 def mock_agent():
     return Agent(name="mock", model="mock", system_prompt="Sys")
@@ -59,3 +89,319 @@ def test_graph_workflow(echo_agent_a, echo_agent_b):
     
     # B output should contain A's output
     assert "ECHO (A): Start" in results["node_b"]
+
+def test_graph_schedules_nodes_as_soon_as_their_deps_finish():
+    slow = Agent(name="slow", model="sim:slow?latency=0.5&tokens=1", system_prompt="S")
+    fast = Agent(name="fast", model="sim:fast?latency=0&tokens=1", system_prompt="F")
+    wf = GraphWorkflow(name="g", executor="threads", nodes=[
+        WorkflowNode(id="s", agent=slow),
+        WorkflowNode(id="f1", agent=fast),
+        WorkflowNode(id="f2", agent=fast, depends_on=["f1"]),
+        WorkflowNode(id="join", agent=fast, depends_on=["s", "f2"]),
+    ])
+    handler = EndOrder()
+    results = wf.run("go", callbacks=[handler])
+    assert set(results) == {"s", "f1", "f2", "join"}
+    # f2 no longer waits for the slow node in the same "wave"
+    assert handler.ended == ["fast", "fast", "slow", "fast"]
+
+def test_graph_rejects_missing_dependency(echo_agent_a):
+    wf = GraphWorkflow(name="g", nodes=[WorkflowNode(id="a", agent=echo_agent_a, depends_on=["nope"])])
+    with pytest.raises(ValueError, match="missing dependency"):
+        wf.run("x")
+
+def test_named_executors_are_shared_and_inherited():
+    assert get_executor("threads") is get_executor({"type": "threads"})
+    custom = ThreadExecutor(max_workers=2)
+    with use_executor(custom):
+        assert get_executor() is custom
+    with pytest.raises(ValueError):
+        get_executor("gpu")
+
+def test_nested_submit_on_saturated_pool_runs_inline():
+    executor = ThreadExecutor(max_workers=1)
+    outer = executor.submit(lambda: executor.submit(lambda: "inner").result(timeout=5))
+    assert outer.result(timeout=5) == "inner"
+    executor.shutdown()
+
+@pytest.mark.parametrize("executor", ["asyncio", "processes"])
+def test_parallel_workflow_on_other_executors(echo_agent_a, echo_agent_b, executor):
+    wf = ParallelWorkflow(name="p", agents=[echo_agent_a, echo_agent_b], executor=executor)
+    handler = EndOrder()
+    with UsageTracker().activate() as usage:
+        results = wf.run("Start", callbacks=[handler])
+    assert results == {"A": "ECHO (A): Start", "B": "ECHO (B): Start"}
+    assert sorted(handler.ended) == ["A", "B"]
+    assert set(usage.by_agent) == {"A", "B"}
+
+def test_process_executor_forwards_the_deadline():
+    slow = Agent(name="slow", model="sim:slow?latency=30&tokens=1")
+    executor = ProcessExecutor(max_workers=1)
+    try:
+        with deadline_scope(1.0):
+            future = executor.submit_agent(slow, "go")
+        with pytest.raises(DeadlineExceededError):
+            future.result(timeout=20)
+    finally:
+        executor.shutdown(wait=False)
+
+def test_process_executor_forwards_context_to_map_nodes(echo_agent_a):
+    executor = ProcessExecutor(max_workers=1)
+    slow = Agent(name="slow", model="sim:slow?latency=30&tokens=1")
+    try:
+        handler = EndOrder()
+        wf = GraphWorkflow(name="g", executor=executor, nodes=[
+            WorkflowNode(id="chunks", agent=echo_agent_a, map=MapSpec(split="lines", chunk_size=1)),
+        ])
+        with UsageTracker().activate() as usage:
+            assert wf.run("l1\nl2", callbacks=[handler])["chunks"] == ["ECHO (A): l1", "ECHO (A): l2"]
+        assert handler.ended == ["A", "A"]
+        assert usage.by_node["chunks"].calls == 2 and usage.by_agent["A"].calls == 2
+
+        wf = GraphWorkflow(name="g", executor=executor, on_failure="best_effort", nodes=[
+            WorkflowNode(id="chunks", agent=slow, map=MapSpec(split="lines", chunk_size=1), timeout=1.0),
+        ])
+        start = time.monotonic()
+        assert wf.run("l1").status == {"chunks": "timed_out"}
+        assert time.monotonic() - start < 20
+    finally:
+        executor.shutdown(wait=False)
+
+def test_graph_checkpoints_and_resumes_failed_run(tmp_path, echo_agent_a, echo_agent_b):
+    broken = Agent(name="broken", model="sim:x?error_rate=1", system_prompt="X", retry=None)
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="a", agent=echo_agent_a),
+        WorkflowNode(id="b", agent=broken, depends_on=["a"]),
+        WorkflowNode(id="c", agent=echo_agent_b, depends_on=["b"]),
+    ])
+    store = RunStore(str(tmp_path))
+    with pytest.raises(WorkflowRunError) as info:
+        wf.run("Start", run_store=store)
+    partial = info.value.result
+    assert partial.status == {"a": "done", "b": "failed", "c": "pending"}
+    assert store.completed(partial.run_id) == {"a": "ECHO (A): Start"}
+
+    wf.nodes[1].agent = echo_agent_b
+    handler = EndOrder()
+    result = wf.run("Start", callbacks=[handler], resume=partial.run_id, run_store=store)
+    assert result.run_id == partial.run_id
+    assert result.status == {"a": "resumed", "b": "done", "c": "done"}
+    assert handler.ended == ["B", "B"]  # node a was not executed again
+    assert set(store.completed(partial.run_id)) == {"a", "b", "c"}
+
+def test_memoized_graph_reruns_only_changed_nodes(tmp_path, echo_agent_a, echo_agent_b):
+    store = ArtifactStore(str(tmp_path))
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="a", agent=echo_agent_a),
+        WorkflowNode(id="b", agent=echo_agent_b),
+        WorkflowNode(id="c", agent=echo_agent_a, depends_on=["b"]),
+    ])
+    first = wf.run("Start", artifact_store=store)
+    assert set(first.status.values()) == {"done"}
+
+    wf.nodes[1].agent = Agent(name="B", model="mock", system_prompt="B, but better")
+    handler = EndOrder()
+    second = wf.run("Start", callbacks=[handler], artifact_store=store)
+    assert second.status == {"a": "reused", "b": "done", "c": "done"}
+    assert second["a"] == first["a"]
+    assert handler.ended == ["B", "A"]
+
+def broken_agent():
+    return Agent(name="broken", model="sim:x?error_rate=1", system_prompt="X", retry=None)
+
+def test_fail_fast_cancels_in_flight_nodes():
+    slow = Agent(name="slow", model="sim:slow?latency=10&tokens=1", system_prompt="S")
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="slow", agent=slow),
+        WorkflowNode(id="bad", agent=broken_agent()),
+    ])
+    start = time.monotonic()
+    with pytest.raises(WorkflowRunError) as info:
+        wf.run("go")
+    assert time.monotonic() - start < 5
+    assert info.value.result.status == {"slow": "cancelled", "bad": "failed"}
+
+@pytest.mark.parametrize("policy", ["continue", "best_effort"])
+def test_independent_branches_keep_running(policy, echo_agent_a):
+    wf = GraphWorkflow(name="g", on_failure=policy, nodes=[
+        WorkflowNode(id="bad", agent=broken_agent()),
+        WorkflowNode(id="after_bad", agent=echo_agent_a, depends_on=["bad"]),
+        WorkflowNode(id="ok", agent=echo_agent_a),
+        WorkflowNode(id="after_ok", agent=echo_agent_a, depends_on=["ok"]),
+    ])
+    expected = {"bad": "failed", "after_bad": "skipped", "ok": "done", "after_ok": "done"}
+    if policy == "continue":
+        with pytest.raises(WorkflowRunError) as info:
+            wf.run("go")
+        result = info.value.result
+    else:
+        result = wf.run("go")
+    assert result.status == expected
+    assert result["after_ok"].startswith("ECHO (A)")
+
+def test_deadline_propagates_to_agents_and_nodes(echo_agent_a):
+    slow = Agent(name="slow", model="sim:slow?latency=10&tokens=1", system_prompt="S")
+    with pytest.raises(DeadlineExceededError):
+        SequentialWorkflow(name="s", agents=[slow]).run("go", deadline=0.2)
+
+    wf = GraphWorkflow(name="g", on_failure="best_effort", nodes=[
+        WorkflowNode(id="slow", agent=slow, timeout=0.2),
+        WorkflowNode(id="fast", agent=echo_agent_a),
+    ])
+    start = time.monotonic()
+    result = wf.run("go")
+    assert time.monotonic() - start < 5
+    assert result.status == {"slow": "timed_out", "fast": "done"}
+
+def test_noncritical_nodes_are_skipped_when_short_of_time(echo_agent_a, echo_agent_b):
+    wf = GraphWorkflow(name="g", skip_noncritical_below=60, nodes=[
+        WorkflowNode(id="extra", agent=echo_agent_a, critical=False),
+        WorkflowNode(id="main", agent=echo_agent_b, depends_on=["extra"]),
+    ])
+    result = wf.run("go", deadline=30)
+    assert result.status == {"extra": "skipped", "main": "done"}
+    assert result["main"] == "ECHO (B): "
+
+def test_router_runs_only_the_selected_branch(echo_agent_a, echo_agent_b):
+    classifier = Agent(name="C", model="mock", system_prompt="C")
+    handler = EndOrder()
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="triage", agent=classifier, routes=[
+            Route(contains="bug", targets=["fix"]),
+            Route(default=True, targets=["answer"]),
+        ]),
+        WorkflowNode(id="fix", agent=echo_agent_a),
+        WorkflowNode(id="answer", agent=echo_agent_b),
+        WorkflowNode(id="summary", agent=echo_agent_b, depends_on=["fix", "answer"]),
+    ])
+    result = wf.run("a bug report", callbacks=[handler])
+    assert result.routes == {"triage": ["fix"]}
+    assert result.status["answer"] == "skipped"
+    assert result["fix"] == "ECHO (A): a bug report"
+    assert "Output from fix" in result["summary"] and "answer" not in result["summary"]
+    assert handler.ended == ["C", "A", "B"]
+
+def test_predicate_router_prunes_downstream_nodes(echo_agent_a, echo_agent_b):
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="route", routes=[Route(pattern=r"^\d+$", targets=["math"]),
+                                         Route(default=True, targets=["chat"])]),
+        WorkflowNode(id="math", agent=echo_agent_a),
+        WorkflowNode(id="chat", agent=echo_agent_b),
+        WorkflowNode(id="chat_followup", agent=echo_agent_b, depends_on=["chat"]),
+    ])
+    result = wf.run("42")
+    assert result.status == {"route": "done", "math": "done", "chat": "skipped", "chat_followup": "skipped"}
+
+def test_loop_stops_on_condition_or_iteration_cap(echo_agent_a):
+    until = LoopSpec(max_iterations=5, until=Condition(contains="ECHO (A): ECHO (A)"))
+    capped = LoopSpec(max_iterations=3)
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="until", agent=echo_agent_a, loop=until),
+        WorkflowNode(id="capped", agent=echo_agent_a, loop=capped),
+    ])
+    result = wf.run("x")
+    assert result["until"] == "ECHO (A): ECHO (A): x"
+    assert result["capped"] == "ECHO (A): ECHO (A): ECHO (A): x"
+
+def test_router_requires_known_targets(echo_agent_a):
+    with pytest.raises(ValueError):
+        GraphWorkflow(name="g", nodes=[WorkflowNode(id="r", routes=[Route(default=True, targets=["nope"])])])
+
+@pytest.mark.parametrize("executor", [None, AsyncioExecutor(max_concurrency=1), AsyncioExecutor(max_concurrency=2)],
+                         ids=["threads", "asyncio-1", "asyncio-2"])
+def test_map_reduce_fans_out_and_reduces_as_a_tree(echo_agent_a, echo_agent_b, executor):
+    handler = EndOrder()
+    wf = GraphWorkflow(name="g", executor=executor, nodes=[
+        WorkflowNode(id="chunks", agent=echo_agent_a, map=MapSpec(split="lines", chunk_size=2, max_concurrency=2)),
+        WorkflowNode(id="combine", agent=echo_agent_b, depends_on=["chunks"], reduce=ReduceSpec(fan_in=2)),
+    ])
+    result = wf.run("l1\nl2\nl3\nl4\nl5", callbacks=[handler])
+    assert result["chunks"] == ["ECHO (A): l1\nl2", "ECHO (A): l3\nl4", "ECHO (A): l5"]
+    # Two reductions in the first round, one in the second
+    assert handler.ended.count("A") == 3 and handler.ended.count("B") == 3
+    assert result["combine"].startswith("ECHO (B): ECHO (B): ECHO (A): l1")
+
+def test_map_splits_by_tokens(echo_agent_a):
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="chunks", agent=echo_agent_a, map=MapSpec(split="tokens", chunk_size=3)),
+    ])
+    result = wf.run("one two three four five six seven")
+    assert result["chunks"] == ["ECHO (A): one two three", "ECHO (A): four five six", "ECHO (A): seven"]
+
+def test_stream_pipelines_stages_and_keeps_order(echo_agent_a, echo_agent_b):
+    wf = SequentialWorkflow(name="s", agents=[echo_agent_a, echo_agent_b])
+    assert list(wf.stream(["x", "y", "z"], concurrency=[3, 1])) == [
+        "ECHO (B): ECHO (A): x", "ECHO (B): ECHO (A): y", "ECHO (B): ECHO (A): z"]
+
+    slow = [Agent(name=f"s{i}", model="sim:s?latency=0.05&tokens=1", system_prompt="S") for i in range(4)]
+    start = time.monotonic()
+    assert len(list(SequentialWorkflow(name="p", agents=slow).stream(range(12), queue_size=2))) == 12
+    # 12 items x 4 stages x 0.05s takes 2.4s without overlap
+    assert time.monotonic() - start < 1.6
+
+def test_stream_raises_first_stage_error(echo_agent_a):
+    wf = SequentialWorkflow(name="s", agents=[echo_agent_a, broken_agent()])
+    with pytest.raises(Exception):
+        list(wf.stream(["x", "y"]))
+
+def test_astream_accepts_async_iterables(echo_agent_a):
+    wf = SequentialWorkflow(name="s", agents=[echo_agent_a])
+
+    async def items():
+        for item in ("x", "y"):
+            yield item
+
+    async def collect():
+        return [result async for result in wf.astream(items(), ordered=False)]
+
+    assert sorted(asyncio.run(collect())) == ["ECHO (A): x", "ECHO (A): y"]
+
+def test_projections_pass_only_selected_parts(echo_agent_a, echo_agent_b):
+    wf = GraphWorkflow(name="g", nodes=[
+        WorkflowNode(id="src", routes=[Route(default=True, targets=["pick"])]),
+        WorkflowNode(id="pick", agent=echo_agent_a, projections={"src": Projection(select="$.findings[1].title")}),
+        WorkflowNode(id="short", agent=echo_agent_b, depends_on=["pick"],
+                     projections={"pick": Projection(max_tokens=2)}),
+    ])
+    result = wf.run('```json\n{"findings": [{"title": "one"}, {"title": "two"}]}\n```')
+    assert result["pick"] == "ECHO (A): two"
+    assert result["short"] == "ECHO (B): Output from pick: ECHO ("
+
+def test_json_output_type_fails_on_invalid_json(echo_agent_a):
+    wf = GraphWorkflow(name="g", nodes=[WorkflowNode(id="a", agent=echo_agent_a, output_type="json")])
+    with pytest.raises(WorkflowRunError, match="valid JSON"):
+        wf.run("not json")
+    node = WorkflowNode(id="b", agent=echo_agent_a, output_type="json")
+    assert node.parse_output('{"ok": true}') == {"ok": True}
+
+def test_declared_outputs_only_are_returned(tmp_path, echo_agent_a, echo_agent_b):
+    wf = GraphWorkflow(name="g", outputs=["c"], spill_threshold=8, spill_dir=str(tmp_path), nodes=[
+        WorkflowNode(id="a", agent=echo_agent_a),
+        WorkflowNode(id="b", agent=echo_agent_b, depends_on=["a"]),
+        WorkflowNode(id="c", agent=echo_agent_a, depends_on=["b"]),
+    ])
+    result = wf.run("x" * 50)
+    assert list(result) == ["c"]
+    assert result["c"].endswith("x" * 50)
+    assert result.status == {"a": "done", "b": "done", "c": "done"}
+    assert list(tmp_path.iterdir()) == []
+
+def test_graph_builder_interns_agents_and_runs():
+    builder = GraphBuilder()
+    for i in range(4):
+        builder.add(f"n{i}", Agent(name="A", model="mock", system_prompt="A"), [f"n{i - 1}"] if i else [])
+    wf = builder.build("chain")
+    assert len(builder.agents) == 1
+    assert wf.nodes[0].agent is wf.nodes[3].agent
+    assert wf.nodes[1] == WorkflowNode(id="n1", agent=wf.nodes[1].agent, depends_on=["n0"])
+    assert builder.build("chain", outputs=["n3"]).run("go").keys() == {"n3"}
+    with pytest.raises(ValueError, match="Unknown output"):
+        builder.build("chain", outputs=["n9"])
+    assert list(wf.run("go")) == ["n0", "n1", "n2", "n3"]
+
+def test_compact_graph_orders_nodes_and_detects_cycles():
+    graph = CompactGraph(["a", "b", "c"], [["c"], [], ["b"]])
+    assert [graph.ids[i] for i in graph.topological_order()] == ["b", "c", "a"]
+    assert list(graph.dependents(1)) == [2]
+    with pytest.raises(ValueError, match="Cycle"):
+        CompactGraph(["a", "b"], [["b"], ["a"]]).topological_order()